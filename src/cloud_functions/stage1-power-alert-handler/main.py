@@ -1,7 +1,11 @@
 import os
-import json
+import orjson
 import base64
-from flask import Flask, request, jsonify
+import logging
+import atexit
+import threading
+from collections import deque
+from flask import Flask, request
 from google.cloud import bigquery
 
 app = Flask(__name__)
@@ -11,23 +15,99 @@ app = Flask(__name__)
 PROJECT_ID = os.environ.get('GCP_PROJECT_ID', 'cement-ai-470817')
 BIGQUERY_DATASET = os.environ.get('BIGQUERY_DATASET_ID', 'cementAI_syn_data_stage1')
 BIGQUERY_TABLE = os.environ.get('BIGQUERY_TABLE_ID', 'Power_Eff_Degradation_Triggers')
+# Rows are buffered in memory and written in batches, flushed once the buffer
+# holds FLUSH_MAX_ROWS rows or FLUSH_INTERVAL_SECONDS after the first buffered row
+FLUSH_MAX_ROWS = int(os.environ.get('BIGQUERY_FLUSH_MAX_ROWS', '500'))
+FLUSH_INTERVAL_SECONDS = float(os.environ.get('BIGQUERY_FLUSH_INTERVAL_SECONDS', '5'))
+# Upper bound on buffered rows while BigQuery is failing; the oldest rows are dropped beyond it
+MAX_BUFFERED_ROWS = int(os.environ.get('BIGQUERY_MAX_BUFFERED_ROWS', str(FLUSH_MAX_ROWS * 20)))
+
+# --- Logging ---
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'WARNING')
+logging.basicConfig(level=LOG_LEVEL)
+logger = logging.getLogger(__name__)
 
 # Initialize BigQuery client outside the request handler for efficiency
 bigquery_client = bigquery.Client(project=PROJECT_ID)
+TABLE_REF = bigquery.TableReference.from_string(f"{PROJECT_ID}.{BIGQUERY_DATASET}.{BIGQUERY_TABLE}")
+
+# --- Row Buffer ---
+row_buffer = deque()
+buffer_lock = threading.Lock()
+flush_timer = None
+
+def flush_rows():
+    """
+    Drains the row buffer and inserts all pending rows into BigQuery in a single request.
+    If the request itself fails, the rows are put back in the buffer for the next flush,
+    keeping at most MAX_BUFFERED_ROWS rows.
+    """
+    global flush_timer
+    with buffer_lock:
+        # A size-triggered flush also covers whatever the pending timer would have written
+        if flush_timer is not None:
+            flush_timer.cancel()
+        flush_timer = None
+        rows_to_insert = list(row_buffer)
+        row_buffer.clear()
+
+    if not rows_to_insert:
+        return
+
+    try:
+        errors = bigquery_client.insert_rows_json(TABLE_REF, rows_to_insert)
+    except Exception as e:
+        logger.error(f"Error flushing {len(rows_to_insert)} rows to BigQuery, re-queueing: {e}")
+        with buffer_lock:
+            row_buffer.extendleft(reversed(rows_to_insert))
+            dropped = len(row_buffer) - MAX_BUFFERED_ROWS
+            for _ in range(max(dropped, 0)):
+                row_buffer.popleft()
+        if dropped > 0:
+            logger.error(f"Row buffer is full, dropped the {dropped} oldest rows: {rows_to_insert[:dropped]}")
+        schedule_flush()
+        return
+
+    if errors:
+        # Row-level errors are data problems, retrying the same rows will not help
+        logger.error(f"Errors encountered while inserting rows: {errors}")
+    else:
+        logger.info(f"Successfully inserted {len(rows_to_insert)} rows into BigQuery table {BIGQUERY_DATASET}.{BIGQUERY_TABLE}")
+
+def schedule_flush():
+    """
+    Starts the flush timer unless one is already pending.
+    """
+    global flush_timer
+    with buffer_lock:
+        if flush_timer is not None:
+            return
+        flush_timer = threading.Timer(FLUSH_INTERVAL_SECONDS, flush_rows)
+        flush_timer.daemon = True
+        flush_timer.start()
+
+# Write out whatever is still buffered when the container shuts down
+atexit.register(flush_rows)
 
 @app.route('/', methods=['POST'])
 def index():
     """
-    Receives Pub/Sub push messages, decodes them, and inserts into BigQuery.
+    Receives Pub/Sub push messages, decodes them, and buffers them for a batched BigQuery insert.
     """
     if not request.is_json:
-        print("Received non-JSON request.")
+        logger.warning("Received non-JSON request.")
         return 'Bad Request: Request must be JSON', 400
 
     try:
-        envelope = request.get_json()
+        # Parse the raw body with orjson instead of going through Flask's JSON layer
+        try:
+            envelope = orjson.loads(request.get_data(cache=False))
+        except orjson.JSONDecodeError as e:
+            logger.warning(f"Error decoding request body as JSON: {e}")
+            return f'Bad Request: Request body is not valid JSON - {e}', 400
+
         if not envelope or 'message' not in envelope:
-            print("Invalid Pub/Sub message format: 'message' key missing.")
+            logger.warning("Invalid Pub/Sub message format: 'message' key missing.")
             return 'Bad Request: Invalid Pub/Sub message format', 400
 
         pubsub_message = envelope['message']
@@ -35,35 +115,30 @@ def index():
         if 'data' in pubsub_message:
             # Pub/Sub message data is base64 encoded
             message_data_encoded = pubsub_message['data']
-            message_data_decoded = base64.b64decode(message_data_encoded).decode('utf-8')
-            print(f"Decoded Pub/Sub message data: {message_data_decoded}")
 
-            # Assuming the Pub/Sub message data is a JSON string
+            # Assuming the Pub/Sub message data is a JSON string, parse the decoded bytes directly
             try:
-                row_to_insert = json.loads(message_data_decoded)
-            except json.JSONDecodeError as e:
-                print(f"Error decoding message data as JSON: {e}")
+                row_to_insert = orjson.loads(base64.b64decode(message_data_encoded))
+            except orjson.JSONDecodeError as e:
+                logger.warning(f"Error decoding message data as JSON: {e}")
                 return f'Bad Request: Message data is not valid JSON - {e}', 400
 
-            # BigQuery expects a list of rows, even for a single row insert
-            rows_to_insert = [row_to_insert]
-
-            table_ref = bigquery_client.dataset(BIGQUERY_DATASET).table(BIGQUERY_TABLE)
-            errors = bigquery_client.insert_rows_json(table_ref, rows_to_insert)
+            with buffer_lock:
+                row_buffer.append(row_to_insert)
+                buffered_rows = len(row_buffer)
 
-            if errors:
-                print(f"Errors encountered while inserting rows: {errors}")
-                return jsonify({'message': 'BigQuery insert errors', 'errors': errors}), 500
+            if buffered_rows >= FLUSH_MAX_ROWS:
+                flush_rows()
             else:
-                print(f"Successfully inserted message into BigQuery table {BIGQUERY_DATASET}.{BIGQUERY_TABLE}")
-                return 'Message processed and inserted into BigQuery', 200
+                schedule_flush()
+            return 'Message buffered for BigQuery insert', 200
 
         else:
-            print("Pub/Sub message has no 'data' attribute.")
+            logger.warning("Pub/Sub message has no 'data' attribute.")
             return 'No data in Pub/Sub message', 200 # Or 400 if data is always expected
 
     except Exception as e:
-        print(f"An unexpected error occurred: {e}")
+        logger.error(f"An unexpected error occurred: {e}")
         return f'Internal Server Error: {e}', 500
 
 if __name__ == '__main__':
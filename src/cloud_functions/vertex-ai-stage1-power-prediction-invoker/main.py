@@ -1,9 +1,11 @@
 import os
-import json
+import logging
+import orjson
 from google.cloud import aiplatform
 from google.cloud import pubsub_v1
-from google.protobuf.json_format import MessageToJson 
+from google.protobuf.json_format import MessageToDict
 import functions_framework
+import grpc
 import proto
 
 # --- Configuration ---
@@ -12,6 +14,28 @@ LOCATION = os.environ.get('GCP_REGION') # Your Cloud Function region
 VERTEX_AI_ENDPOINT_ID = os.environ.get('VERTEX_AI_ENDPOINT_ID') # Replace with your Vertex AI Endpoint ID
 VERTEX_AI_MODEL_ID = os.environ.get('VERTEX_AI_MODEL_ID') # Replace with your Vertex AI Model ID (if needed for client init)
 PUB_SUB_TOPIC_ID = os.environ.get('PUB_SUB_TOPIC_ID') # The Pub/Sub topic for alerts
+POWER_EFFICIENCY_THRESHOLD = 1.5 # Predicted values above this are treated as degraded
+
+# Invariant parts of the alert payloads and responses, built once and merged with
+# the per-request fields in the handler
+BASE_ALERT_PAYLOAD = {
+    "model_id": VERTEX_AI_MODEL_ID,
+    "endpoint_id": VERTEX_AI_ENDPOINT_ID,
+    "alert_type": "power_efficiency_degradation",
+    "suggestion": "Decrease the Crusher Power or add more raw materials(limestone, clay or iron ore)"
+}
+BASE_ERROR_PAYLOAD = {
+    "model_id": VERTEX_AI_MODEL_ID,
+    "endpoint_id": VERTEX_AI_ENDPOINT_ID,
+    "alert_type": "prediction_error",
+    "suggestion": "No suggestions available at this time."
+}
+NO_ALERT_RESPONSE = orjson.dumps({"status": "prediction_processed", "alert_triggered": False})
+
+# --- Logging ---
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'WARNING')
+logging.basicConfig(level=LOG_LEVEL)
+logger = logging.getLogger(__name__)
 
 # Initialize Vertex AI client
 vertex_ai_client = aiplatform.gapic.PredictionServiceClient(client_options={"api_endpoint": f"{LOCATION}-aiplatform.googleapis.com"})
@@ -20,9 +44,73 @@ endpoint_name = vertex_ai_client.endpoint_path(
 )
 
 # Initialize Pub/Sub publisher client
-publisher = pubsub_v1.PublisherClient()
+# Alerts are batched by the client and not awaited on the request path
+publisher = pubsub_v1.PublisherClient(
+    batch_settings=pubsub_v1.types.BatchSettings(max_messages=100, max_bytes=1024 * 1024, max_latency=0.05)
+)
 topic_path = publisher.topic_path(PROJECT_ID, PUB_SUB_TOPIC_ID)
 
+# --- Connection Warm-up ---
+def warm_up_clients(timeout=None):
+    """
+    Opens the Vertex AI and Pub/Sub connections during container init so the
+    first request does not pay the TCP/TLS handshake on its critical path.
+
+    Args:
+        timeout (float): Seconds to wait for the Vertex AI channel to become ready.
+            If None, the connection is started in the background without waiting.
+    """
+    try:
+        # Starts connecting the gRPC channel, module import doesn't wait for it
+        channel_ready = grpc.channel_ready_future(vertex_ai_client.transport.grpc_channel)
+        if timeout is not None:
+            channel_ready.result(timeout=timeout)
+    except Exception as e:
+        logger.warning(f"Could not pre-connect Vertex AI channel: {e}")
+
+    try:
+        publisher.get_topic(request={"topic": topic_path}, timeout=5)
+    except Exception as e:
+        logger.warning(f"Could not warm up Pub/Sub channel: {e}")
+
+warm_up_clients()
+
+# --- Helper Function for Publish Results ---
+def log_publish_result(future):
+    """
+    Done-callback for Pub/Sub publishes, so failures are still reported
+    even though the publish future is not awaited.
+    """
+    exception = future.exception()
+    if exception:
+        logger.error(f"Error publishing alert to Pub/Sub: {exception}")
+
+# --- Helper Function for Prediction Conversion ---
+def pick_converter(prediction_val):
+    """
+    Picks the function that turns a prediction into a plain Python object.
+    All predictions from one endpoint share a type, so this is decided once
+    per response from the first prediction.
+
+    Args:
+        prediction_val: A single prediction from the Vertex AI response.
+
+    Returns:
+        callable: Converter to apply to every prediction in the response.
+    """
+    # Check if it's the MapComposite type
+    if isinstance(prediction_val, proto.marshal.collections.maps.MapComposite):
+        return dict
+    if hasattr(prediction_val, 'DESCRIPTOR'):
+        # Standard protobuf messages like Value
+        return lambda prediction: MessageToDict(prediction, preserving_proto_field_name=True)
+    if isinstance(prediction_val, (dict, list, str, int, float, bool)):
+        # Native Python types don't need conversion
+        return lambda prediction: prediction
+    # Fallback for unexpected types
+    logger.warning(f"Unexpected prediction_val type: {type(prediction_val)}. Attempting string conversion.")
+    return str
+
 # --- Helper Function for Efficiency Evaluation ---
 def evaluate_efficiency(predicted_response):
     """
@@ -35,13 +123,14 @@ def evaluate_efficiency(predicted_response):
     """
     # Example: Check if a certain prediction confidence is below a threshold
     try:
-        # Check for the predicted power efficiency is above 1.5
+        # Check for the predicted power efficiency is above the threshold, stopping at the first hit
         for response in predicted_response:
-            if response.get('value') > 1.5:
-                return True, f"Power Consumption Efficiency degraded!!! Value : {response.get('value')} "
+            value = response.get('value')
+            if value > POWER_EFFICIENCY_THRESHOLD:
+                return True, f"Power Consumption Efficiency degraded!!! Value : {value} "
 
     except Exception as e:
-        print(f"Error evaluating efficiency: {e}")
+        logger.error(f"Error evaluating efficiency: {e}")
         return False, f"Error during efficiency evaluation: {e}"
 
     return False, f"Power Consumption Efficiency within acceptable limits"
@@ -49,10 +138,19 @@ def evaluate_efficiency(predicted_response):
 # --- Cloud Function Entry Point ---
 @functions_framework.http
 def predict_and_alert(request):
+    if request.path == '/_warmup':
+        # Startup probe / scheduler ping, keeps the instance and its connections warm
+        warm_up_clients(timeout=10)
+        return 'OK', 200
+
     if request.method != 'POST':
         return 'Only POST requests are accepted', 405
 
-    request_json = request.get_json(silent=True)
+    # Parse the raw body with orjson instead of going through Flask's JSON layer
+    try:
+        request_json = orjson.loads(request.get_data(cache=False))
+    except orjson.JSONDecodeError:
+        request_json = None
     if not request_json:
         return 'Invalid JSON payload', 400
 
@@ -64,31 +162,14 @@ def predict_and_alert(request):
     try:        
         # Make prediction request to Vertex AI endpoint
         predict_response = vertex_ai_client.predict(endpoint=endpoint_name, instances=input_data)
-        print(f"Length of predictions : {len(predict_response.predictions)}")
+        predictions = predict_response.predictions
+        logger.debug("Length of predictions : %d", len(predictions))
         prediction_results = []
-        for prediction_val in predict_response.predictions:
-            # Check if it's the MapComposite type
-            if isinstance(prediction_val, proto.marshal.collections.maps.MapComposite):
-                processed_prediction = dict(prediction_val)
-            elif hasattr(prediction_val, 'DESCRIPTOR'):
-                # This block handles standard protobuf messages like Value
-                from google.protobuf.json_format import MessageToJson # Import here if only used conditionally
-                processed_prediction = json.loads(MessageToJson(prediction_val))
-            elif isinstance(prediction_val, (dict, list, str, int, float, bool)):
-                # This block handles native Python types that don't need conversion
-                processed_prediction = prediction_val
-            else:
-                # Fallback for unexpected types
-                print(f"Warning: Unexpected prediction_val type: {type(prediction_val)}. Attempting string conversion.")
-                processed_prediction = str(prediction_val)
-
-             # Log the processed prediction for debugging
-            print(f"Processed Prediction: {json.dumps(processed_prediction, indent=2)}")
-            
-            # Append the processed result to our list
-            prediction_results.append(processed_prediction)
+        if predictions:
+            convert = pick_converter(predictions[0])
+            prediction_results = [convert(prediction_val) for prediction_val in predictions]
 
-        print("--- Finished Prediction Processing, Validating efficiency ") # Added for clarity in logs
+        logger.debug("Finished Prediction Processing, Validating efficiency")
 
         #Evaluate efficiency
         is_degraded = False
@@ -96,39 +177,32 @@ def predict_and_alert(request):
         if prediction_results:
             is_degraded, alert_message = evaluate_efficiency(prediction_results)
 
-        print(f"Prediction processing complete. Degraded Status : {is_degraded}, Msg : {alert_message}")
+        logger.info(f"Prediction processing complete. Degraded Status : {is_degraded}, Msg : {alert_message}")
  
 
         if is_degraded:
-            print(f"Efficiency degraded! Publishing alert: {alert_message}")
-            alert_payload = {
+            logger.warning(f"Efficiency degraded! Publishing alert: {alert_message}")
+            alert_payload = BASE_ALERT_PAYLOAD | {
                 "timestamp": instance_timestamp or request.headers.get('X-Cloud-Trace-Context', 'unknown'), # Use instance timestamp or fallback
-                "model_id": VERTEX_AI_MODEL_ID,
-                "endpoint_id": VERTEX_AI_ENDPOINT_ID,
-                "alert_type": "power_efficiency_degradation",
-                "message": alert_message,
-                "suggestion": "Decrease the Crusher Power or add more raw materials(limestone, clay or iron ore)"
+                "message": alert_message
             }
             
             # Publish alert to Pub/Sub
-            future = publisher.publish(topic_path, json.dumps(alert_payload).encode("utf-8"))
-            future.result() # Wait for the publish operation to complete
-            print(f"Alert Published: {alert_payload}")
-            return json.dumps({"status": "prediction_processed", "alert_triggered": True, "alert_message": alert_message}), 200
+            future = publisher.publish(topic_path, orjson.dumps(alert_payload))
+            future.add_done_callback(log_publish_result) # Don't block the response on the publish ack
+            logger.info(f"Alert queued for publishing: {alert_payload}")
+            return orjson.dumps({"status": "prediction_processed", "alert_triggered": True, "alert_message": alert_message}), 200
         else:
-            print("Efficiency within acceptable limits.")
-            return json.dumps({"status": "prediction_processed", "alert_triggered": False}), 200
+            logger.debug("Efficiency within acceptable limits.")
+            return NO_ALERT_RESPONSE, 200
 
     except Exception as e:
-        print(f"An error occurred: {e}")
+        logger.error(f"An error occurred: {e}")
         # Optionally publish an error alert
-        error_alert_payload = {
+        error_alert_payload = BASE_ERROR_PAYLOAD | {
             "timestamp": instance_timestamp or request.headers.get('X-Cloud-Trace-Context', 'unknown'), # Use instance timestamp or fallback
-            "model_id": VERTEX_AI_MODEL_ID,
-            "endpoint_id": VERTEX_AI_ENDPOINT_ID,
-            "alert_type": "prediction_error",
-            "message": f"Error during prediction or processing: {e}",
-            "suggestion": "No suggestions available at this time."
+            "message": f"Error during prediction or processing: {e}"
         }
-        publisher.publish(topic_path, json.dumps(error_alert_payload).encode("utf-8")).result()
+        future = publisher.publish(topic_path, orjson.dumps(error_alert_payload))
+        future.add_done_callback(log_publish_result) # Don't block the error response on the publish ack
         return f"Error processing request: {e}", 500
\ No newline at end of file
@@ -6,15 +6,44 @@ Streamlit-based dashboard for CementAI PoC.
 Visualizes KPIs, process parameters, and recommendations.
 """
 
+import json
+import os
 import streamlit as st
 import pandas as pd
 from src.dashboard.components import display_kpis, display_parameters_table, display_recommendations
 import requests
+from requests.adapters import HTTPAdapter
 
 # -------------------------------
 # Configuration
 # -------------------------------
 API_URL = "http://127.0.0.1:8000"  # FastAPI services endpoint
+PROCESSED_DATA_PATH = "data/synthetic/processed/raw_mill_processed.parquet"  # Replace dynamically per stage
+KPI_DEFAULTS = pd.Series({"spc": 85, "tsr": 12, "downtime": 3})  # Used when a KPI column is missing
+
+# -------------------------------
+# Data Loading
+# -------------------------------
+@st.cache_data
+def load_processed_data(path: str, mtime: float) -> pd.DataFrame:
+    """
+    Load a processed dataset from Parquet, cached across reruns.
+    Args:
+        path (str): Path to the processed Parquet file
+        mtime (float): File modification time, only part of the cache key
+            so the file is re-read after the pipeline rewrites it
+    """
+    return pd.read_parquet(path, engine="pyarrow")
+
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    """
+    Shared HTTP session, kept across reruns so the connection to the
+    services API is reused instead of reopened on every click.
+    """
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+    return session
 
 # -------------------------------
 # Dashboard Title
@@ -34,7 +63,7 @@ run_simulation = st.sidebar.button("Run Simulation")
 if run_simulation:
     # Example: Load latest processed data
     try:
-        df_params = pd.read_csv("data/synthetic/processed/raw_mill_processed.csv")  # Replace dynamically per stage
+        df_params = load_processed_data(PROCESSED_DATA_PATH, os.path.getmtime(PROCESSED_DATA_PATH))
     except FileNotFoundError:
         st.error("Processed data not found. Run synthetic data generator first.")
         df_params = pd.DataFrame()
@@ -43,18 +72,25 @@ if run_simulation:
         display_parameters_table(df_params.head(5))  # Show top 5 rows
 
         # Get recommendations from services API
-        latest_row = df_params.iloc[-1].to_dict()  # Latest parameter row
-        response = requests.post(f"{API_URL}/recommend", json={"stage": stage, "parameters": latest_row})
-        if response.status_code == 200:
+        # Latest parameter row, via pandas' JSON writer so Parquet timestamps (and NaNs) become JSON-safe
+        latest_row = json.loads(df_params.iloc[[-1]].to_json(orient="records", date_format="iso"))[0]
+        try:
+            response = get_http_session().post(
+                f"{API_URL}/recommend", json={"stage": stage, "parameters": latest_row}, timeout=(1, 5)
+            )
+        except requests.RequestException:
+            response = None
+        if response is not None and response.status_code == 200:
             recommendations = {stage: response.json().get("recommendation")}
             display_recommendations(recommendations)
         else:
             st.error("Failed to fetch recommendations from API.")
 
         # Example KPIs (for PoC, compute from synthetic data)
+        kpi_means = df_params.reindex(columns=KPI_DEFAULTS.index).mean().fillna(KPI_DEFAULTS).round(2)
         kpi_dict = {
-            "SPC": round(df_params.get("spc", pd.Series([85])).mean(), 2),
-            "TSR": round(df_params.get("tsr", pd.Series([12])).mean(), 2),
-            "Downtime": round(df_params.get("downtime", pd.Series([3])).mean(), 2)
+            "SPC": kpi_means["spc"],
+            "TSR": kpi_means["tsr"],
+            "Downtime": kpi_means["downtime"]
         }
         display_kpis(kpi_dict)
@@ -29,6 +29,7 @@ from .transformers import (
     fill_missing_values,
     detect_anomalies,
     transform_pipeline,
+    reset_scalers,
 )
 
 # Pipelines
@@ -55,27 +56,19 @@ __all__ = [
     "fill_missing_values",
     "detect_anomalies",
     "transform_pipeline",
+    "reset_scalers",
     # pipelines
     "get_preprocessed_data",
     "get_preprocessed_scenario",
     "preprocess_single",
-    # wrapper
+    # alias
     "load_and_preprocess_all",
 ]
 
 
 # -------------------------------
-# Convenience Wrapper
+# Convenience Alias
 # -------------------------------
-def load_and_preprocess_all(data_dir="../data/synthetic/raw", normalize_method="minmax"):
-    """
-    Load all synthetic datasets and apply preprocessing pipeline.
-
-    Args:
-        data_dir (str): Directory containing raw synthetic datasets.
-        normalize_method (str): Scaling method ("minmax" or "standard").
-
-    Returns:
-        dict: Dictionary of preprocessed DataFrames with dataset names as keys.
-    """
-    return get_preprocessed_data(data_dir=data_dir, normalize_method=normalize_method)
+# Load all synthetic datasets and apply the preprocessing pipeline.
+# Bound directly rather than wrapped, so callers don't pay an extra call frame.
+load_and_preprocess_all = get_preprocessed_data
@@ -0,0 +1,120 @@
+"""
+src/data_pipeline/_kernels.py
+-----------------------------
+
+Numeric kernels for the normalization, missing-value, outlier-clipping and anomaly transforms.
+Compiled with Numba when it is installed, otherwise implemented with NumPy ufuncs.
+Column statistics can optionally be computed with Arrow compute kernels (PD_ARROW_STATS=1).
+"""
+
+import os
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional
+    njit = None
+
+
+# fastmath without the no-NaN/no-Inf assumptions, since columns may still contain missing values
+FASTMATH_FLAGS = {"nsz", "arcp", "contract", "afn", "reassoc"}
+
+
+if njit is not None:
+    @njit(parallel=True, fastmath=FASTMATH_FLAGS, cache=True)
+    def affine_fill_inplace(a, offsets, scales, fills):
+        """Apply (a - offset) * scale per column and replace NaNs with the column's fill value."""
+        n_rows, n_cols = a.shape
+        for j in prange(n_cols):
+            for i in range(n_rows):
+                if np.isnan(a[i, j]):
+                    a[i, j] = fills[j]
+                else:
+                    a[i, j] = (a[i, j] - offsets[j]) * scales[j]
+
+    @njit(parallel=True, fastmath=FASTMATH_FLAGS, cache=True)
+    def clip_inplace(a, lo, hi):
+        """Clip each column of a 2-D array to its [lo, hi] bounds; NaNs are left untouched."""
+        n_rows, n_cols = a.shape
+        for j in prange(n_cols):
+            for i in range(n_rows):
+                if a[i, j] < lo[j]:
+                    a[i, j] = lo[j]
+                elif a[i, j] > hi[j]:
+                    a[i, j] = hi[j]
+
+    @njit(parallel=True, fastmath=FASTMATH_FLAGS, cache=True)
+    def any_exceeds(a, mu, limit):
+        """Flag rows where any column deviates from mu by more than limit; NaNs never flag."""
+        n_rows, n_cols = a.shape
+        out = np.zeros(n_rows, dtype=np.bool_)
+        for i in prange(n_rows):
+            for j in range(n_cols):
+                if abs(a[i, j] - mu[j]) > limit[j]:
+                    out[i] = True
+                    break
+        return out
+else:
+    def affine_fill_inplace(a, offsets, scales, fills):
+        """Apply (a - offset) * scale per column and replace NaNs with the column's fill value."""
+        missing = np.isnan(a)
+        np.subtract(a, offsets, out=a)
+        np.multiply(a, scales, out=a)
+        np.copyto(a, np.broadcast_to(fills, a.shape), where=missing)
+
+    def clip_inplace(a, lo, hi):
+        """Clip each column of a 2-D array to its [lo, hi] bounds; NaNs are left untouched."""
+        np.clip(a, lo, hi, out=a)
+
+    def any_exceeds(a, mu, limit):
+        """Flag rows where any column deviates from mu by more than limit; NaNs never flag."""
+        return (np.abs(a - mu) > limit).any(axis=1)
+
+
+# -------------------------------
+# Column statistics
+# -------------------------------
+# Arrow's kernels make one pass per column and skip nulls natively; worth it on wide frames
+USE_ARROW_STATS = os.getenv("PD_ARROW_STATS", "0") == "1"
+
+
+def _arrow_columns(a):
+    # from_pandas turns NaN into null so the reductions skip it, like the nan* functions
+    return [pa.array(a[:, j], from_pandas=True) for j in range(a.shape[1])]
+
+
+def _as_float(scalar):
+    value = scalar.as_py()
+    return np.nan if value is None else value
+
+
+def column_mean_std(a, ddof=0, dtype=None):
+    """NaN-ignoring per-column mean and standard deviation of a 2-D array."""
+    if not USE_ARROW_STATS:
+        return np.nanmean(a, axis=0, dtype=dtype), np.nanstd(a, axis=0, dtype=dtype, ddof=ddof)
+    columns = _arrow_columns(a)
+    mean = np.array([_as_float(pc.mean(c)) for c in columns], dtype=dtype or a.dtype)
+    std = np.array([_as_float(pc.stddev(c, ddof=ddof)) for c in columns], dtype=dtype or a.dtype)
+    return mean, std
+
+
+def column_min_max(a):
+    """NaN-ignoring per-column minimum and maximum of a 2-D array."""
+    if not USE_ARROW_STATS:
+        return np.nanmin(a, axis=0), np.nanmax(a, axis=0)
+    bounds = [pc.min_max(c) for c in _arrow_columns(a)]
+    minimum = np.array([_as_float(b["min"]) for b in bounds], dtype=a.dtype)
+    maximum = np.array([_as_float(b["max"]) for b in bounds], dtype=a.dtype)
+    return minimum, maximum
+
+
+def column_percentiles(a, percentiles):
+    """NaN-ignoring per-column percentiles (linear interpolation); one row per percentile."""
+    if not USE_ARROW_STATS:
+        return np.nanpercentile(a, percentiles, axis=0)
+    q = [p / 100 for p in percentiles]
+    columns = [pc.quantile(c, q=q).to_numpy(zero_copy_only=False) for c in _arrow_columns(a)]
+    return np.array(columns, dtype=np.float64).T
@@ -6,21 +6,47 @@ Module for loading synthetic and real-time cement plant datasets.
 Provides robust CSV loading with error handling and stage-wise organization.
 """
 
+import io
 import os
-import glob
+import tempfile
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
 import json
-from dateutil.parser import parse as dtparse
 import logging
+import operator
+from contextlib import contextmanager
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+
+from .schemas import schema_columns
 
 
 # Configure logger
-logging.basicConfig(level=logging.DEBUG)
+logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 SCHEMA_DIR = "data/synthetic/schema"
 
+# Stage name -> schema file path, built once at import
+_SCHEMA_FILE_MAP = {
+    f[:-len("_schema.json")]: os.path.join(SCHEMA_DIR, f)
+    for f in (os.listdir(SCHEMA_DIR) if os.path.isdir(SCHEMA_DIR) else [])
+    if f.endswith("_schema.json")
+}
+
+# Timestamp format written by the stage 2-5 generators; anything else falls back to ISO 8601 parsing
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+
+# CSVs above this size are converted to Parquet batch by batch instead of as one table
+LARGE_CSV_BYTES = 512 << 20
+
+# Set PD_ARROW=0 to roll back to plain pandas CSV parsing (no Arrow reader, no Parquet cache)
+USE_PYARROW_ENGINE = os.getenv("PD_ARROW", "1") == "1"
+
 
 # Define and export the project root directory
 PROJECT_ROOT = os.getenv("PROJECT_ROOT", os.path.abspath(os.path.join(os.path.dirname(__file__), "../../..")))
@@ -30,6 +56,7 @@ DEFAULT_BASE_DIR = os.path.join(PROJECT_ROOT, "data/synthetic/raw")
 # -------------------------------
 # Schema Loader
 # -------------------------------
+@lru_cache(maxsize=None)
 def load_schema(stage_name: str):
     """Load schema JSON for a given stage."""
     # Map stage names to schema file names if necessary
@@ -42,22 +69,202 @@ def load_schema(stage_name: str):
     }
     schema_name = schema_mapping.get(stage_name, stage_name)
     path = os.path.join(SCHEMA_DIR, f"{schema_name}_schema.json")
-    print(f"Loading schema for stage: {stage_name}, Path: {path}")  # Debugging log
+    logger.debug("Loading schema for stage: %s, Path: %s", stage_name, path)
     if not os.path.exists(path):
         raise FileNotFoundError(f"Schema not found for {stage_name}: {path}")
     with open(path, "r") as f:
         return json.load(f)
 
 
+@lru_cache(maxsize=None)
+def _load_schema_file(path: str):
+    """Load and memoize a schema JSON file by path."""
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+# -------------------------------
+# Arrow CSV Reader
+# -------------------------------
+# Arrow types for the type prefix of schema field descriptions, e.g. "float, tonnes per hour"
+ARROW_FIELD_TYPES = {
+    "float": pa.float64(),
+    "integer": pa.int64(),
+    "string": pa.string(),
+}
+
+
+def _arrow_column_types(schema: dict):
+    """
+    Build Arrow column types from the fields of a stage schema: either a {name: description}
+    dict, or (like schemas.schema_columns accepts) a list of {"name", "type"/"description"} dicts.
+    """
+    fields = schema.get("fields", {})
+    if isinstance(fields, dict):
+        descriptions = fields.items()
+    else:
+        descriptions = ((f["name"], f.get("type") or f.get("description") or "") for f in fields)
+
+    column_types = {}
+    for name, description in descriptions:
+        kind = description.split(",")[0].strip()
+        if description.startswith("ISO 8601") or kind in ("datetime", "timestamp"):
+            column_types[name] = pa.timestamp("us")
+        elif kind in ARROW_FIELD_TYPES:
+            column_types[name] = ARROW_FIELD_TYPES[kind]
+    return column_types
+
+
+def _arrow_read_csv(file_path, schema: dict = None):
+    """
+    Read a CSV file with Arrow's multithreaded CSV reader.
+
+    Args:
+        file_path (str): Path to the CSV file
+        schema (dict): Optional stage schema used to fix column types instead of inferring them
+
+    Returns:
+        pa.Table: Parsed table
+    """
+    read_options, parse_options, convert_options = _arrow_csv_options(schema, block_size=64 << 20)
+    with _open_sequential(file_path) as f:
+        return pa_csv.read_csv(f, read_options=read_options, parse_options=parse_options,
+                               convert_options=convert_options)
+
+
+@contextmanager
+def _open_sequential(file_path):
+    """
+    Open a file for a one-shot sequential scan. On platforms with posix_fadvise the kernel is told
+    to read ahead aggressively, and the file's pages are dropped from the page cache afterwards.
+    """
+    fd = os.open(file_path, os.O_RDONLY)
+    advise = hasattr(os, "posix_fadvise")
+    if advise:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    f = io.FileIO(fd, closefd=True)
+    try:
+        yield f
+    finally:
+        if advise:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        f.close()
+
+
+def _arrow_csv_options(schema: dict = None, block_size=64 << 20):
+    """Build the Arrow CSV read/parse/convert options shared by the full and batched readers."""
+    read_options = pa_csv.ReadOptions(block_size=block_size, use_threads=True)
+    parse_options = pa_csv.ParseOptions(delimiter=",")
+    convert_options = pa_csv.ConvertOptions(
+        column_types=_arrow_column_types(schema) if schema else None,
+        timestamp_parsers=[pa_csv.ISO8601],
+    )
+    return read_options, parse_options, convert_options
+
+
+def load_csv_batched(file_path, schema: dict = None, block_size=128 << 20):
+    """
+    Stream a CSV file as Arrow record batches of roughly block_size bytes each.
+
+    Args:
+        file_path (str): Path to the CSV file
+        schema (dict): Optional stage schema used to fix column types
+        block_size (int): Bytes of CSV parsed per batch
+
+    Yields:
+        pa.RecordBatch: Parsed batch
+    """
+    read_options, parse_options, convert_options = _arrow_csv_options(schema, block_size=block_size)
+    with _open_sequential(file_path) as f, pa_csv.open_csv(f, read_options=read_options, parse_options=parse_options,
+                                                          convert_options=convert_options) as reader:
+        for batch in reader:
+            yield batch
+
+
+# Parquet cache metadata key recording the column types the cached file was parsed with
+CACHE_TYPES_KEY = b"cemint.column_types"
+
+
+def _column_types_key(schema: dict = None):
+    """Serialize the Arrow column types a schema imposes, to tell caches parsed with different schemas apart."""
+    column_types = _arrow_column_types(schema) if schema else {}
+    return json.dumps({name: str(t) for name, t in column_types.items()}, sort_keys=True).encode()
+
+
+def _ensure_parquet(csv_path, schema: dict = None):
+    """
+    Convert a CSV file to a zstd Parquet file next to it, unless an up-to-date one already exists
+    that was parsed with the same schema column types.
+
+    Args:
+        csv_path (str): Path to the CSV file
+        schema (dict): Optional stage schema used to fix column types
+
+    Returns:
+        str: Path to the Parquet file
+    """
+    parquet_path = os.path.splitext(csv_path)[0] + ".parquet"
+    types_key = _column_types_key(schema)
+    try:
+        if os.stat(parquet_path).st_mtime >= os.stat(csv_path).st_mtime:
+            metadata = pq.read_schema(parquet_path).metadata or {}
+            if metadata.get(CACHE_TYPES_KEY) == types_key:
+                return parquet_path
+    except FileNotFoundError:
+        pass
+
+    # A private temp file per writer, so concurrent loads of the same CSV never share one
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(csv_path) or ".", suffix=".parquet.tmp")
+    os.close(fd)
+    write_options = dict(compression="zstd", use_dictionary=True, data_page_size=1 << 20)
+    try:
+        if os.path.getsize(csv_path) > LARGE_CSV_BYTES:
+            # Large files: write one row group per batch so only a single batch is held in memory
+            writer = None
+            try:
+                for batch in load_csv_batched(csv_path, schema):
+                    if writer is None:
+                        metadata = {**(batch.schema.metadata or {}), CACHE_TYPES_KEY: types_key}
+                        writer = pq.ParquetWriter(tmp_path, batch.schema.with_metadata(metadata), **write_options)
+                    writer.write_batch(batch, row_group_size=128 * 1024)
+            finally:
+                if writer is not None:
+                    writer.close()
+        else:
+            table = _arrow_read_csv(csv_path, schema)
+            table = table.replace_schema_metadata({**(table.schema.metadata or {}), CACHE_TYPES_KEY: types_key})
+            pq.write_table(table, tmp_path, row_group_size=128 * 1024, **write_options)
+        os.replace(tmp_path, parquet_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    logger.debug("Cached %s as Parquet: %s", csv_path, parquet_path)
+    return parquet_path
+
+
 # -------------------------------
 # Single CSV Loader
 # -------------------------------
-def load_csv(file_path):
+def _pandas_read_csv(file_path, columns=None):
+    """Read a CSV with pandas, dispatching to its pyarrow engine when enabled."""
+    if USE_PYARROW_ENGINE:
+        try:
+            return pd.read_csv(file_path, usecols=columns, engine="pyarrow")
+        except (pa.ArrowInvalid, ValueError) as e:
+            logger.debug("pandas pyarrow engine failed for %s, using the C engine: %s", file_path, e)
+    return pd.read_csv(file_path, usecols=columns)
+
+
+def load_csv(file_path, schema: dict = None, columns=None):
     """
     Load a CSV file into a DataFrame with error handling and validation.
+    The CSV is converted to a Parquet sibling on first load and read from there afterwards;
+    a .parquet path (as written by the generators with --format parquet) is read directly.
 
     Args:
         file_path (str): Path to the CSV file
+        schema (dict): Optional stage schema used to fix column types
+        columns (list): Optional subset of columns to read
 
     Returns:
         pd.DataFrame: Loaded DataFrame
@@ -66,19 +273,30 @@ def load_csv(file_path):
         raise FileNotFoundError(f"CSV file not found: {file_path}")
 
     try:
-        df = pd.read_csv(file_path)
-        logger.info(f"Successfully loaded CSV: {file_path}")
+        if file_path.endswith(".parquet"):
+            table = pq.read_table(file_path, columns=columns, memory_map=True)
+            df = table.to_pandas(self_destruct=True, split_blocks=True)
+        elif USE_PYARROW_ENGINE:
+            try:
+                parquet_path = _ensure_parquet(file_path, schema)
+                table = pq.read_table(parquet_path, columns=columns, memory_map=True)
+                df = table.to_pandas(self_destruct=True, split_blocks=True)
+            except (pa.ArrowInvalid, OSError) as e:
+                logger.warning(f"⚠️ Parquet cache unavailable for {file_path}, falling back to pandas: {e}")
+                df = _pandas_read_csv(file_path, columns)
+        else:
+            df = _pandas_read_csv(file_path, columns)
+        logger.info("Successfully loaded CSV: %s", file_path)
 
         # Ensure the loaded object is a DataFrame
         if isinstance(df, pd.Series):
             raise TypeError(f"Loaded object is a Series, expected a DataFrame: {file_path}")
 
         # Log DataFrame structure
-        logger.debug(f"Loaded DataFrame shape: {df.shape}")
-        logger.debug(f"Loaded DataFrame columns: {list(df.columns)}")
-
-        # Debug log to trace data structure
-        logger.debug(f"Loaded data structure: {df.dtypes}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Loaded DataFrame shape: %s", df.shape)
+            logger.debug("Loaded DataFrame columns: %s", list(df.columns))
+            logger.debug("Loaded data structure: %s", df.dtypes)
 
         # Validate DataFrame structure
         if df.empty:
@@ -92,24 +310,107 @@ def load_csv(file_path):
         raise
 
 
+# -------------------------------
+# Timestamp Parser
+# -------------------------------
+def parse_timestamps(series: pd.Series):
+    """Parse a timestamp column with an explicit format instead of per-string inference."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    try:
+        return pd.to_datetime(series, format=TIMESTAMP_FORMAT, cache=True, errors="raise")
+    except ValueError:
+        return pd.to_datetime(series, format="ISO8601", cache=True, errors="raise")
+
+
+def timestamps_parseable(series: pd.Series):
+    """Check that a timestamp column parses as ISO 8601 without building a datetime64 Series."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return True
+    try:
+        arr = pa.array(series.to_numpy(dtype=object), type=pa.string(), from_pandas=True)
+        pc.cast(arr, pa.timestamp("us"))
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return False
+    return True
+
+
+# -------------------------------
+# Directory Listing
+# -------------------------------
+def _list_csvs(directory, prefix="", suffix=".csv"):
+    """List CSV files in a directory whose names match prefix/suffix, using one scandir pass."""
+    with os.scandir(directory) as it:
+        return [e.path for e in it
+                if e.name.startswith(prefix) and e.name.endswith(suffix) and e.is_file(follow_symlinks=False)]
+
+
+def _list_data_files(directory, prefix=""):
+    """
+    List the CSV files in a directory plus any Parquet files written directly (not as a CSV's cache).
+    A Parquet file with a CSV of the same name beside it is the loader's own cache and is skipped.
+    """
+    with os.scandir(directory) as it:
+        names = {e.name: e.path for e in it if e.name.startswith(prefix) and e.is_file(follow_symlinks=False)}
+    csvs = [path for name, path in names.items() if name.endswith(".csv")]
+    parquets = [path for name, path in names.items()
+                if name.endswith(".parquet") and name[:-len(".parquet")] + ".csv" not in names]
+    return csvs + parquets
+
+
+def _list_stage_dirs(directory):
+    """List the stage* subdirectories of a run directory."""
+    with os.scandir(directory) as it:
+        return [e.path for e in it if e.name.startswith("stage") and e.is_dir()]
+
+
+def _latest_run_dir(base_dir):
+    """Return the lexicographically latest timestamped folder inside base_dir."""
+    with os.scandir(base_dir) as it:
+        latest = max((e for e in it if e.is_dir() and not e.name.startswith(".")),
+                     key=operator.attrgetter("name"), default=None)
+    if latest is None:
+        raise FileNotFoundError(f"No timestamped folders found in {base_dir}")
+    return latest.path
+
+
+# -------------------------------
+# Parallel CSV Loader
+# -------------------------------
+def load_csvs_parallel(csv_files, max_workers=8):
+    """
+    Load several CSV files concurrently; Arrow parses outside the GIL so files overlap.
+
+    Args:
+        csv_files (list): Paths to the CSV files
+        max_workers (int): Upper bound on worker threads
+
+    Returns:
+        dict: Dictionary with keys as file base names and values as DataFrames, in input order.
+    """
+    if not csv_files:
+        return {}
+    names = [os.path.splitext(os.path.basename(p))[0] for p in csv_files]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(csv_files))) as ex:
+        frames = list(ex.map(load_csv, csv_files))
+    return dict(zip(names, frames))
+
+
 # -------------------------------
 # Schema Validator
 # -------------------------------
 def validate_schema(df: pd.DataFrame, schema: dict):
     """Validate DataFrame against schema fields."""
-    required_cols = [f["name"] for f in schema["fields"]]
-    missing = set(required_cols) - set(df.columns)
+    required_cols = schema_columns(schema)
+    missing = frozenset(required_cols).difference(df.columns.values)
     if missing:
-        print(f"DEBUG: Required columns: {required_cols}")
-        print(f"DEBUG: DataFrame columns: {list(df.columns)}")
+        logger.debug("Required columns: %s", required_cols)
+        logger.debug("DataFrame columns: %s", list(df.columns))
         return False, f"Missing columns: {missing}"
 
     # Validate timestamp
-    if "timestamp" in df.columns:
-        try:
-            pd.to_datetime(df["timestamp"])
-        except Exception:
-            return False, "Timestamp parse error"
+    if "timestamp" in df.columns and not timestamps_parseable(df["timestamp"]):
+        return False, "Timestamp parse error"
 
     return True, "OK"
 
@@ -119,7 +420,7 @@ def validate_schema(df: pd.DataFrame, schema: dict):
 # -------------------------------
 def load_stage_data(stage_dir):
     """
-    Load all CSV files from a specific stage directory.
+    Load all CSV (and standalone Parquet) files from a specific stage directory.
 
     Args:
         stage_dir (str): Path to the stage folder.
@@ -128,14 +429,12 @@ def load_stage_data(stage_dir):
         dict: Dictionary with keys as file base names and values as DataFrames.
     """
     datasets = {}
-    csv_files = glob.glob(os.path.join(stage_dir, "*.csv"))
+    csv_files = _list_data_files(stage_dir)
 
     if not csv_files:
-        raise FileNotFoundError(f"No CSV files found in {stage_dir}")
+        raise FileNotFoundError(f"No CSV or Parquet files found in {stage_dir}")
 
-    for file_path in csv_files:
-        base_name = os.path.splitext(os.path.basename(file_path))[0]
-        datasets[base_name] = load_csv(file_path)
+    datasets.update(load_csvs_parallel(csv_files))
 
     return datasets
 
@@ -154,41 +453,26 @@ def load_all_stages(base_dir=DEFAULT_BASE_DIR):
         dict: Nested dictionary with stage names as keys and DataFrame dicts as values.
               Example: data["stage1_raw_materials"]["stage1_raw_materials"]
     """
-    print(f"load_all_stages received base_dir: {base_dir}")
-    print("load_all_stages function execution started")
     # Find latest timestamped folder
-    timestamp_folders = sorted(glob.glob(os.path.join(base_dir, "*")))
-    if not timestamp_folders:
-        raise FileNotFoundError(f"No timestamped folders found in {base_dir}")
+    latest_folder = _latest_run_dir(base_dir)
+    logger.info("Loading data from latest run: %s", latest_folder)
 
-    latest_folder = timestamp_folders[-1]
-    print(f"[INFO] Loading data from latest run: {latest_folder}")
-
-    stage_dirs = [d for d in glob.glob(os.path.join(latest_folder, "stage*")) if os.path.isdir(d)]
+    stage_dirs = _list_stage_dirs(latest_folder)
     if not stage_dirs:
-        logger.warning(f"⚠️ No stage directories found in {latest_folder}. Loading CSV files directly.")
-        csv_files = glob.glob(os.path.join(latest_folder, "*.csv"))
-        all_data = {}
-        for csv_file in csv_files:
-            stage_name = os.path.splitext(os.path.basename(csv_file))[0]
-            all_data[stage_name] = pd.read_csv(csv_file)
-            logger.debug(f"Loaded CSV file: {csv_file}, Rows: {len(all_data[stage_name])}, Columns: {len(all_data[stage_name].columns)}")
-            logger.debug(f"DataFrame structure for {stage_name}: {all_data[stage_name].dtypes}")
+        logger.warning(f"⚠️ No stage directories found in {latest_folder}. Loading data files directly.")
+        data_files = _list_data_files(latest_folder)
+        all_data = load_csvs_parallel(data_files)
+        if logger.isEnabledFor(logging.DEBUG):
+            for stage_name, df in all_data.items():
+                logger.debug("Loaded CSV file: %s, Rows: %d, Columns: %d", stage_name, len(df), len(df.columns))
+                logger.debug("DataFrame structure for %s: %s", stage_name, df.dtypes)
         return {k: v for k, v in all_data.items() if isinstance(v, pd.DataFrame)}
 
-    all_data = {}
-    for stage_dir in stage_dirs:
-        stage_name = os.path.basename(stage_dir)
-        print(f"[INFO] Loading {stage_name} ...")
-        all_data[stage_name] = load_stage_data(stage_dir)
+    with ThreadPoolExecutor(max_workers=min(8, len(stage_dirs))) as ex:
+        all_data = dict(zip([os.path.basename(d) for d in stage_dirs], ex.map(load_stage_data, stage_dirs)))
 
     # Ensure all_data contains only DataFrames
     all_data = {k: v for k, v in all_data.items() if isinstance(v, pd.DataFrame)}
-
-    print(f"All loaded data: {all_data}")
-    print(f"load_all_stages output: {all_data}")
-    print(f"Final output of load_all_stages: {all_data}")
-    print(f"Returning from load_all_stages with data: {all_data}")
     return all_data
 
 
@@ -207,27 +491,21 @@ def load_scenario(base_dir=DEFAULT_BASE_DIR, scenario="normal"):
     Returns:
         dict: Nested dictionary with stage names as keys and DataFrame dicts as values.
     """
-    timestamp_folders = sorted(glob.glob(os.path.join(base_dir, "*")))
-    if not timestamp_folders:
-        raise FileNotFoundError(f"No timestamped folders found in {base_dir}")
+    latest_folder = _latest_run_dir(base_dir)
+    logger.info("Loading scenario '%s' from: %s", scenario, latest_folder)
 
-    latest_folder = timestamp_folders[-1]
-    print(f"[INFO] Loading scenario '{scenario}' from: {latest_folder}")
-
-    stage_dirs = [d for d in glob.glob(os.path.join(latest_folder, "stage*")) if os.path.isdir(d)]
+    stage_dirs = _list_stage_dirs(latest_folder)
     all_data = {}
 
     for stage_dir in stage_dirs:
         stage_name = os.path.basename(stage_dir)
         datasets = {}
-        csv_files = glob.glob(os.path.join(stage_dir, f"*_{scenario}.csv"))
+        csv_files = _list_csvs(stage_dir, suffix=f"_{scenario}.csv")
         if not csv_files:
-            print(f"[WARN] No {scenario} files found in {stage_dir}, skipping...")
+            logger.warning("No %s files found in %s, skipping...", scenario, stage_dir)
             continue
 
-        for file_path in csv_files:
-            base_name = os.path.splitext(os.path.basename(file_path))[0]
-            datasets[base_name] = load_csv(file_path)
+        datasets.update(load_csvs_parallel(csv_files))
 
         if datasets:
             all_data[stage_name] = datasets
@@ -250,20 +528,18 @@ def validate(df, schema):
         tuple: (bool, str) Validation status and message.
     """
     # Check all required columns exist
-    cols = [f['name'] for f in schema['fields']]
-    missing = set(cols) - set(df.columns)
+    missing = frozenset(schema_columns(schema)).difference(df.columns.values)
     if missing:
         return False, f"Missing columns: {missing}"
 
     # Check for totally empty columns
-    empty_cols = [col for col in df.columns if df[col].dropna().empty]
+    has_any = df.notna().any(axis=0)
+    empty_cols = has_any.index[~has_any.values].tolist()
     if empty_cols:
         return False, f"Empty columns: {empty_cols}"
 
     # Try to parse timestamp
-    try:
-        pd.to_datetime(df['timestamp'])
-    except Exception as e:
+    if 'timestamp' not in df.columns or not timestamps_parseable(df['timestamp']):
         return False, "Timestamp parse error"
 
     return True, "OK"
@@ -274,36 +550,27 @@ def validate(df, schema):
 # -------------------------------
 def load_stage_files(run_dir: str):
     """
-    Load all stage CSV files in run_dir, validate against schema.
+    Load all stage CSV (and standalone Parquet) files in run_dir, validate against schema.
     Returns dict {stage_name: DataFrame}.
     """
-    files = glob.glob(os.path.join(run_dir, "stage*.csv"))
+    files = _list_data_files(run_dir, prefix="stage")
     datasets = {}
 
     if not files:
-        raise FileNotFoundError(f"No stage CSV files found in {run_dir}")
-
-    # Dynamically load all schemas
-    schema_dir = "data/synthetic/schema"
-    schema_files = glob.glob(os.path.join(schema_dir, "*_schema.json"))
-    schema_mapping = {
-        os.path.splitext(os.path.basename(f))[0].replace("_schema", ""): f
-        for f in schema_files
-    }
+        raise FileNotFoundError(f"No stage CSV or Parquet files found in {run_dir}")
 
     for f in files:
         stage_name = os.path.splitext(os.path.basename(f))[0]
         stage_name = stage_name.split('_default')[0]
 
-        if stage_name not in schema_mapping:
+        schema_path = _SCHEMA_FILE_MAP.get(stage_name)
+        if schema_path is None:
             logger.warning(f"No schema found for stage: {stage_name}. Skipping validation.")
             continue
 
-        schema_path = schema_mapping[stage_name]
-        with open(schema_path, "r") as schema_file:
-            schema = json.load(schema_file)
+        schema = _load_schema_file(schema_path)
 
-        df = pd.read_csv(f)
+        df = load_csv(f, schema)
         ok, msg = validate_schema(df, schema)
         if not ok:
             logger.warning(f"Validation failed for {stage_name}: {msg}. Proceeding without validation.")
@@ -319,7 +586,7 @@ if __name__ == "__main__":
     csv_path = "data/synthetic/raw/2025-09-17_23-10-01/stage1_raw_materials.csv"
 
     schema = json.load(open(schema_path))
-    df = pd.read_csv(csv_path)
+    df = _pandas_read_csv(csv_path)
 
     validation_status, message = validate(df, schema)
     print(validation_status, message)
@@ -8,38 +8,73 @@ DataFrames ready for ML or dashboard consumption.
 """
 
 import logging
-import sys
 import os
 from pathlib import Path
 
-# Add the project root directory to PYTHONPATH
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
-
-from src.data_pipeline.loaders import load_all_stages, load_scenario
-from src.data_pipeline.transformers import (
+from .loaders import load_all_stages, load_scenario, load_csv, parse_timestamps, _list_data_files, _list_stage_dirs
+from .transformers import (
     add_time_features,
-    fill_missing_values,
-    clip_outliers,
     normalize_features,
     create_kpis,
+    _fit_scaler,
 )
-from src.data_pipeline.schemas import SCHEMAS  # schema dict per stage
+from ._kernels import affine_fill_inplace, clip_inplace
+from .schemas import SCHEMAS, SCHEMA_COLUMNS, SCHEMA_COLUMN_LISTS, VALIDATORS  # schema dict per stage
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 import json
-import joblib
-from glob import glob
+import pickle
 
 # -------------------------------
 # Logger Setup
 # -------------------------------
 logging.basicConfig(
-    level=logging.DEBUG,
+    level=logging.INFO,
     format="%(asctime)s [%(levelname)s] %(message)s",
 )
 logger = logging.getLogger(__name__)
 
-# Enhanced logging for debugging
-logger.setLevel(logging.DEBUG)  # Set logging level to DEBUG
+
+# -------------------------------
+# Summary Statistics
+# -------------------------------
+def _fast_describe(df: pd.DataFrame):
+    """
+    Compute describe()-style statistics for numeric columns with NumPy reductions.
+
+    Args:
+        df (pd.DataFrame): Input DataFrame
+
+    Returns:
+        dict: {column: {"count", "mean", "std", "min", "25%", "50%", "75%", "max"}}
+    """
+    numeric = df.select_dtypes("number")
+    if numeric.empty:
+        return {}
+    values = numeric.to_numpy(dtype=np.float32, copy=False)
+
+    count = np.count_nonzero(~np.isnan(values), axis=0)
+    mean = np.nanmean(values, axis=0, dtype=np.float64)
+    std = np.nanstd(values, axis=0, dtype=np.float64, ddof=1)
+    q25, q50, q75 = np.nanpercentile(values, [25, 50, 75], axis=0)
+    minimum = np.nanmin(values, axis=0)
+    maximum = np.nanmax(values, axis=0)
+
+    return {
+        col: {
+            "count": float(count[i]),
+            "mean": float(mean[i]),
+            "std": float(std[i]),
+            "min": float(minimum[i]),
+            "25%": float(q25[i]),
+            "50%": float(q50[i]),
+            "75%": float(q75[i]),
+            "max": float(maximum[i]),
+        }
+        for i, col in enumerate(numeric.columns)
+    }
 
 
 # -------------------------------
@@ -60,21 +95,14 @@ def validate_schema(df: pd.DataFrame, stage: str):
     if stage not in SCHEMAS:
         raise ValueError(f"Schema for stage '{stage}' not found.")
 
-    schema = SCHEMAS[stage]
-    expected_columns = schema.get("columns", [])
+    expected_columns = SCHEMA_COLUMNS[stage]
 
     # Ensure input is a DataFrame
     if not isinstance(df, pd.DataFrame):
         raise TypeError(f"Input data for stage '{stage}' must be a DataFrame, got {type(df)}")
 
-    # Ensure all columns are DataFrame-compatible
-    for col in df.columns:
-        if isinstance(df[col], pd.Series):
-            # Ensure column is part of the DataFrame without converting to a single-column DataFrame
-            df[col] = pd.DataFrame(df[col]) if len(df[col].shape) == 1 else df[col]
-
     # Check for missing columns
-    missing_columns = [col for col in expected_columns if col not in df.columns]
+    missing_columns = expected_columns.difference(df.columns.values)
     if missing_columns:
         raise ValueError(f"Missing columns in DataFrame for stage '{stage}': {missing_columns}")
 
@@ -84,21 +112,21 @@ def validate_schema(df: pd.DataFrame, stage: str):
         logger.warning(f"Extra columns in DataFrame for stage '{stage}': {extra_columns}")
 
     # Check for empty columns
-    empty_columns = [col for col in df.columns if df[col].dropna().empty]
+    has_any = df.notna().any(axis=0)
+    empty_columns = has_any.index[~has_any.values].tolist()
     if empty_columns:
         raise ValueError(f"Empty columns in DataFrame for stage '{stage}': {empty_columns}")
 
     # Validate timestamp format
     if "timestamp" in df.columns:
         try:
-            pd.to_datetime(df["timestamp"])
+            df["timestamp"] = parse_timestamps(df["timestamp"])
         except Exception as e:
             raise ValueError(f"Timestamp parse error in stage '{stage}': {e}")
 
     logger.info(f"[{stage}] Schema validation passed ✅")
-    logger.debug(f"[{stage}] DataFrame structure after validation: {df.dtypes}")
-    logger.debug(f"Schema validation input data type: {type(df)}")
-    logger.debug(f"Schema validation input data columns: {df.columns if isinstance(df, pd.DataFrame) else 'N/A'}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[%s] DataFrame structure after validation: %s", stage, df.dtypes)
     return True
 
 
@@ -120,18 +148,21 @@ def preprocess_single(df: pd.DataFrame, stage: str, normalize_method: str = "min
     Returns:
         pd.DataFrame: Preprocessed DataFrame.
     """
-    # Validate schema
-    validate_schema(df, stage)
+    # Validate schema: precompiled fast check first, detailed validation (and error reporting) otherwise
+    validator = VALIDATORS.get(stage)
+    if validator is None or not isinstance(df, pd.DataFrame) or not validator(df):
+        validate_schema(df, stage)
     assert isinstance(df, pd.DataFrame), f"[{stage}] Schema validation did not return a DataFrame"
 
-    logger.debug(f"[{stage}] Initial DataFrame: Rows={len(df)}, Columns={len(df.columns)}")
-    logger.debug(f"Preprocessing stage: {stage}, initial DataFrame structure: {df.dtypes}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[%s] Initial DataFrame: Rows=%d, Columns=%d", stage, len(df), len(df.columns))
+        logger.debug("Preprocessing stage: %s, initial DataFrame structure: %s", stage, df.dtypes)
 
     # Add engineered features
     try:
         df = add_time_features(df)
         assert isinstance(df, pd.DataFrame), f"[{stage}] Adding time features did not return a DataFrame"
-        logger.debug(f"[{stage}] After adding time features: Rows={len(df)}, Columns={len(df.columns)}")
+        logger.debug("[%s] After adding time features: Rows=%d, Columns=%d", stage, len(df), len(df.columns))
     except Exception as e:
         logger.error(f"Error adding time features for stage {stage}: {e}")
         raise
@@ -140,28 +171,68 @@ def preprocess_single(df: pd.DataFrame, stage: str, normalize_method: str = "min
     try:
         df, _ = normalize_features(df, method=normalize_method)
         assert isinstance(df, pd.DataFrame), f"[{stage}] Normalization did not return a DataFrame"
-        logger.debug(f"[{stage}] After normalization: Rows={len(df)}, Columns={len(df.columns)}")
+        logger.debug("[%s] After normalization: Rows=%d, Columns=%d", stage, len(df), len(df.columns))
     except Exception as e:
         logger.error(f"Error normalizing features for stage {stage}: {e}")
         raise
 
     logger.info(f"[{stage}] Preprocessing complete ✅")
-    logger.debug(f"Post-processing stage: {stage}, final DataFrame structure: {df.dtypes}")
-    logger.debug(f"Preprocessing input data type: {type(df)}")
-    logger.debug(f"Preprocessing input data columns: {df.columns if isinstance(df, pd.DataFrame) else 'N/A'}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Post-processing stage: %s, final DataFrame structure: %s", stage, df.dtypes)
     return df
 
 
+# -------------------------------
+# Parquet Writer
+# -------------------------------
+def _write_parquet(df: pd.DataFrame, path: str):
+    """Write a DataFrame to Parquet with zstd compression, dictionary encoding and column statistics."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pq.write_table(table, path, compression="zstd", compression_level=3, use_dictionary=True,
+                   write_statistics=True, row_group_size=131072)
+
+
+# -------------------------------
+# Scaler Artifacts
+# -------------------------------
+def save_scaler(scaler, path: str):
+    """
+    Pickle a fitted scaler with protocol 5, keeping its NumPy buffers out-of-band in an Arrow IPC sidecar.
+
+    Args:
+        scaler: Fitted scaler (or any picklable object)
+        path (str): Destination pickle path; buffers are written to ``path + ".arrow"``
+    """
+    buffers = []
+    with open(path, "wb") as f:
+        pickle.dump(scaler, f, protocol=5, buffer_callback=buffers.append)
+
+    column = pa.array([buf.raw() for buf in buffers], type=pa.binary())
+    batch = pa.record_batch([column], names=["buffer"])
+    with pa.OSFile(path + ".arrow", "wb") as sink, pa.ipc.new_file(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+
+
+def load_scaler(path: str):
+    """Load a scaler written by save_scaler, memory-mapping its out-of-band buffers."""
+    with pa.memory_map(path + ".arrow") as source:
+        column = pa.ipc.open_file(source).read_all().column("buffer")
+        buffers = [value.as_buffer() for value in column]
+    with open(path, "rb") as f:
+        return pickle.load(f, buffers=buffers)
+
+
 # -------------------------------
 # Save Preprocessed Data
 # -------------------------------
-def save_preprocessed_data(preprocessed_data, scalers):
+def save_preprocessed_data(preprocessed_data, scalers, emit_csv=False):
     """
     Save preprocessed datasets, statistics, and scalers to the processed directory.
 
     Args:
         preprocessed_data (dict): Dictionary of preprocessed DataFrames.
         scalers (dict): Dictionary of scalers used for normalization.
+        emit_csv (bool): Also write a CSV copy next to each Parquet file.
     """
     try:
         # Directory for processed data
@@ -170,12 +241,13 @@ def save_preprocessed_data(preprocessed_data, scalers):
         SCALERS_DIR = os.path.abspath(os.path.join(os.getcwd(), "artifacts/scalers"))
         os.makedirs(SCALERS_DIR, exist_ok=True)
 
-        logger.debug(f"Processed directory: {PROCESSED_DIR}")
-        logger.debug(f"Preprocessed data to save: {list(preprocessed_data.keys())}")
+        logger.debug("Processed directory: %s", PROCESSED_DIR)
+        logger.debug("Preprocessed data to save: %s", list(preprocessed_data))
 
         for stage, df in preprocessed_data.items():
             # Log DataFrame structure before saving
-            logger.debug(f"Saving DataFrame for {stage}: Shape: {df.shape}, Columns: {list(df.columns)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Saving DataFrame for %s: Shape: %s, Columns: %s", stage, df.shape, list(df.columns))
 
             # Validate DataFrame structure
             if df.empty:
@@ -183,24 +255,25 @@ def save_preprocessed_data(preprocessed_data, scalers):
                 continue
 
             # Ensure DataFrame matches schema
-            expected_columns = SCHEMAS.get(stage, {}).get("columns", [])
+            expected_columns = SCHEMA_COLUMN_LISTS.get(stage, [])
             missing_columns = [col for col in expected_columns if col not in df.columns]
             if missing_columns:
                 logger.error(f"❌ Missing columns in DataFrame for {stage}: {missing_columns}. Skipping save.")
                 continue
 
-            # Save processed CSV
-            csv_path = os.path.join(PROCESSED_DIR, f"{stage}_processed.csv")
-            df.to_csv(csv_path, index=False)
-            logger.info(f"✅ Saved preprocessed CSV for {stage} at {csv_path}")
+            # Save processed CSV (optional)
+            if emit_csv:
+                csv_path = os.path.join(PROCESSED_DIR, f"{stage}_processed.csv")
+                df.to_csv(csv_path, index=False)
+                logger.info(f"✅ Saved preprocessed CSV for {stage} at {csv_path}")
 
             # Save processed Parquet
             parquet_path = os.path.join(PROCESSED_DIR, f"{stage}_processed.parquet")
-            df.to_parquet(parquet_path, index=False)
+            _write_parquet(df, parquet_path)
             logger.info(f"✅ Saved preprocessed Parquet for {stage} at {parquet_path}")
 
             # Save statistics
-            stats = df.describe().to_dict()
+            stats = _fast_describe(df)
             stats_path = os.path.join(PROCESSED_DIR, f"{stage}_stats.json")
             with open(stats_path, "w") as stats_file:
                 json.dump(stats, stats_file)
@@ -208,76 +281,106 @@ def save_preprocessed_data(preprocessed_data, scalers):
 
             # Save scaler
             if stage in scalers:
-                scaler_path = os.path.join(SCALERS_DIR, f"{stage}_scaler.joblib")
-                joblib.dump(scalers[stage], scaler_path)
+                scaler_path = os.path.join(SCALERS_DIR, f"{stage}_scaler.pkl")
+                save_scaler(scalers[stage], scaler_path)
                 logger.info(f"✅ Saved scaler for {stage} at {scaler_path}")
     except Exception as e:
         logger.error(f"Error saving preprocessed data: {e}")
         raise
 
 
+# -------------------------------
+# Fused Transform
+# -------------------------------
+def _apply_all(df: pd.DataFrame, normalize_method: str = "minmax",
+               lower_percentile: float = 1, upper_percentile: float = 99):
+    """
+    Apply time features, normalization, mean fill, outlier clipping and KPIs to a DataFrame.
+    Equivalent to add_time_features -> normalize_features -> fill_missing_values(method="mean")
+    -> clip_outliers -> create_kpis, but the numeric columns are extracted once and transformed
+    in place instead of copying the frame for every step.
+
+    Args:
+        df (pd.DataFrame): Input DataFrame
+        normalize_method (str): Scaling method, "minmax" or "standard"
+        lower_percentile (float): Lower percentile for clipping
+        upper_percentile (float): Upper percentile for clipping
+
+    Returns:
+        tuple: (Transformed DataFrame, fitted scaler)
+    """
+    df = add_time_features(df)
+    numeric_cols = df.select_dtypes(include=[np.number]).columns
+    if len(numeric_cols) == 0:
+        raise ValueError("⛔ No numeric columns found for normalization")
+
+    if normalize_method not in ("minmax", "standard"):
+        raise ValueError("Unsupported normalization method: choose 'minmax' or 'standard'")
+
+    values = df[numeric_cols].to_numpy(dtype=np.float64, copy=True)
+    scaler = _fit_scaler(values, normalize_method)
+    fills = (np.nanmean(values, axis=0) - scaler.offset) * scaler.scale
+    affine_fill_inplace(values, scaler.offset, scaler.scale, fills)
+
+    lower_bounds, upper_bounds = np.percentile(values, [lower_percentile, upper_percentile], axis=0)
+    clip_inplace(values, lower_bounds, upper_bounds)
+
+    df[numeric_cols] = values
+    return create_kpis(df), scaler
+
+
 # -------------------------------
 # Full Preprocessing Pipeline
 # -------------------------------
-def get_preprocessed_data(data_dir: str = "../data/synthetic/raw", normalize_method: str = "minmax"):
+def get_preprocessed_data(data_dir="../data/synthetic/raw", normalize_method="minmax", emit_csv=False):
     """
-    Load all synthetic datasets, apply schema validation, 
-    feature engineering, and normalization.
+    Preprocess data from a given directory.
 
     Args:
-        data_dir (str): Directory where synthetic CSVs are stored.
-        normalize_method (str): Scaling method, "minmax" or "standard".
+        data_dir (str): Path to the directory containing raw data.
+        normalize_method (str): Method for scaling numeric features ('minmax' or 'standard').
+        emit_csv (bool): Also write a CSV copy next to each Parquet file.
 
     Returns:
-        dict: Dictionary of preprocessed DataFrames with keys as dataset names.
+        dict: Dictionary of preprocessed DataFrames for each stage.
     """
-    print("get_preprocessed_data function called")
-    print("get_preprocessed_data function execution started")
-    try:
-        # Ensure raw data directory exists
-        if not os.path.exists(data_dir):
-            os.makedirs(data_dir)
-            logger.warning(f"⚠️ Raw data directory created: {data_dir}")
-
-        logger.debug(f"Checking raw data directory: {data_dir}")
-        print("Invoking load_all_stages function")
-        print(f"Arguments for load_all_stages: data_dir={data_dir}")
-        datasets = load_all_stages(data_dir)  # Updated function call
-        print(f"Loaded datasets: {list(datasets.keys())}")
-        print(f"Data returned by load_all_stages: {datasets}")
+    processed_data = {}
+    stage_dirs = _list_stage_dirs(data_dir)
+    if stage_dirs:
+        stage_files = [(os.path.basename(d), f) for d in stage_dirs for f in _list_data_files(d)]
+    else:
+        # run_all's layout: one file per stage directly in the run folder, named after its stage
+        stage_files = [(os.path.splitext(os.path.basename(f))[0], f)
+                       for f in _list_data_files(data_dir, prefix="stage")]
 
-        preprocessed = {}
-        scalers = {}
-        for name, df in datasets.items():
-            logger.debug(f"Processing dataset: {name}, Rows: {len(df)}, Columns: {len(df.columns)}")
-            print(f"Processing dataset: {name}, Rows: {len(df)}, Columns: {len(df.columns)}")
-            print(f"Iterating over dataset: {name}")
-            preprocessed[name], scalers[name] = preprocess_single(df, stage=name, normalize_method=normalize_method)
-
-        logger.info("✅ All datasets preprocessed successfully")
-
-        # Debug logging of preprocessed data
-        logger.debug(f"Preprocessed data keys: {list(preprocessed.keys())}")
-        print(f"Preprocessed data keys: {list(preprocessed.keys())}")
-        for name, df in preprocessed.items():
-            logger.debug(f"Dataset: {name}, Rows: {len(df)}, Columns: {len(df.columns)}")
-            print(f"Dataset: {name}, Rows: {len(df)}, Columns: {len(df.columns)}")
-
-        # Save preprocessed data
-        print("Calling save_preprocessed_data function")
-        save_preprocessed_data(preprocessed, scalers)
-
-        # Log the output directory and file paths
-        logger.info(f"Saving processed files to directory: {output_dir}")
-        for file_name in os.listdir(output_dir):
-            logger.info(f"File saved: {file_name}")
-
-        print("get_preprocessed_data function completed")
-        print("get_preprocessed_data is returning early")
-        return preprocessed
-    except Exception as e:
-        logger.error(f"Error in preprocessing data: {e}")
-        raise
+    for stage_name, file_path in stage_files:
+        df = load_csv(file_path)
+
+        # Apply transformations
+        df, scaler = _apply_all(df, normalize_method=normalize_method)
+
+        # Save processed data
+        output_base = os.path.join("data/synthetic/processed/", os.path.basename(data_dir), stage_name)
+        os.makedirs(os.path.dirname(output_base), exist_ok=True)
+        if emit_csv:
+            df.to_csv(f"{output_base}_processed.csv", index=False)
+        _write_parquet(df, f"{output_base}_processed.parquet")
+        logger.info(f"✅ Processed data saved to {output_base}_processed.parquet")
+
+        # Save stats
+        stats = _fast_describe(df)
+        stats_path = f"{output_base}_stats.json"
+        with open(stats_path, "w") as stats_file:
+            json.dump(stats, stats_file)
+
+        # Save scaler
+        scaler_path = os.path.join("artifacts/scalers", f"{stage_name}_scaler.pkl")
+        os.makedirs(os.path.dirname(scaler_path), exist_ok=True)
+        save_scaler(scaler, scaler_path)
+
+        processed_data[stage_name] = df
+
+    return processed_data
 
 
 # -------------------------------
@@ -314,56 +417,6 @@ def get_preprocessed_scenario(
         raise
 
 
-def get_preprocessed_data(data_dir, normalize_method="minmax"):
-    """
-    Preprocess data from a given directory.
-
-    Args:
-        data_dir (str): Path to the directory containing raw data.
-        normalize_method (str): Method for scaling numeric features ('minmax' or 'standard').
-
-    Returns:
-        dict: Dictionary of preprocessed DataFrames for each stage.
-    """
-    processed_data = {}
-    stage_dirs = glob(os.path.join(data_dir, "stage*"))
-
-    for stage_dir in stage_dirs:
-        stage_name = os.path.basename(stage_dir)
-        csv_files = glob(os.path.join(stage_dir, "*.csv"))
-
-        for file_path in csv_files:
-            df = pd.read_csv(file_path)
-
-            # Apply transformations
-            df = add_time_features(df)
-            df, scaler = normalize_features(df, method=normalize_method)
-            df = fill_missing_values(df, strategy="mean")
-            df = clip_outliers(df, columns=df.select_dtypes(include=["number"]).columns)
-            df = create_kpis(df)
-
-            # Save processed data
-            output_path = os.path.join("data/synthetic/processed/", os.path.basename(data_dir), f"{stage_name}_processed.csv")
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            df.to_csv(output_path, index=False)
-            logger.info(f"✅ Processed data saved to {output_path}")
-
-            # Save stats
-            stats = df.describe().to_dict()
-            stats_path = output_path.replace("_processed.csv", "_stats.json")
-            with open(stats_path, "w") as stats_file:
-                json.dump(stats, stats_file)
-
-            # Save scaler (if applicable)
-            scaler_path = os.path.join("artifacts/scalers", f"{stage_name}_scaler.joblib")
-            os.makedirs(os.path.dirname(scaler_path), exist_ok=True)
-            joblib.dump(df.select_dtypes(include=["number"]).columns, scaler_path)
-
-            processed_data[stage_name] = df
-
-    return processed_data
-
-
 # -------------------------------
 # Main Entry Point
 # -------------------------------
@@ -385,15 +438,11 @@ if __name__ == "__main__":
     os.makedirs(output_dir, exist_ok=True)
 
     # Load datasets
-    from src.data_pipeline.loaders import load_all_stages, load_stage_data
+    from .loaders import load_all_stages, load_stage_data, _latest_run_dir
 
     if args.stage:
         # Find the latest timestamped folder
-        timestamp_folders = sorted(glob(os.path.join(args.data_dir, "*")))
-        if not timestamp_folders:
-            raise FileNotFoundError(f"No timestamped folders found in {args.data_dir}")
-
-        latest_folder = timestamp_folders[-1]
+        latest_folder = _latest_run_dir(args.data_dir)
         stage_dir = os.path.join(latest_folder, args.stage)
         if not os.path.exists(stage_dir):
             raise FileNotFoundError(f"Stage directory not found: {stage_dir}")
@@ -404,7 +453,7 @@ if __name__ == "__main__":
         datasets = load_all_stages(args.data_dir)
 
     # Process and save each dataset
-    from src.data_pipeline.transformers import transform_pipeline
+    from .transformers import transform_pipeline
 
     for stage, data_dict in datasets.items():
         for file_name, df in data_dict.items():
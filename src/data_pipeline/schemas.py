@@ -2,6 +2,8 @@ import os
 import json
 import logging
 
+import pandas as pd
+
 # Logger setup
 logging.basicConfig(
     level=logging.INFO,
@@ -15,12 +17,48 @@ SCHEMAS = {}
 
 try:
     # Dynamically load all JSON schema files from the schema directory
-    for schema_file in os.listdir(SCHEMA_DIR):
-        if schema_file.endswith("_schema.json"):
-            stage_name = schema_file.replace("_schema.json", "")
-            with open(os.path.join(SCHEMA_DIR, schema_file), "r") as f:
+    for entry in os.scandir(SCHEMA_DIR):
+        if entry.name.endswith("_schema.json"):
+            stage_name = entry.name.replace("_schema.json", "")
+            with open(entry.path, "r") as f:
                 SCHEMAS[stage_name] = json.load(f)
     logger.info("✅ All schemas loaded successfully.")
 except Exception as e:
     logger.error(f"Error loading schemas: {e}")
-    raise
\ No newline at end of file
+    raise
+
+
+def schema_columns(schema: dict):
+    """Return the ordered column names of a schema, from "columns" or else the "fields" names."""
+    if schema.get("columns"):
+        return list(schema["columns"])
+    fields = schema.get("fields", [])
+    if isinstance(fields, dict):
+        return list(fields)
+    return [f["name"] for f in fields]
+
+
+# Precomputed column lists/sets per stage so validation doesn't rebuild them for every DataFrame
+SCHEMA_COLUMN_LISTS = {stage: schema_columns(schema) for stage, schema in SCHEMAS.items()}
+SCHEMA_COLUMNS = {stage: frozenset(columns) for stage, columns in SCHEMA_COLUMN_LISTS.items()}
+
+
+def _compile_validator(schema: dict):
+    """
+    Build a fast per-stage check that all schema columns are present, none is entirely
+    empty, and the timestamp column is already parsed. Returns a function df -> bool.
+    """
+    expected = frozenset(schema_columns(schema))
+
+    def validator(df: pd.DataFrame) -> bool:
+        return (
+            expected.issubset(df.columns)
+            and ("timestamp" not in df.columns or pd.api.types.is_datetime64_any_dtype(df["timestamp"]))
+            and bool(df.notna().any(axis=0).all())
+        )
+
+    return validator
+
+
+# One precompiled validator per stage; a False result means "run the detailed validate_schema"
+VALIDATORS = {stage: _compile_validator(schema) for stage, schema in SCHEMAS.items()}
@@ -9,8 +9,18 @@ and anomaly detection.
 
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import MinMaxScaler, StandardScaler
 import logging
+import warnings
+from typing import NamedTuple, Sequence
+
+from ._kernels import (
+    affine_fill_inplace,
+    clip_inplace,
+    any_exceeds,
+    column_mean_std,
+    column_min_max,
+    column_percentiles,
+)
 
 # -------------------------------
 # Logger Setup
@@ -21,6 +31,23 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Copy-on-write: helpers take shallow copies, and column data is only copied when it is modified
+pd.set_option("mode.copy_on_write", True)
+
+# Columns created by add_time_features
+TIME_FEATURES = ("hour", "day", "weekday", "month")
+
+# (power, throughput) column pairs specific_power_consumption is derived from, first match wins:
+# the generic names, then the main drive and feed of each generated stage
+KPI_POWER_THROUGHPUT = (
+    ("mill_power_kwh", "throughput_tph"),
+    ("crusher_power_kw", "limestone_feed_tph"),        # Stage 1
+    ("mill_power_kw", "mill_feed_rate_tph"),           # Stage 2
+    ("kiln_main_drive_power_kw", "kiln_feed_tph"),     # Stage 3
+    ("cement_mill_power_kw", "clinker_feed_tph"),      # Stage 4
+    ("packing_machine_power_kw", "dispatch_rate_tph"), # Stage 5
+)
+
 
 # -------------------------------
 # Add Time-based Features
@@ -39,18 +66,34 @@ def add_time_features(df: pd.DataFrame, timestamp_col: str = "timestamp") -> pd.
     if timestamp_col not in df.columns:
         raise KeyError(f"⛔ {timestamp_col} column not found in DataFrame")
 
-    df = df.copy()
-    df[timestamp_col] = pd.to_datetime(df[timestamp_col], errors="coerce")
+    df = df.copy(deep=False)
+    # Reuse timestamps already parsed during validation
+    if not pd.api.types.is_datetime64_any_dtype(df[timestamp_col]):
+        df[timestamp_col] = pd.to_datetime(df[timestamp_col], format="ISO8601", errors="coerce")
 
-    if df[timestamp_col].isnull().any():
+    timestamps = df[timestamp_col]
+    has_invalid = timestamps.isnull().any()
+    if has_invalid:
         logger.warning(f"⚠️ Some rows have invalid timestamps in column '{timestamp_col}'")
 
-    df["hour"] = df[timestamp_col].dt.hour
-    df["day"] = df[timestamp_col].dt.day
-    df["weekday"] = df[timestamp_col].dt.weekday
-    df["month"] = df[timestamp_col].dt.month
-
-    logger.info("⏰ Time features added: [hour, day, weekday, month]")
+    if has_invalid or timestamps.dt.tz is not None:
+        # NaT rows need float NaN outputs and tz-aware stamps need local fields, so use the .dt accessor
+        df["hour"] = timestamps.dt.hour
+        df["day"] = timestamps.dt.day
+        df["weekday"] = timestamps.dt.weekday
+        df["month"] = timestamps.dt.month
+    else:
+        # Derive every field from the datetime64 values with integer arithmetic in one pass
+        values = timestamps.to_numpy()
+        days = values.astype("datetime64[D]")
+        months = values.astype("datetime64[M]")
+        df["hour"] = ((values - days) // np.timedelta64(1, "h")).astype(np.int8)
+        df["day"] = ((days - months).astype(np.int64) + 1).astype(np.int8)
+        # 1970-01-01 was a Thursday (weekday 3 with Monday=0)
+        df["weekday"] = ((days.astype(np.int64) + 3) % 7).astype(np.int8)
+        df["month"] = (months.astype(np.int64) % 12 + 1).astype(np.int8)
+
+    logger.info(f"⏰ Time features added: [{', '.join(TIME_FEATURES)}]")
     return df
 
 
@@ -69,7 +112,7 @@ def validate_and_add_time_features(df: pd.DataFrame, stage: str, timestamp_col:
     Returns:
         pd.DataFrame: Transformed DataFrame
     """
-    from src.data_pipeline.pipelines import validate_schema
+    from .pipelines import validate_schema
 
     # Validate schema
     validate_schema(df, stage)
@@ -78,34 +121,91 @@ def validate_and_add_time_features(df: pd.DataFrame, stage: str, timestamp_col:
     return add_time_features(df, timestamp_col)
 
 
+# -------------------------------
+# Column Scalers
+# -------------------------------
+class FeatureScaler(NamedTuple):
+    """Fitted per-column scaling, applied as (x - offset) * scale."""
+    method: str
+    offset: np.ndarray
+    scale: np.ndarray
+
+    def transform(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.offset) * self.scale
+
+    def inverse_transform(self, X):
+        return np.asarray(X, dtype=np.float64) / self.scale + self.offset
+
+
+def _fit_scaler(values: np.ndarray, method: str) -> FeatureScaler:
+    """
+    Fit a minmax or standard FeatureScaler on a 2-D array, ignoring NaNs.
+    Statistics match MinMaxScaler/StandardScaler, including leaving constant columns unscaled.
+    """
+    if method == "minmax":
+        minimum, maximum = column_min_max(values)
+        offset = minimum.astype(np.float64)
+        spread = maximum - offset
+    elif method == "standard":
+        offset, spread = column_mean_std(values, dtype=np.float64)
+    else:
+        raise ValueError("Unsupported scaling method: choose 'minmax' or 'standard'")
+    spread[spread < 10 * np.finfo(np.float64).eps] = 1.0
+    return FeatureScaler(method, offset, 1.0 / spread)
+
+
+# Fitted scalers kept for reuse across batches, keyed by (step, columns, method)
+_SCALER_CACHE = {}
+
+
+def _get_scaler(values: np.ndarray, step: str, columns, method: str, reuse: bool) -> FeatureScaler:
+    """Return the cached scaler for these columns when reuse is set, fitting (and caching) one otherwise."""
+    if not reuse:
+        return _fit_scaler(values, method)
+    key = (step, tuple(columns), method)
+    if key not in _SCALER_CACHE:
+        _SCALER_CACHE[key] = _fit_scaler(values, method)
+    return _SCALER_CACHE[key]
+
+
+def reset_scalers():
+    """Drop all cached scalers so the next reuse_scaler call refits on its data."""
+    _SCALER_CACHE.clear()
+
+
 # -------------------------------
 # Normalize Numeric Features
 # -------------------------------
-def normalize_features(df: pd.DataFrame, method: str = "minmax"):
+def normalize_features(df: pd.DataFrame, method: str = "minmax", reuse_scaler: bool = False,
+                       numeric_cols: Sequence[str] = None):
     """
     Normalize numeric features for ML models.
 
     Args:
         df (pd.DataFrame): Input DataFrame
         method (str): "minmax" or "standard"
+        reuse_scaler (bool): Reuse the scaler fitted by an earlier call on the same columns
+            (e.g. for streaming batches) instead of refitting; see reset_scalers()
+        numeric_cols (Sequence[str]): Numeric columns, if already known; detected from dtypes otherwise
 
     Returns:
         tuple: (DataFrame with normalized numeric columns, fitted scaler)
     """
-    df = df.copy()
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
+    df = df.copy(deep=False)
+    if numeric_cols is None:
+        numeric_cols = df.select_dtypes(include=[np.number]).columns
 
     if len(numeric_cols) == 0:
         raise ValueError("⛔ No numeric columns found for normalization")
 
-    if method == "minmax":
-        scaler = MinMaxScaler()
-    elif method == "standard":
-        scaler = StandardScaler()
-    else:
+    if method not in ("minmax", "standard"):
         raise ValueError("Unsupported normalization method: choose 'minmax' or 'standard'")
 
-    df[numeric_cols] = scaler.fit_transform(df[numeric_cols])
+    values = df[numeric_cols].to_numpy(dtype=np.float64, copy=True)
+    scaler = _get_scaler(values, "normalize", numeric_cols, method, reuse_scaler)
+    affine_fill_inplace(values, scaler.offset, scaler.scale, np.full(values.shape[1], np.nan))
+    df[numeric_cols] = values
+
     logger.info(f"📊 Normalization applied using method='{method}' on {len(numeric_cols)} numeric columns")
 
     return df, scaler
@@ -114,33 +214,49 @@ def normalize_features(df: pd.DataFrame, method: str = "minmax"):
 # -------------------------------
 # Handle Missing Values
 # -------------------------------
-def fill_missing_values(df: pd.DataFrame, method: str = "mean") -> pd.DataFrame:
+def fill_missing_values(df: pd.DataFrame, method: str = "mean", numeric_cols: Sequence[str] = None) -> pd.DataFrame:
     """
     Fill missing values in numeric columns.
 
     Args:
         df (pd.DataFrame): Input DataFrame
         method (str): "mean", "median", or "zero"
+        numeric_cols (Sequence[str]): Numeric columns, if already known; detected from dtypes otherwise
 
     Returns:
         pd.DataFrame: DataFrame with missing values filled
     """
-    df = df.copy()
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
+    df = df.copy(deep=False)
+    if numeric_cols is None:
+        numeric_cols = df.select_dtypes(include=[np.number]).columns
 
     if len(numeric_cols) == 0:
         logger.warning("⚠️ No numeric columns found for missing-value handling")
         return df
 
-    if method == "mean":
-        df[numeric_cols] = df[numeric_cols].fillna(df[numeric_cols].mean())
-    elif method == "median":
-        df[numeric_cols] = df[numeric_cols].fillna(df[numeric_cols].median())
-    elif method == "zero":
-        df[numeric_cols] = df[numeric_cols].fillna(0)
-    else:
+    if method not in ("mean", "median", "zero"):
         raise ValueError("Unsupported fill method: choose 'mean', 'median', or 'zero'")
 
+    # Only float columns can hold NaN; fill them with one masked assignment instead of fillna
+    float_cols = [col for col in numeric_cols if pd.api.types.is_float_dtype(df[col])]
+    values = df[float_cols].to_numpy(dtype=np.float64, copy=True)
+    rows, cols = np.nonzero(np.isnan(values))
+    if len(rows):
+        filled = np.unique(cols)
+        fills = np.zeros(values.shape[1])
+        with warnings.catch_warnings():
+            # All-NaN columns stay NaN, as with fillna
+            warnings.simplefilter("ignore", RuntimeWarning)
+            if method == "mean":
+                fills[filled] = np.nanmean(values[:, filled], axis=0)
+            elif method == "median":
+                fills[filled] = np.nanmedian(values[:, filled], axis=0)
+        values[rows, cols] = fills[cols]
+        # Write back only the columns that changed, keeping their dtypes
+        for j in filled:
+            col = float_cols[j]
+            df[col] = values[:, j].astype(df[col].dtype, copy=False)
+
     logger.info(f"🧹 Missing values handled using method='{method}'")
     return df
 
@@ -148,27 +264,32 @@ def fill_missing_values(df: pd.DataFrame, method: str = "mean") -> pd.DataFrame:
 # -------------------------------
 # Detect Anomalies
 # -------------------------------
-def detect_anomalies(df: pd.DataFrame, threshold: float = 3) -> pd.DataFrame:
+def detect_anomalies(df: pd.DataFrame, threshold: float = 3, numeric_cols: Sequence[str] = None) -> pd.DataFrame:
     """
     Detect anomalies using z-score for numeric columns.
 
     Args:
         df (pd.DataFrame): Input DataFrame
         threshold (float): z-score threshold to classify as anomaly
+        numeric_cols (Sequence[str]): Numeric columns, if already known; detected from dtypes otherwise
 
     Returns:
         pd.DataFrame: DataFrame with boolean 'is_anomaly' column
     """
-    df = df.copy()
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
+    df = df.copy(deep=False)
+    if numeric_cols is None:
+        numeric_cols = df.select_dtypes(include=[np.number]).columns
 
     if len(numeric_cols) == 0:
         logger.warning("⚠️ No numeric columns found for anomaly detection")
         df["is_anomaly"] = False
         return df
 
-    z_scores = np.abs((df[numeric_cols] - df[numeric_cols].mean()) / df[numeric_cols].std())
-    df["is_anomaly"] = (z_scores > threshold).any(axis=1)
+    # |x - mu| > threshold * sigma is the z-score test without dividing every element
+    values = np.ascontiguousarray(df[numeric_cols].to_numpy(dtype=np.float64, copy=False))
+    mu, sigma = column_mean_std(values, ddof=1)
+    limit = threshold * sigma
+    df["is_anomaly"] = any_exceeds(values, mu, limit)
 
     anomaly_count = df["is_anomaly"].sum()
     logger.info(f"🚨 Anomaly detection complete. Found {anomaly_count} anomalies (threshold={threshold})")
@@ -192,16 +313,18 @@ def clip_outliers(df: pd.DataFrame, columns: list, lower_percentile: float = 1,
     Returns:
         pd.DataFrame: DataFrame with outliers clipped
     """
-    df = df.copy()
+    df = df.copy(deep=False)
 
-    for col in columns:
-        if col not in df.columns:
-            logger.warning(f"⚠️ {col} not found in DataFrame columns")
-            continue
+    present = [col for col in columns if col in df.columns]
+    missing = [col for col in columns if col not in df.columns]
+    if missing:
+        logger.warning(f"⚠️ {missing} not found in DataFrame columns")
 
-        lower_bound = np.percentile(df[col].dropna(), lower_percentile)
-        upper_bound = np.percentile(df[col].dropna(), upper_percentile)
-        df[col] = np.clip(df[col], lower_bound, upper_bound)
+    if present:
+        values = df[present].to_numpy(dtype=np.float64, copy=True)
+        lower_bounds, upper_bounds = column_percentiles(values, [lower_percentile, upper_percentile])
+        clip_inplace(values, lower_bounds, upper_bounds)
+        df[present] = values
 
     logger.info(f"✂️ Outliers clipped in columns: {columns}")
     return df
@@ -210,28 +333,29 @@ def clip_outliers(df: pd.DataFrame, columns: list, lower_percentile: float = 1,
 # -------------------------------
 # Scale Features
 # -------------------------------
-def scale_features(df: pd.DataFrame, columns: list, method: str = "minmax") -> pd.DataFrame:
+def scale_features(df: pd.DataFrame, columns: list, method: str = "minmax",
+                   reuse_scaler: bool = False) -> pd.DataFrame:
     """
-    Scale numeric features using MinMaxScaler or StandardScaler.
+    Scale numeric features to [0, 1] (minmax) or zero mean and unit variance (standard).
 
     Args:
         df (pd.DataFrame): Input DataFrame
         columns (list): List of columns to scale
         method (str): Scaling method ("minmax" or "standard")
+        reuse_scaler (bool): Reuse the scaler fitted by an earlier call on the same columns
 
     Returns:
         pd.DataFrame: DataFrame with scaled features
     """
-    df = df.copy()
+    df = df.copy(deep=False)
 
-    if method == "minmax":
-        scaler = MinMaxScaler()
-    elif method == "standard":
-        scaler = StandardScaler()
-    else:
+    if method not in ("minmax", "standard"):
         raise ValueError("Unsupported scaling method: choose 'minmax' or 'standard'")
 
-    df[columns] = scaler.fit_transform(df[columns])
+    values = df[columns].to_numpy(dtype=np.float64, copy=True)
+    scaler = _get_scaler(values, "scale", columns, method, reuse_scaler)
+    affine_fill_inplace(values, scaler.offset, scaler.scale, np.full(values.shape[1], np.nan))
+    df[columns] = values
     logger.info(f"📏 Features scaled using method='{method}' on columns: {columns}")
 
     return df
@@ -250,10 +374,16 @@ def create_kpis(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         pd.DataFrame: DataFrame with added KPI columns
     """
-    df = df.copy()
-
-    if 'mill_power_kwh' in df.columns and 'throughput_tph' in df.columns:
-        df['specific_power_consumption'] = df['mill_power_kwh'] / df['throughput_tph']
+    df = df.copy(deep=False)
+
+    inputs = next(((p, t) for p, t in KPI_POWER_THROUGHPUT if p in df.columns and t in df.columns), None)
+    if inputs is not None:
+        # Zero throughput gives 0 rather than inf
+        power = df[inputs[0]].to_numpy(dtype=np.float32)
+        throughput = df[inputs[1]].to_numpy(dtype=np.float32)
+        kpi = np.zeros_like(power)
+        np.divide(power, throughput, out=kpi, where=throughput != 0)
+        df['specific_power_consumption'] = kpi
         logger.info("📊 KPI 'specific_power_consumption' created")
     else:
         logger.warning("⚠️ Required columns for KPI calculation are missing")
@@ -261,6 +391,36 @@ def create_kpis(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+# -------------------------------
+# Downcast Dtypes
+# -------------------------------
+def _downcast(df: pd.DataFrame, exclude: tuple = (), max_category_ratio: float = 0.5) -> pd.DataFrame:
+    """
+    Downcast numeric columns to the smallest dtype that holds their values and convert
+    low-cardinality string columns to category.
+
+    Args:
+        df (pd.DataFrame): Input DataFrame
+        exclude (tuple): Columns to leave untouched (e.g. the timestamp column)
+        max_category_ratio (float): Max unique/rows ratio for an object column to become category
+
+    Returns:
+        pd.DataFrame: DataFrame with downcast dtypes
+    """
+    df = df.copy(deep=False)
+    for col in df.columns:
+        if col in exclude:
+            continue
+        series = df[col]
+        if pd.api.types.is_integer_dtype(series):
+            df[col] = pd.to_numeric(series, downcast="integer")
+        elif pd.api.types.is_float_dtype(series):
+            df[col] = pd.to_numeric(series, downcast="float")
+        elif series.dtype == object and len(series) and series.nunique() / len(series) <= max_category_ratio:
+            df[col] = series.astype("category")
+    return df
+
+
 # -------------------------------
 # Full Transformation Pipeline
 # -------------------------------
@@ -271,7 +431,8 @@ def transform_pipeline(
     timestamp_col: str = "timestamp",
     anomaly_threshold: float = 3,
     clip_columns: list = None,
-    scale_columns: list = None
+    scale_columns: list = None,
+    reuse_scalers: bool = False
 ) -> pd.DataFrame:
     """
     Apply full preprocessing pipeline to a DataFrame.
@@ -291,34 +452,83 @@ def transform_pipeline(
         fill_method (str): Missing value fill method ("mean", "median", "zero")
         timestamp_col (str): Name of timestamp column
         anomaly_threshold (float): z-score threshold for anomaly detection
+        reuse_scalers (bool): Normalize/scale with the scalers fitted on an earlier batch with the
+            same columns instead of refitting on every call
 
     Returns:
         pd.DataFrame: Transformed DataFrame
     """
     if not isinstance(df, pd.DataFrame):
         raise TypeError("Input to transform_pipeline must be a DataFrame")
+    if fill_method not in ("mean", "median", "zero"):
+        raise ValueError("Unsupported fill method: choose 'mean', 'median', or 'zero'")
+    if normalize_method not in ("minmax", "standard"):
+        raise ValueError("Unsupported normalization method: choose 'minmax' or 'standard'")
 
     logger.info("🚀 Starting transformation pipeline...")
 
-    # Fill missing values
-    df = fill_missing_values(df, method=fill_method)
+    df = _downcast(df, exclude=(timestamp_col,))
+
+    # The numeric steps below run in place on a single NumPy array instead of
+    # copying the DataFrame once per step.
+    # Numeric columns are resolved once: the input's, plus the integer time features added next
+    fill_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    numeric_cols = fill_cols + [col for col in TIME_FEATURES if col not in fill_cols]
 
     # Add time features
     df = add_time_features(df, timestamp_col=timestamp_col)
 
-    # Normalize numeric features
-    df, _ = normalize_features(df, method=normalize_method)
+    if len(numeric_cols) == 0:
+        raise ValueError("⛔ No numeric columns found for normalization")
+    # Stay in float32 when every numeric column fits in 32 bits after downcasting
+    values_dtype = np.float32 if all(dt.itemsize <= 4 for dt in df[numeric_cols].dtypes) else np.float64
+    values = df[numeric_cols].to_numpy(dtype=values_dtype, copy=True)
+    col_index = {col: i for i, col in enumerate(numeric_cols)}
+
+    # Fill missing values (columns that were numeric before the time features were added)
+    fill_idx = [col_index[col] for col in fill_cols]
+    if fill_idx:
+        block = values[:, fill_idx]
+        if fill_method == "mean":
+            fills = np.nanmean(block, axis=0)
+        elif fill_method == "median":
+            fills = np.nanmedian(block, axis=0)
+        else:
+            fills = np.zeros(len(fill_idx))
+        values[:, fill_idx] = np.where(np.isnan(block), fills, block)
+
+    # Normalize numeric features (NaNs that survived the fill stay NaN)
+    scaler = _get_scaler(values, "normalize", numeric_cols, normalize_method, reuse_scalers)
+    affine_fill_inplace(values, scaler.offset, scaler.scale, np.full(values.shape[1], np.nan))
 
     # Detect anomalies
-    df = detect_anomalies(df, threshold=anomaly_threshold)
+    mu, sigma = column_mean_std(values, ddof=1)
+    limit = anomaly_threshold * sigma
+    is_anomaly = any_exceeds(np.ascontiguousarray(values), mu, limit)
 
     # Clip outliers
     if clip_columns:
-        df = clip_outliers(df, columns=clip_columns)
+        missing = [col for col in clip_columns if col not in col_index]
+        if missing:
+            logger.warning(f"⚠️ {missing} not found in DataFrame columns")
+        clip_idx = [col_index[col] for col in clip_columns if col in col_index]
+        if clip_idx:
+            block = values[:, clip_idx]
+            lower_bounds, upper_bounds = column_percentiles(block, [1, 99])
+            clip_inplace(block, lower_bounds, upper_bounds)
+            values[:, clip_idx] = block
 
     # Scale features
     if scale_columns:
-        df = scale_features(df, columns=scale_columns, method=normalize_method)
+        scale_idx = [col_index[col] for col in scale_columns]
+        block = values[:, scale_idx]
+        feature_scaler = _get_scaler(block, "scale", scale_columns, normalize_method, reuse_scalers)
+        affine_fill_inplace(block, feature_scaler.offset, feature_scaler.scale, np.full(block.shape[1], np.nan))
+        values[:, scale_idx] = block
+
+    df[numeric_cols] = values
+    df["is_anomaly"] = is_anomaly
+    logger.info(f"🚨 Anomaly detection complete. Found {int(is_anomaly.sum())} anomalies (threshold={anomaly_threshold})")
 
     # Create KPIs
     df = create_kpis(df)
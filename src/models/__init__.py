@@ -8,7 +8,7 @@ training, inference, evaluation, and model registry.
 from .training import train_model, train_all_models
 from .inference import predict, predict_batch
 from .evaluation import evaluate_regression, evaluate_classification
-from .registry import save_model, load_model, list_models
+from .registry import save_model, load_model, load_forest, load_serving_model, list_models
 
 __all__ = [
     "train_model",
@@ -19,5 +19,7 @@ __all__ = [
     "evaluate_classification",
     "save_model",
     "load_model",
+    "load_forest",
+    "load_serving_model",
     "list_models"
 ]
@@ -0,0 +1,194 @@
+"""
+src/models/forest.py
+--------------------
+
+Columnar export of fitted random forests, and a predictor that walks the trees directly
+from memory-mapped Arrow arrays instead of unpickling one object graph per tree.
+Compiled with Numba when it is installed, otherwise implemented with NumPy.
+"""
+
+import json
+
+import numpy as np
+import pyarrow as pa
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional
+    njit = None
+
+
+# -------------------------------
+# Tree traversal kernels
+# -------------------------------
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _forest_mean(X, feature, threshold, left, right, value, roots):
+        """Average the leaf values reached by every row of X across all trees."""
+        n_rows = X.shape[0]
+        n_values = value.shape[1]
+        out = np.zeros((n_rows, n_values))
+        for i in prange(n_rows):
+            for t in range(roots.shape[0]):
+                node = roots[t]
+                while left[node] != -1:
+                    if X[i, feature[node]] <= threshold[node]:
+                        node = left[node]
+                    else:
+                        node = right[node]
+                for c in range(n_values):
+                    out[i, c] += value[node, c]
+        return out / roots.shape[0]
+else:
+    def _forest_mean(X, feature, threshold, left, right, value, roots):
+        """Average the leaf values reached by every row of X across all trees."""
+        rows = np.arange(X.shape[0])
+        out = np.zeros((X.shape[0], value.shape[1]))
+        for root in roots:
+            node = np.full(X.shape[0], root, dtype=np.int64)
+            active = left[node] != -1
+            while active.any():
+                idx = node[active]
+                go_left = X[rows[active], feature[idx]] <= threshold[idx]
+                node[active] = np.where(go_left, left[idx], right[idx])
+                active = left[node] != -1
+            out += value[node]
+        return out / len(roots)
+
+
+# -------------------------------
+# Export
+# -------------------------------
+def export_forest(model, path):
+    """
+    Write the trees of a fitted single-output random forest to an Arrow IPC file.
+    All nodes are concatenated into one set of columns; child indices are global
+    and each tree's root offset is kept in the schema metadata.
+
+    Args:
+        model: fitted RandomForestRegressor / RandomForestClassifier (or compatible)
+        path (str): destination file
+
+    Returns:
+        bool: False if the model is not a single-output tree ensemble and nothing was written
+    """
+    estimators = getattr(model, "estimators_", None)
+    if not estimators or getattr(model, "n_outputs_", 1) != 1 or not hasattr(estimators[0], "tree_"):
+        return False
+
+    feature_dtype = np.int16 if model.n_features_in_ < 2**15 else np.int32
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    for est in estimators:
+        tree = est.tree_
+        left, right = tree.children_left, tree.children_right
+        is_leaf = left == -1
+        # Children become global indices; leaves keep -1
+        lefts.append(np.where(is_leaf, -1, left + offset).astype(np.int32))
+        rights.append(np.where(is_leaf, -1, right + offset).astype(np.int32))
+        features.append(tree.feature.astype(feature_dtype))
+        thresholds.append(tree.threshold)
+        value = tree.value[:, 0, :]
+        if hasattr(model, "classes_"):
+            # Class counts -> probabilities, as DecisionTreeClassifier.predict_proba does
+            totals = value.sum(axis=1, keepdims=True)
+            totals[totals == 0.0] = 1.0
+            value = value / totals
+        values.append(value)
+        roots.append(offset)
+        offset += tree.node_count
+
+    value = np.concatenate(values)
+    metadata = {
+        "roots": json.dumps(roots),
+        "feature_names": json.dumps([str(f) for f in getattr(model, "feature_names_in_", [])]),
+    }
+    if hasattr(model, "classes_"):
+        metadata["classes"] = json.dumps(np.asarray(model.classes_).tolist())
+
+    table = pa.table(
+        {
+            "feature": np.concatenate(features),
+            "threshold": np.concatenate(thresholds),
+            "left": np.concatenate(lefts),
+            "right": np.concatenate(rights),
+            "value": pa.FixedSizeListArray.from_arrays(value.ravel(), value.shape[1]),
+        }
+    ).replace_schema_metadata(metadata)
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=len(value))
+    return True
+
+
+# -------------------------------
+# Load / Predict
+# -------------------------------
+class ArrowForest:
+    """Random forest predictor over the columnar layout written by export_forest."""
+
+    def __init__(self, feature, threshold, left, right, value, roots, feature_names=None, classes=None,
+                 source=None):
+        # Memory map the node arrays are views of; kept open for as long as the forest is in use
+        self._source = source
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        if feature_names:
+            self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+        self.classes_ = None if classes is None else np.asarray(classes)
+
+    def _leaf_means(self, X):
+        feature_names = getattr(self, "feature_names_in_", None)
+        if feature_names is not None and hasattr(X, "columns"):
+            X = X[list(feature_names)]
+        # sklearn trees compare float32 inputs against float64 thresholds
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        return _forest_mean(X, self.feature, self.threshold, self.left, self.right, self.value, self.roots)
+
+    def predict(self, X):
+        means = self._leaf_means(X)
+        if self.classes_ is None:
+            return means[:, 0]
+        return self.classes_[means.argmax(axis=1)]
+
+    def predict_proba(self, X):
+        if self.classes_ is None:
+            raise AttributeError("predict_proba is only available for classifiers")
+        return self._leaf_means(X)
+
+    def close(self):
+        """Release the memory map; the node arrays must not be used afterwards."""
+        if self._source is not None:
+            self._source.close()
+            self._source = None
+
+
+def load_forest(path):
+    """
+    Memory-map a forest written by export_forest; node arrays are zero-copy views of the file.
+
+    Args:
+        path (str): Arrow IPC file
+
+    Returns:
+        ArrowForest
+    """
+    source = pa.memory_map(path, "r")
+    table = pa.ipc.open_file(source).read_all()
+    metadata = {k.decode(): json.loads(v) for k, v in table.schema.metadata.items()}
+    columns = {name: table.column(name).chunk(0) for name in table.column_names}
+    value = columns["value"]
+    return ArrowForest(
+        feature=columns["feature"].to_numpy(),
+        threshold=columns["threshold"].to_numpy(),
+        left=columns["left"].to_numpy(),
+        right=columns["right"].to_numpy(),
+        value=value.values.to_numpy().reshape(len(value), value.type.list_size),
+        roots=np.asarray(metadata["roots"], dtype=np.int64),
+        feature_names=metadata.get("feature_names"),
+        classes=metadata.get("classes"),
+        source=source,
+    )
@@ -6,8 +6,15 @@ Module for performing predictions with trained ML models.
 """
 
 import pandas as pd
+from joblib import Parallel, delayed
 from .registry import load_model
 
+# Model name substring -> (stage dataset, columns dropped to build its features); simple mapping for PoC
+MODEL_STAGE_INPUTS = {
+    "SPC": ("raw_mill", ["SPC"]),
+    "Kiln": ("kiln", ["is_anomaly"]),
+}
+
 # -------------------------------
 # Predict single dataset
 # -------------------------------
@@ -39,17 +46,24 @@ def predict_batch(models_dict, datasets_dict):
     Returns:
         dict: Predictions per dataset
     """
-    predictions = {}
-    for model_name, model_type in models_dict.items():
-        # Simple mapping for PoC
-        if "SPC" in model_name:
-            X = datasets_dict["raw_mill"].drop(columns=["SPC"], errors="ignore")
-        elif "Kiln" in model_name:
-            X = datasets_dict["kiln"].drop(columns=["is_anomaly"], errors="ignore")
-        else:
+    # Build each stage's feature frame once, however many models use it
+    features = {}
+    jobs = {}
+    for model_name in models_dict:
+        route = next((r for key, r in MODEL_STAGE_INPUTS.items() if key in model_name), None)
+        if route is None:
             continue
-        predictions[model_name] = predict(model_name, X)
-    return predictions
+        stage, drop_cols = route
+        if stage not in features:
+            features[stage] = datasets_dict[stage].drop(columns=drop_cols, errors="ignore")
+        jobs[model_name] = features[stage]
+
+    if len(jobs) <= 1:
+        return {name: predict(name, X) for name, X in jobs.items()}
+
+    # sklearn releases the GIL while predicting, so threads run the models concurrently
+    results = Parallel(n_jobs=-1, prefer="threads")(delayed(predict)(name, X) for name, X in jobs.items())
+    return dict(zip(jobs, results))
 
 # -------------------------------
 # Example usage
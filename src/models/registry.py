@@ -5,12 +5,19 @@ src/models/registry.py
 Module for saving, loading, and versioning ML models.
 """
 
+import logging
 import os
 import joblib
 from datetime import datetime
+from functools import lru_cache
+
+from .forest import export_forest, load_forest as _load_forest_file
 
 MODEL_DIR = os.path.join(os.path.dirname(__file__), "../../models/latest")
 os.makedirs(MODEL_DIR, exist_ok=True)
+FOREST_SUFFIX = ".trees.arrow"
+
+logger = logging.getLogger(__name__)
 
 # -------------------------------
 # Save model
@@ -29,16 +36,47 @@ def save_model(model, name):
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"{name}_{timestamp}.joblib"
     filepath = os.path.join(MODEL_DIR, filename)
-    joblib.dump(model, filepath)
+    # Uncompressed so the NumPy arrays inside the model can be memory-mapped on load
+    joblib.dump(model, filepath, compress=0, protocol=5)
+    # Tree ensembles also get a columnar copy of their nodes for load_forest
+    if export_forest(model, filepath + FOREST_SUFFIX):
+        print(f"Forest arrays saved at {filepath + FOREST_SUFFIX}")
     print(f"Model saved at {filepath}")
     return filepath
 
 # -------------------------------
 # Load model
 # -------------------------------
+# Sorted listing of MODEL_DIR and the latest file per model name, refreshed when the directory changes
+_model_index = {"mtime": None, "files": [], "latest": {}}
+
+
+def _resolve_latest(name):
+    """Return the path of the latest saved version of a model, rescanning MODEL_DIR only when it changes."""
+    mtime = os.stat(MODEL_DIR).st_mtime_ns
+    if _model_index["mtime"] != mtime:
+        _model_index.update(mtime=mtime, files=sorted(os.listdir(MODEL_DIR)), latest={})
+
+    latest = _model_index["latest"]
+    if name not in latest:
+        files = [f for f in _model_index["files"] if f.startswith(name) and f.endswith(".joblib")]
+        if not files:
+            raise FileNotFoundError(f"No model found with name {name}")
+        latest[name] = os.path.join(MODEL_DIR, files[-1])
+    return latest[name]
+
+
+@lru_cache(maxsize=32)
+def _load_model_file(path, mtime_ns):
+    """Deserialize a model file; keyed on mtime so a rewritten file is reloaded."""
+    # Arrays are mapped read-only from the page cache, so workers share them instead of copying
+    return joblib.load(path, mmap_mode="r")
+
+
 def load_model(name):
     """
     Load the latest version of the model by name.
+    Loaded models are cached in memory, so repeated calls skip the disk read.
 
     Args:
         name (str): model name
@@ -46,12 +84,63 @@ def load_model(name):
     Returns:
         trained model object
     """
-    files = [f for f in os.listdir(MODEL_DIR) if f.startswith(name)]
-    if not files:
-        raise FileNotFoundError(f"No model found with name {name}")
-    latest_file = sorted(files)[-1]
-    model = joblib.load(os.path.join(MODEL_DIR, latest_file))
-    return model
+    path = _resolve_latest(name)
+    return _load_model_file(path, os.stat(path).st_mtime_ns)
+
+
+@lru_cache(maxsize=32)
+def _load_forest_cached(path, mtime_ns):
+    return _load_forest_file(path)
+
+
+def load_forest(name):
+    """
+    Load the columnar tree arrays of the latest version of a forest model.
+    The file is memory-mapped, so loading does not unpickle the trees.
+
+    Args:
+        name (str): model name
+
+    Returns:
+        ArrowForest: predictor with predict (and predict_proba for classifiers)
+    """
+    path = _resolve_latest(name) + FOREST_SUFFIX
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No forest arrays saved for model {name}")
+    return _load_forest_cached(path, os.stat(path).st_mtime_ns)
+
+def load_serving_model(name):
+    """
+    Load the latest version of a model for serving predictions.
+    Tree ensembles saved with forest arrays are memory-mapped with load_forest instead of
+    unpickling every tree; other models come from load_model.
+
+    Args:
+        name (str): model name
+
+    Returns:
+        ArrowForest or trained model object
+    """
+    path = _resolve_latest(name)
+    forest_path = path + FOREST_SUFFIX
+    try:
+        forest_mtime = os.stat(forest_path).st_mtime_ns
+    except FileNotFoundError:
+        return _load_model_file(path, os.stat(path).st_mtime_ns)
+    return _load_forest_cached(forest_path, forest_mtime)
+
+def preload_models():
+    """
+    Load the latest version of every saved model into the in-memory cache.
+    Used as a worker initializer so the first request in each process skips the disk read.
+    A model that fails to load is skipped with a warning; requests for it get the error instead.
+    """
+    # Files are saved as <name>_<YYYYmmdd>_<HHMMSS>.joblib
+    for name in sorted({f.rsplit("_", 2)[0] for f in list_models()}):
+        try:
+            load_serving_model(name)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not preload model {name}: {e}")
 
 # -------------------------------
 # List saved models
@@ -60,7 +149,7 @@ def list_models():
     """
     List all saved models in the registry.
     """
-    return os.listdir(MODEL_DIR)
+    return [f for f in os.listdir(MODEL_DIR) if f.endswith(".joblib")]
 
 # -------------------------------
 # Example usage
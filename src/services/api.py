@@ -3,14 +3,66 @@ src/services/api.py
 -------------------
 
 Provides a simple REST API for serving predictions and recommendations.
-Uses FastAPI.
+Uses FastAPI, with responses serialized by orjson. Concurrent /predict requests are
+coalesced into per-model batches in the API process, and each batch is predicted in a
+pool of worker processes that load the saved models once at startup.
 """
 
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from src.services.controllers import get_model_prediction, get_recommendation
+from src.models.registry import preload_models
+from src.services.controllers import _PredictionBatcher, get_model_predictions, get_recommendation
+
+PREDICT_WORKERS = int(os.getenv("PREDICT_WORKERS", os.cpu_count() or 1))
+_predict_pool = None
+_predict_pool_lock = threading.Lock()
+
+
+def _new_predict_pool():
+    return ProcessPoolExecutor(max_workers=PREDICT_WORKERS, initializer=preload_models)
+
+
+def _replace_broken_pool():
+    """Swap in a fresh worker pool if the current one is broken (e.g. a worker process died)."""
+    global _predict_pool
+    with _predict_pool_lock:
+        try:
+            # A broken pool refuses new work; a healthy one just runs this no-op
+            _predict_pool.submit(int)
+        except BrokenProcessPool:
+            _predict_pool.shutdown(wait=False, cancel_futures=True)
+            _predict_pool = _new_predict_pool()
+
+
+def _predict_in_pool(model_name, rows):
+    """Batch dispatcher for the predict batcher: one pool task per batch."""
+    return _predict_pool.submit(get_model_predictions, model_name, rows)
+
+
+_predict_batcher = _PredictionBatcher(dispatch=_predict_in_pool)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    global _predict_pool
+    _predict_pool = _new_predict_pool()
+    try:
+        yield
+    finally:
+        _predict_pool.shutdown(cancel_futures=True)
+        _predict_pool = None
+
 
-app = FastAPI(title="CementAI Services API", version="1.0")
+app = FastAPI(title="CementAI Services API", version="1.0", default_response_class=ORJSONResponse,
+              lifespan=lifespan)
 
 # -------------------------------
 # Input Schema
@@ -31,15 +83,23 @@ def home():
     return {"message": "CementAI Services API Running"}
 
 @app.post("/predict")
-def predict(request: PredictRequest):
+async def predict(request: PredictRequest):
     """
     Returns model prediction for given features.
     """
-    return get_model_prediction(request.model_name, request.features)
+    try:
+        result = await asyncio.wrap_future(_predict_batcher.submit(request.model_name, request.features))
+    except BrokenProcessPool:
+        _replace_broken_pool()
+        return ORJSONResponse({"error": "Prediction workers restarted, retry the request"}, status_code=503)
+    # Returned as a response object so the NumPy prediction goes straight to orjson
+    # instead of through FastAPI's jsonable_encoder
+    return ORJSONResponse(result)
 
 @app.post("/recommend")
-def recommend(request: RecommendRequest):
+async def recommend(request: RecommendRequest):
     """
     Returns process optimization recommendations for a stage.
+    Rule lookup never blocks, so it runs on the event loop rather than in the threadpool.
     """
     return get_recommendation(request.stage, request.parameters)
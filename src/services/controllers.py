@@ -5,21 +5,165 @@ src/services/controllers.py
 Controllers handle the business logic for APIs.
 """
 
+import queue
+import threading
+import time
+import warnings
+from collections import defaultdict
+from concurrent.futures import Future
+from itertools import chain
+
+import numpy as np
 import pandas as pd
-from src.models.inference import predict
+from src.models.registry import load_serving_model
 from src.services.recommender import generate_recommendation
 
+# -------------------------------
+# Prediction Batching
+# -------------------------------
+BATCH_MAX_SIZE = 64
+BATCH_MAX_WAIT_SECONDS = 0.005
+
+def _to_matrix(model, rows):
+    """Build a 2-D float64 array from a batch of feature dicts, columns in the model's feature order."""
+    # Read from the model on every batch: the registry may have picked up a retrained version
+    order = getattr(model, "feature_names_in_", None)
+    if order is None:
+        # No recorded order: fall back to the key order of the request, as before
+        return pd.DataFrame(rows).to_numpy(dtype=np.float64)
+    expected = set(order)
+    for row in rows:
+        if row.keys() != expected:
+            # Rejected like sklearn's own feature-name check, rather than predicting from a guess
+            missing = sorted(expected - row.keys())
+            unknown = sorted(row.keys() - expected)
+            raise ValueError(f"The feature names should match those that were passed during fit. "
+                             f"Missing: {missing}, unexpected: {unknown}")
+    values = chain.from_iterable((row[k] for k in order) for row in rows)
+    return np.fromiter(values, dtype=np.float64, count=len(rows) * len(order)).reshape(len(rows), len(order))
+
+
+def _predict_rows(model_name, rows):
+    """Run one model.predict call over a list of feature dicts."""
+    model = load_serving_model(model_name)
+    X = _to_matrix(model, rows)
+    with warnings.catch_warnings():
+        # Columns are already in the fitted order; the names check would only warn
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        return model.predict(X)
+
+
+class _PredictionBatcher:
+    """
+    Coalesces concurrent single-row prediction requests into one batch per model.
+    A background thread drains the queue every BATCH_MAX_WAIT_SECONDS or at BATCH_MAX_SIZE rows
+    and hands each batch to dispatch(model_name, rows), which returns a future of one response
+    per row: get_model_predictions run in this process by default, or e.g. a process pool's submit.
+    """
+
+    def __init__(self, dispatch=None, max_size=BATCH_MAX_SIZE, max_wait=BATCH_MAX_WAIT_SECONDS):
+        self.dispatch = dispatch or _predict_inline
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def submit(self, model_name: str, features: dict) -> Future:
+        """Queue one feature row; the returned future resolves to that row's response dict."""
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="prediction-batcher", daemon=True)
+                self._worker.start()
+        future = Future()
+        self._queue.put((model_name, features, future))
+        return future
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            by_model = defaultdict(list)
+            for item in batch:
+                by_model[item[0]].append(item)
+            for model_name, items in by_model.items():
+                self._dispatch(model_name, items)
+
+    def _dispatch(self, model_name, items):
+        futures = [future for _, _, future in items]
+
+        def resolve(batch_future):
+            try:
+                results = batch_future.result()
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                return
+            for future, result in zip(futures, results):
+                future.set_result(result)
+
+        try:
+            batch_future = self.dispatch(model_name, [features for _, features, _ in items])
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+        # Resolved from the dispatcher's callback, so the next batch doesn't wait on this one
+        batch_future.add_done_callback(resolve)
+
+
+def _predict_inline(model_name, rows):
+    """Default batch dispatcher: predict in the calling thread and return an already completed future."""
+    future = Future()
+    future.set_result(get_model_predictions(model_name, rows))
+    return future
+
+
+_batcher = _PredictionBatcher()
+
+
 # -------------------------------
 # Controller: Model Prediction
 # -------------------------------
+def _prediction_response(model_name, pred):
+    pred = np.asarray(pred)[np.newaxis]
+    # Left as a NumPy array for orjson's native NumPy support, except for string/object
+    # labels (e.g. classifier classes), which orjson only serializes as a list
+    if pred.dtype.kind in "OSU":
+        pred = pred.tolist()
+    return {"model": model_name, "prediction": pred}
+
+
+def get_model_predictions(model_name: str, rows: list):
+    """
+    Predict a batch of feature rows using ML model with one model.predict call.
+    Returns one response dict per row; if the batch fails it is retried row by row,
+    so a malformed row only gets its own {"error": ...}.
+    """
+    try:
+        preds = _predict_rows(model_name, rows)
+    except Exception as e:
+        if len(rows) == 1:
+            return [{"error": str(e)}]
+        return [get_model_predictions(model_name, [row])[0] for row in rows]
+    return [_prediction_response(model_name, pred) for pred in preds]
+
+
 def get_model_prediction(model_name: str, features: dict):
     """
-    Convert features dict to DataFrame and predict using ML model.
+    Predict a single feature row using ML model; concurrent requests are batched together.
     """
     try:
-        df = pd.DataFrame([features])
-        preds = predict(model_name, df)
-        return {"model": model_name, "prediction": preds.tolist()}
+        return _batcher.submit(model_name, features).result()
     except Exception as e:
         return {"error": str(e)}
 
@@ -6,6 +6,25 @@ Generates process optimization recommendations based on AI insights.
 This can be enhanced later to use Gemini prompts, Vertex AI, or other ML models.
 """
 
+# -------------------------------
+# Recommendation Rules
+# -------------------------------
+# stage -> (parameter, default, (high limit, action), (low limit, action), action when within limits)
+# A limit of None means that side is not checked.
+RULES = {
+    # Example: adjust mill load or grinding speed
+    "raw_mill": ("mill_load", 80, (90, "Reduce mill load by 5%"), (70, "Increase mill load by 5%"),
+                 "Mill load is optimal"),
+    # Example: adjust burner temp
+    "kiln": ("temperature", 1400, (1450, "Reduce burner temperature by 20°C"),
+             (1350, "Increase burner temperature by 20°C"), "Kiln temperature is optimal"),
+    # Example: adjust fan or pump speed
+    "utilities": ("energy", 1000, (1200, "Optimize fan/pump speed to reduce energy"), (None, None),
+                  "Utility energy usage is within normal range"),
+}
+UNKNOWN_STAGE_ACTION = "Stage not recognized. No recommendation."
+
+
 def generate_recommendation(stage: str, parameters: dict):
     """
     Generate simple heuristic-based recommendations for PoC.
@@ -17,40 +36,17 @@ def generate_recommendation(stage: str, parameters: dict):
     Returns:
         dict: recommended actions
     """
-    recommendations = {}
-
-    if stage == "raw_mill":
-        # Example: adjust mill load or grinding speed
-        mill_load = parameters.get("mill_load", 80)
-        if mill_load > 90:
-            recommendations["action"] = "Reduce mill load by 5%"
-        elif mill_load < 70:
-            recommendations["action"] = "Increase mill load by 5%"
-        else:
-            recommendations["action"] = "Mill load is optimal"
-
-    elif stage == "kiln":
-        # Example: adjust burner temp
-        temp = parameters.get("temperature", 1400)
-        if temp > 1450:
-            recommendations["action"] = "Reduce burner temperature by 20°C"
-        elif temp < 1350:
-            recommendations["action"] = "Increase burner temperature by 20°C"
-        else:
-            recommendations["action"] = "Kiln temperature is optimal"
-
-    elif stage == "utilities":
-        # Example: adjust fan or pump speed
-        energy_consumption = parameters.get("energy", 1000)
-        if energy_consumption > 1200:
-            recommendations["action"] = "Optimize fan/pump speed to reduce energy"
-        else:
-            recommendations["action"] = "Utility energy usage is within normal range"
-
-    else:
-        recommendations["action"] = "Stage not recognized. No recommendation."
-
-    return recommendations
+    rule = RULES.get(stage)
+    if rule is None:
+        return {"action": UNKNOWN_STAGE_ACTION}
+
+    param, default, (high, high_action), (low, low_action), ok_action = rule
+    value = parameters.get(param, default)
+    if high is not None and value > high:
+        return {"action": high_action}
+    if low is not None and value < low:
+        return {"action": low_action}
+    return {"action": ok_action}
 
 # -------------------------------
 # Example standalone test
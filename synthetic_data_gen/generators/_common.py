@@ -0,0 +1,82 @@
+"""
+Helpers shared by the Stage 2-5 generators: input validation, batch timestamps,
+float32 uniform draws, the generate_record specs, the Numba uniform-fill kernel and the logging setup, defined once
+instead of per stage.
+"""
+import datetime
+import logging
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+def configure_logging():
+    """Install the generators' log format once, however many stage modules are imported."""
+    if not logging.getLogger().handlers:
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+
+configure_logging()
+
+
+def validate_inputs(batch_size, interval_seconds):
+    if batch_size <= 0:
+        raise ValueError("Batch size must be a positive integer.")
+
+    if interval_seconds <= 0:
+        raise ValueError("Interval seconds must be a positive integer.")
+
+
+def iso_timestamps(start_time: datetime.datetime, n: int, interval_seconds: int):
+    """ISO 8601 strings for n evenly spaced timestamps, formatted like datetime.isoformat()."""
+    index = pd.date_range(start_time, periods=n, freq=pd.Timedelta(seconds=interval_seconds))
+    unit = "us" if start_time.microsecond else "s"
+    return np.datetime_as_string(index.values.astype(f"datetime64[{unit}]"))
+
+
+def uniform_float32(rng, lows, highs, n: int):
+    """(n, len(lows)) float32 uniform draws in [lows, highs); Generator.uniform only produces float64."""
+    values = rng.random((n, len(lows)), dtype=np.float32)
+    values *= (highs - lows).astype(np.float32)
+    values += lows.astype(np.float32)
+    return values
+
+
+def record_specs(fields, scenario_names, count_columns=()):
+    """
+    Per-scenario (column, low, high, kind) specs in output order, for the random-module record path.
+    kind is "reading" (bounds in hundredths, high made exclusive), "count" (inclusive integer
+    bounds, for columns in count_columns) or "flag" (a single random bit, no bounds).
+    """
+    def spec(field, i):
+        if isinstance(field, str):
+            return field, 0, 1, "flag"
+        column, (low, high) = field[0], field[1 + i]
+        if column in count_columns:
+            return column, low, high, "count"
+        return column, round(low * 100), round(high * 100) + 1, "reading"
+
+    return {name: tuple(spec(f, i) for f in fields) for i, name in enumerate(scenario_names)}
+
+
+# Rows per independently seeded block in the Numba fast path
+FAST_BLOCK_ROWS = 65536
+
+
+@lru_cache(maxsize=None)
+def fast_uniform_kernel():
+    """Compile the fused uniform-draw-and-round kernel on first use; numba is only needed for fast=True."""
+    from numba import njit, prange
+
+    @njit(parallel=True, cache=True)
+    def fill_uniform(out, lows, highs, seed, block_rows):
+        # Each block seeds the RNG of the thread that runs it, so output doesn't depend on scheduling
+        n_rows, n_cols = out.shape
+        for b in prange((n_rows + block_rows - 1) // block_rows):
+            np.random.seed(seed + b)
+            for i in range(b * block_rows, min((b + 1) * block_rows, n_rows)):
+                for j in range(n_cols):
+                    out[i, j] = np.round((lows[j] + (highs[j] - lows[j]) * np.random.random()) * 100.0) / 100.0
+
+    return fill_uniform
@@ -14,8 +14,15 @@ import os
 import argparse
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 from datetime import datetime, timedelta
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import repeat
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -34,11 +41,157 @@ def validate_inputs(start_date, duration_days, interval_minutes):
         raise ValueError("interval_minutes must be a positive integer.")
 
 
+# -------------------------------
+# Scenario Parameters
+# -------------------------------
+# Normally distributed columns, in output order; crusher_status is inserted after dust_concentration_mgpm3
+NUMERIC_COLUMNS = [
+    "limestone_feed_tph", "clay_feed_tph", "iron_ore_feed_tph", "gypsum_feed_tph", "laterite_feed_tph",
+    "limestone_moisture_pct", "clay_moisture_pct", "avg_particle_size_mm",
+    "CaO_pct", "SiO2_pct", "Al2O3_pct", "Fe2O3_pct", "MgO_pct",
+    "crusher_power_kw", "conveyor_speed_mps", "CO2_emission_kgph", "dust_concentration_mgpm3",
+    "energy_consumption_kwh", "moisture_content_pct",
+]
+CRUSHER_STATUS_POSITION = NUMERIC_COLUMNS.index("dust_concentration_mgpm3") + 1
+
+SCENARIO_NAMES = ("normal", "critical_low", "critical_high")
+
+# (scenario, column, mean/standard deviation), indexed by SCENARIO_NAMES and NUMERIC_COLUMNS
+PARAMS = np.stack([
+    # means
+    np.array([
+        [150, 75, 15, 10, 7, 3, 3, 1.2, 45, 15, 7, 3, 1, 75, 2, 150, 30, 750, 3],
+        [100, 50, 10, 5, 3, 1, 1, 0.8, 40, 12, 5, 2, 0.8, 50, 1.5, 100, 20, 500, 1],
+        [200, 100, 20, 15, 10, 5, 5, 1.5, 50, 18, 10, 5, 2, 100, 3, 200, 50, 1000, 5],
+    ]),
+    # standard deviations
+    np.array([
+        [10, 5, 2, 1, 1, 0.5, 0.5, 0.2, 2, 1, 1, 0.5, 0.2, 5, 0.2, 10, 5, 50, 0.5],
+        [5, 3, 1, 0.5, 0.5, 0.2, 0.2, 0.1, 1, 0.5, 0.5, 0.2, 0.1, 3, 0.1, 5, 3, 30, 0.2],
+        [15, 10, 2, 2, 1, 0.5, 0.5, 0.2, 3, 1, 1, 0.5, 0.2, 10, 0.2, 15, 5, 70, 0.5],
+    ]),
+], axis=-1).astype(np.float32)
+
+# Probability that the crusher is running, per SCENARIO_NAMES
+CRUSHER_ON_P = (0.9, 0.7, 0.95)
+
+OUTPUT_FORMATS = ("parquet", "feather", "csv")
+
+# Rows per independently seeded block in the Numba fast path
+FAST_BLOCK_ROWS = 65536
+
+
+@lru_cache(maxsize=None)
+def _fast_normal_kernel():
+    """Compile the fused normal-draw kernel on first use; numba is only needed for --fast."""
+    from numba import njit, prange
+
+    @njit(parallel=True, cache=True)
+    def fill_normal(out, mus, sigmas, seed, block_rows):
+        # Each block seeds the RNG of the thread that runs it, so output doesn't depend on scheduling
+        n_rows, n_cols = out.shape
+        for b in prange((n_rows + block_rows - 1) // block_rows):
+            np.random.seed(seed + b)
+            for i in range(b * block_rows, min((b + 1) * block_rows, n_rows)):
+                for j in range(n_cols):
+                    out[i, j] = np.random.standard_normal() * sigmas[j] + mus[j]
+
+    return fill_normal
+
+
+# Rows generated and written per chunk; a multiple of FAST_BLOCK_ROWS so fast-path seeds line up
+CHUNK_ROWS = 4 * FAST_BLOCK_ROWS
+
+
+def _make_frame(chunk, scenario_idx, rng, fast_seed=None):
+    """Draw the Stage 1 frame for one slice of timestamps; a fast_seed selects the Numba kernel."""
+    n = len(chunk)
+    mus = np.ascontiguousarray(PARAMS[scenario_idx, :, 0])
+    sigmas = np.ascontiguousarray(PARAMS[scenario_idx, :, 1])
+    if fast_seed is not None:
+        # Draw, scale and shift in a single pass over the preallocated output
+        values = np.empty((n, len(NUMERIC_COLUMNS)), dtype=np.float32)
+        _fast_normal_kernel()(values, mus, sigmas, fast_seed, FAST_BLOCK_ROWS)
+    else:
+        # One draw for every normally distributed column, scaled in place
+        values = rng.standard_normal((n, len(NUMERIC_COLUMNS)), dtype=np.float32)
+        values *= sigmas
+        values += mus
+    crusher_status = (rng.random(n, dtype=np.float32) < CRUSHER_ON_P[scenario_idx]).view(np.int8)
+
+    # The float32 matrix becomes the frame's single numeric block without a copy
+    df = pd.DataFrame(values, columns=NUMERIC_COLUMNS, copy=False)
+    df.insert(CRUSHER_STATUS_POSITION, "crusher_status", crusher_status)
+    df.insert(0, "timestamp", chunk)
+    return df
+
+
+def _make_spawned_frame(chunk, scenario_idx, seed_seq, fast):
+    # Worker entry point: each chunk owns a spawned SeedSequence, so output doesn't depend on the worker count
+    rng = np.random.default_rng(seed_seq)
+    return _make_frame(chunk, scenario_idx, rng, int(rng.integers(2**31)) if fast else None)
+
+
+def _iter_frames(timestamps, scenario_idx, rng, fast, workers=1):
+    """Yield the Stage 1 frame in CHUNK_ROWS slices, so only a few chunks are held in memory at once."""
+    chunks = [timestamps[start:start + CHUNK_ROWS] for start in range(0, len(timestamps), CHUNK_ROWS)]
+
+    if workers > 1:
+        child_seeds = rng.bit_generator.seed_seq.spawn(len(chunks))
+        # Spawned rather than forked workers: a fork after Numba's thread pool has started can deadlock
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            # One window of chunks in flight per round keeps memory bounded while the writer catches up
+            for i in range(0, len(chunks), workers):
+                window = slice(i, i + workers)
+                yield from executor.map(_make_spawned_frame, chunks[window], repeat(scenario_idx),
+                                        child_seeds[window], repeat(fast))
+        return
+
+    fast_seed = int(rng.integers(2**31)) if fast else None
+    for i, chunk in enumerate(chunks):
+        block_seed = None if fast_seed is None else fast_seed + i * (CHUNK_ROWS // FAST_BLOCK_ROWS)
+        yield _make_frame(chunk, scenario_idx, rng, block_seed)
+
+
+def _open_writer(sink, schema, output_format):
+    if output_format == "parquet":
+        # Random float32 readings don't repeat, so dictionary pages would only add overhead
+        return pq.ParquetWriter(sink, schema, compression="snappy", use_dictionary=False)
+    if output_format == "feather":
+        # Feather v2 is the Arrow IPC file format; LZ4 matches DataFrame.to_feather
+        return pa.ipc.new_file(sink, schema, options=pa.ipc.IpcWriteOptions(compression="lz4"))
+    # Arrow always quotes header names, so write the plain header DataFrame.to_csv produced
+    sink.write((",".join(schema.names) + "\n").encode())
+    return pacsv.CSVWriter(sink, schema, write_options=pacsv.WriteOptions(include_header=False, batch_size=65536))
+
+
+def _write_frames(frames, output_file, output_format):
+    """Append each frame to output_file as it arrives (one Parquet row group / IPC batch / CSV block)."""
+    writer = None
+    with open(output_file, "wb") as sink:
+        try:
+            for df in frames:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                if output_format == "csv":
+                    # Second resolution formats timestamps like to_csv ("2025-01-01 00:10:00")
+                    table = table.set_column(0, "timestamp", table.column("timestamp").cast(pa.timestamp("s")))
+                if writer is None:
+                    writer = _open_writer(sink, table.schema, output_format)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+
+
 def generate_stage1_raw_materials(start_date: str,
                                   duration_days: int,
                                   interval_minutes: int,
                                   scenario: str,
-                                  output_dir: str):
+                                  output_dir: str,
+                                  seed: int = None,
+                                  output_format: str = "parquet",
+                                  fast: bool = False,
+                                  workers: int = 1):
     """
     Generate synthetic raw materials data for Stage 1.
 
@@ -47,95 +200,37 @@ def generate_stage1_raw_materials(start_date: str,
         duration_days (int): Number of days to simulate.
         interval_minutes (int): Interval between samples in minutes.
         scenario (str): One of ["normal", "critical_low", "critical_high"].
-        output_dir (str): Directory to save the generated CSV.
+        output_dir (str): Directory to save the generated file.
+        seed (int): Optional seed for reproducible output.
+        output_format (str): One of ["parquet", "feather", "csv"]; Parquet is written with Snappy.
+        fast (bool): Fill the readings with a parallel Numba kernel (requires numba); for very
+            large runs. Uses a different random stream than the default path.
+        workers (int): Worker processes drawing chunks in parallel. With more than one, every chunk
+            gets its own stream spawned from the seed, so output differs from the serial run but
+            is the same for any worker count.
+
+    Rows are generated and written CHUNK_ROWS at a time, so peak memory does not grow with the run length.
     """
     validate_inputs(start_date, duration_days, interval_minutes)
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Invalid output_format. Choose from {list(OUTPUT_FORMATS)}.")
+
+    if scenario not in SCENARIO_NAMES:
+        raise ValueError("Invalid scenario. Choose from ['normal', 'critical_low', 'critical_high'].")
+    scenario_idx = SCENARIO_NAMES.index(scenario)
 
     start_datetime = datetime.strptime(start_date, "%Y-%m-%d")
     end_datetime = start_datetime + timedelta(days=duration_days)
 
-    timestamps = pd.date_range(start=start_datetime, end=end_datetime, freq=f"{interval_minutes}T")
-
-    if scenario == "normal":
-        data = {
-            "timestamp": timestamps,
-            "limestone_feed_tph": np.random.normal(150, 10, len(timestamps)),
-            "clay_feed_tph": np.random.normal(75, 5, len(timestamps)),
-            "iron_ore_feed_tph": np.random.normal(15, 2, len(timestamps)),
-            "gypsum_feed_tph": np.random.normal(10, 1, len(timestamps)),
-            "laterite_feed_tph": np.random.normal(7, 1, len(timestamps)),
-            "limestone_moisture_pct": np.random.normal(3, 0.5, len(timestamps)),
-            "clay_moisture_pct": np.random.normal(3, 0.5, len(timestamps)),
-            "avg_particle_size_mm": np.random.normal(1.2, 0.2, len(timestamps)),
-            "CaO_pct": np.random.normal(45, 2, len(timestamps)),
-            "SiO2_pct": np.random.normal(15, 1, len(timestamps)),
-            "Al2O3_pct": np.random.normal(7, 1, len(timestamps)),
-            "Fe2O3_pct": np.random.normal(3, 0.5, len(timestamps)),
-            "MgO_pct": np.random.normal(1, 0.2, len(timestamps)),
-            "crusher_power_kw": np.random.normal(75, 5, len(timestamps)),
-            "conveyor_speed_mps": np.random.normal(2, 0.2, len(timestamps)),
-            "CO2_emission_kgph": np.random.normal(150, 10, len(timestamps)),
-            "dust_concentration_mgpm3": np.random.normal(30, 5, len(timestamps)),
-            "crusher_status": np.random.choice([0, 1], len(timestamps), p=[0.1, 0.9]),
-            "energy_consumption_kwh": np.random.normal(750, 50, len(timestamps)),
-            "moisture_content_pct": np.random.normal(3, 0.5, len(timestamps))
-        }
-    elif scenario == "critical_low":
-        data = {
-            "timestamp": timestamps,
-            "limestone_feed_tph": np.random.normal(100, 5, len(timestamps)),
-            "clay_feed_tph": np.random.normal(50, 3, len(timestamps)),
-            "iron_ore_feed_tph": np.random.normal(10, 1, len(timestamps)),
-            "gypsum_feed_tph": np.random.normal(5, 0.5, len(timestamps)),
-            "laterite_feed_tph": np.random.normal(3, 0.5, len(timestamps)),
-            "limestone_moisture_pct": np.random.normal(1, 0.2, len(timestamps)),
-            "clay_moisture_pct": np.random.normal(1, 0.2, len(timestamps)),
-            "avg_particle_size_mm": np.random.normal(0.8, 0.1, len(timestamps)),
-            "CaO_pct": np.random.normal(40, 1, len(timestamps)),
-            "SiO2_pct": np.random.normal(12, 0.5, len(timestamps)),
-            "Al2O3_pct": np.random.normal(5, 0.5, len(timestamps)),
-            "Fe2O3_pct": np.random.normal(2, 0.2, len(timestamps)),
-            "MgO_pct": np.random.normal(0.8, 0.1, len(timestamps)),
-            "crusher_power_kw": np.random.normal(50, 3, len(timestamps)),
-            "conveyor_speed_mps": np.random.normal(1.5, 0.1, len(timestamps)),
-            "CO2_emission_kgph": np.random.normal(100, 5, len(timestamps)),
-            "dust_concentration_mgpm3": np.random.normal(20, 3, len(timestamps)),
-            "crusher_status": np.random.choice([0, 1], len(timestamps), p=[0.3, 0.7]),
-            "energy_consumption_kwh": np.random.normal(500, 30, len(timestamps)),
-            "moisture_content_pct": np.random.normal(1, 0.2, len(timestamps))
-        }
-    elif scenario == "critical_high":
-        data = {
-            "timestamp": timestamps,
-            "limestone_feed_tph": np.random.normal(200, 15, len(timestamps)),
-            "clay_feed_tph": np.random.normal(100, 10, len(timestamps)),
-            "iron_ore_feed_tph": np.random.normal(20, 2, len(timestamps)),
-            "gypsum_feed_tph": np.random.normal(15, 2, len(timestamps)),
-            "laterite_feed_tph": np.random.normal(10, 1, len(timestamps)),
-            "limestone_moisture_pct": np.random.normal(5, 0.5, len(timestamps)),
-            "clay_moisture_pct": np.random.normal(5, 0.5, len(timestamps)),
-            "avg_particle_size_mm": np.random.normal(1.5, 0.2, len(timestamps)),
-            "CaO_pct": np.random.normal(50, 3, len(timestamps)),
-            "SiO2_pct": np.random.normal(18, 1, len(timestamps)),
-            "Al2O3_pct": np.random.normal(10, 1, len(timestamps)),
-            "Fe2O3_pct": np.random.normal(5, 0.5, len(timestamps)),
-            "MgO_pct": np.random.normal(2, 0.2, len(timestamps)),
-            "crusher_power_kw": np.random.normal(100, 10, len(timestamps)),
-            "conveyor_speed_mps": np.random.normal(3, 0.2, len(timestamps)),
-            "CO2_emission_kgph": np.random.normal(200, 15, len(timestamps)),
-            "dust_concentration_mgpm3": np.random.normal(50, 5, len(timestamps)),
-            "crusher_status": np.random.choice([0, 1], len(timestamps), p=[0.05, 0.95]),
-            "energy_consumption_kwh": np.random.normal(1000, 70, len(timestamps)),
-            "moisture_content_pct": np.random.normal(5, 0.5, len(timestamps))
-        }
-    else:
-        raise ValueError("Invalid scenario. Choose from ['normal', 'critical_low', 'critical_high'].")
+    # end is exclusive: duration_days of samples, without an extra one at end_datetime
+    timestamps = pd.date_range(start=start_datetime, end=end_datetime, freq=f"{interval_minutes}min", inclusive="left")
 
-    df = pd.DataFrame(data)
+    # Serial runs draw from the root stream; parallel runs spawn one child SeedSequence per chunk from it
+    rng = np.random.default_rng(np.random.SeedSequence(seed))
 
     os.makedirs(output_dir, exist_ok=True)
-    output_file = os.path.join(output_dir, "stage1_raw_materials.csv")
-    df.to_csv(output_file, index=False)
+    output_file = os.path.join(output_dir, f"stage1_raw_materials.{output_format}")
+    _write_frames(_iter_frames(timestamps, scenario_idx, rng, fast, workers), output_file, output_format)
     logging.info(f"Stage 1 data saved to {output_file}")
 
 
@@ -148,10 +243,18 @@ def parse_args():
     parser.add_argument("--interval_minutes", type=int, default=10,
                         help="Interval between samples in minutes")
     parser.add_argument("--scenario", type=str, default="normal",
-                        choices=["normal", "critical_low", "critical_high"],
+                        choices=list(SCENARIO_NAMES),
                         help="Scenario type: normal, critical_low, critical_high")
     parser.add_argument("--output_dir", type=str, default="data/synthetic/raw",
-                        help="Directory to save generated CSV")
+                        help="Directory to save generated data")
+    parser.add_argument("--format", type=str, default="parquet", choices=list(OUTPUT_FORMATS),
+                        help="Output file format: parquet (Snappy), feather, or csv")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Seed for reproducible output (default: fresh OS entropy)")
+    parser.add_argument("--fast", action="store_true",
+                        help="Generate readings with a parallel Numba kernel (requires numba)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes generating chunks in parallel")
     return parser.parse_args()
 
 
@@ -163,7 +266,11 @@ if __name__ == "__main__":
             duration_days=args.duration_days,
             interval_minutes=args.interval_minutes,
             scenario=args.scenario,
-            output_dir=args.output_dir
+            output_dir=args.output_dir,
+            seed=args.seed,
+            output_format=args.format,
+            fast=args.fast,
+            workers=args.workers
         )
     except Exception as e:
         logging.error(f"Error generating Stage 1 data: {e}")
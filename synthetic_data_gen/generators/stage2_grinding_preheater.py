@@ -1,19 +1,92 @@
-import random
+import argparse
 import datetime
-import json
 import logging
 
-
-# Configure logging
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
-
-
-def validate_inputs(batch_size, interval_seconds):
-    if batch_size <= 0:
-        raise ValueError("Batch size must be a positive integer.")
-
-    if interval_seconds <= 0:
-        raise ValueError("Interval seconds must be a positive integer.")
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+
+try:
+    from ._common import iso_timestamps, uniform_float32, validate_inputs
+except ImportError:  # run as a script from this directory
+    from _common import iso_timestamps, uniform_float32, validate_inputs
+
+
+def _build_table(fields):
+    """Split a field list into (column order, reading columns, lows, highs, flag columns)."""
+    readings = [f for f in fields if isinstance(f, tuple)]
+    return (
+        [f[0] if isinstance(f, tuple) else f for f in fields],
+        [name for name, _, _ in readings],
+        np.array([low for _, low, _ in readings], dtype=np.float64),
+        np.array([high for _, _, high in readings], dtype=np.float64),
+        [f for f in fields if isinstance(f, str)],
+    )
+
+
+# scenario -> fields in output order: (column, low, high) for uniform readings, a bare name for a 0/1 flag
+SCENARIO_FIELDS = {
+    "normal": [
+        # Grinding Mill Parameters
+        ("mill_power_kw", 3500, 5000),
+        ("mill_motor_load_pct", 70, 95),
+        ("mill_outlet_temp_c", 90, 120),
+        ("mill_feed_rate_tph", 180, 250),
+        ("raw_mill_feed_tph", 150, 250),
+        ("raw_mill_power_kw", 300, 500),
+
+        # Separator & Particle Size
+        ("separator_speed_rpm", 900, 1100),
+        ("separator_efficiency_pct", 70, 90),
+        ("residue_on_90um_pct", 5, 15),
+        ("residue_on_212um_pct", 1, 5),
+        "separator_motor_status",  # 0: Off, 1: On
+
+        # Preheater Cyclones
+        ("preheater_inlet_temp_c", 300, 400),
+        ("preheater_outlet_temp_c", 800, 900),
+        ("cyclone_pressure_drop_mbar", 50, 100),
+        ("preheater_O2_pct", 2, 5),
+        ("preheater_CO_pct", 0.1, 0.5),
+        ("gas_flow_rate_nm3h", 10000, 20000),
+        ("dust_load_mgNm3", 10, 50),
+        ("preheater_cyclone_efficiency_pct", 85, 95),
+
+        # Gas Flow & Composition
+        ("co2_pct", 10, 15),
+        ("co_ppm", 50, 100),
+        ("so2_ppm", 10, 20),
+        ("no_x_ppm", 100, 200),
+
+        # Energy & Efficiency
+        ("specific_power_consumption_kwh_t", 20, 30),
+        ("separator_fan_power_kw", 50, 100),
+        ("preheater_fan_power_kw", 100, 200),
+
+        # Alarms / Flags
+        "high_temp_alarm",
+        "high_vibration_alarm",
+        "separator_blockage_alarm",
+        "fan_failure_alarm",
+    ],
+    "critical_low": [
+        # Grinding Mill Parameters
+        ("mill_power_kw", 3000, 3500),
+        ("mill_motor_load_pct", 50, 70),
+        ("mill_outlet_temp_c", 80, 90),
+        ("mill_feed_rate_tph", 100, 150),
+        ("raw_mill_feed_tph", 100, 150),
+    ],
+    "critical_high": [
+        # Grinding Mill Parameters
+        ("mill_power_kw", 5000, 5500),
+        ("mill_motor_load_pct", 95, 110),
+        ("mill_outlet_temp_c", 120, 140),
+        ("mill_feed_rate_tph", 250, 300),
+        ("raw_mill_feed_tph", 250, 300),
+    ],
+}
 
 
 class Stage2GrindingPreheaterGenerator:
@@ -28,10 +101,17 @@ class Stage2GrindingPreheaterGenerator:
     - Energy consumption
     """
 
+    # scenario -> (column order, reading columns, lows, highs, flag columns)
+    SCENARIOS = {name: _build_table(fields) for name, fields in SCENARIO_FIELDS.items()}
+
     def __init__(self, seed: int = None, scenario: str = "normal"):
-        if seed:
-            random.seed(seed)
+        # Own Generator instead of seeding the global random module
+        self.rng = np.random.default_rng(seed)
+        if scenario not in self.SCENARIOS:
+            raise ValueError("Invalid scenario. Choose from ['normal', 'critical_low', 'critical_high'].")
         self.scenario = scenario
+        # Resolved once here so the per-call paths never branch on the scenario name
+        self._params = self.SCENARIOS[scenario]
 
     def generate_record(self, timestamp: datetime.datetime = None):
         """
@@ -40,100 +120,84 @@ class Stage2GrindingPreheaterGenerator:
         if not timestamp:
             timestamp = datetime.datetime.now()
 
-        if self.scenario == "normal":
-            record = {
-                "timestamp": timestamp.isoformat(),
-
-                # Grinding Mill Parameters
-                "mill_power_kw": round(random.uniform(3500, 5000), 2),
-                "mill_motor_load_pct": round(random.uniform(70, 95), 2),
-                "mill_outlet_temp_c": round(random.uniform(90, 120), 2),
-                "mill_feed_rate_tph": round(random.uniform(180, 250), 2),
-                "raw_mill_feed_tph": round(random.uniform(150, 250), 2),
-                "raw_mill_power_kw": round(random.uniform(300, 500), 2),
-
-                # Separator & Particle Size
-                "separator_speed_rpm": round(random.uniform(900, 1100), 2),
-                "separator_efficiency_pct": round(random.uniform(70, 90), 2),
-                "residue_on_90um_pct": round(random.uniform(5, 15), 2),
-                "residue_on_212um_pct": round(random.uniform(1, 5), 2),
-                "separator_motor_status": random.choice([0, 1]),  # 0: Off, 1: On
-
-                # Preheater Cyclones
-                "preheater_inlet_temp_c": round(random.uniform(300, 400), 2),
-                "preheater_outlet_temp_c": round(random.uniform(800, 900), 2),
-                "cyclone_pressure_drop_mbar": round(random.uniform(50, 100), 2),
-                "preheater_O2_pct": round(random.uniform(2, 5), 2),
-                "preheater_CO_pct": round(random.uniform(0.1, 0.5), 2),
-                "gas_flow_rate_nm3h": round(random.uniform(10000, 20000), 2),
-                "dust_load_mgNm3": round(random.uniform(10, 50), 2),
-                "preheater_cyclone_efficiency_pct": round(random.uniform(85, 95), 2),
-
-                # Gas Flow & Composition
-                "co2_pct": round(random.uniform(10, 15), 2),
-                "co_ppm": round(random.uniform(50, 100), 2),
-                "so2_ppm": round(random.uniform(10, 20), 2),
-                "no_x_ppm": round(random.uniform(100, 200), 2),
-
-                # Energy & Efficiency
-                "specific_power_consumption_kwh_t": round(random.uniform(20, 30), 2),
-                "separator_fan_power_kw": round(random.uniform(50, 100), 2),
-                "preheater_fan_power_kw": round(random.uniform(100, 200), 2),
-
-                # Alarms / Flags
-                "high_temp_alarm": random.choice([0, 1]),
-                "high_vibration_alarm": random.choice([0, 1]),
-                "separator_blockage_alarm": random.choice([0, 1]),
-                "fan_failure_alarm": random.choice([0, 1]),
-            }
-        elif self.scenario == "critical_low":
-            record = {
-                "timestamp": timestamp.isoformat(),
-
-                # Grinding Mill Parameters
-                "mill_power_kw": round(random.uniform(3000, 3500), 2),
-                "mill_motor_load_pct": round(random.uniform(50, 70), 2),
-                "mill_outlet_temp_c": round(random.uniform(80, 90), 2),
-                "mill_feed_rate_tph": round(random.uniform(100, 150), 2),
-                "raw_mill_feed_tph": round(random.uniform(100, 150), 2),
-            }
-        elif self.scenario == "critical_high":
-            record = {
-                "timestamp": timestamp.isoformat(),
-
-                # Grinding Mill Parameters
-                "mill_power_kw": round(random.uniform(5000, 5500), 2),
-                "mill_motor_load_pct": round(random.uniform(95, 110), 2),
-                "mill_outlet_temp_c": round(random.uniform(120, 140), 2),
-                "mill_feed_rate_tph": round(random.uniform(250, 300), 2),
-                "raw_mill_feed_tph": round(random.uniform(250, 300), 2),
-            }
-        else:
-            raise ValueError("Invalid scenario. Choose from ['normal', 'critical_low', 'critical_high'].")
+        columns, reading_cols, lows, highs, flag_cols = self._params
+        values = dict(zip(reading_cols, self.rng.uniform(lows, highs).round(2).tolist()))
+        values.update(zip(flag_cols, self.rng.integers(0, 2, size=len(flag_cols), dtype=np.int8).tolist()))
 
+        record = {"timestamp": timestamp.isoformat()}
+        record.update((col, values[col]) for col in columns)
         return record
 
+    def _draw(self, n: int):
+        """(n, readings) float32 and (n, flags) int8 matrices, in reading_cols / flag_cols order."""
+        _, reading_cols, lows, highs, flag_cols = self._params
+        readings = uniform_float32(self.rng, lows, highs, n)
+        flags = self.rng.integers(0, 2, size=(n, len(flag_cols)), dtype=np.int8)
+        return readings, flags
+
     def generate_batch(self, n: int = 10, start_time: datetime.datetime = None, interval_seconds: int = 60):
         """
         Generate a batch of synthetic records over time.
+        All readings are drawn in one vectorized call; returns a DataFrame with one row per record.
+        Readings are unrounded float32; they are quantized to 2 decimals when serialized.
         """
         validate_inputs(n, interval_seconds)
+        columns, reading_cols, _, _, flag_cols = self._params
 
         if not start_time:
             start_time = datetime.datetime.now()
 
-        batch = []
-        for i in range(n):
-            ts = start_time + datetime.timedelta(seconds=i * interval_seconds)
-            batch.append(self.generate_record(timestamp=ts))
+        readings, flags = self._draw(n)
+        df = pd.DataFrame(readings, columns=reading_cols, copy=False)
+        if flag_cols:
+            df[flag_cols] = flags
+        df = df[columns]
+        df.insert(0, "timestamp", iso_timestamps(start_time, n, interval_seconds))
+        return df
 
-        return batch
+    def generate_batch_arrow(self, n: int = 10, start_time: datetime.datetime = None, interval_seconds: int = 60):
+        """
+        Generate the same batch as generate_batch as a pyarrow.RecordBatch, without going through pandas.
+        Callers pick the final form: to_pandas(), to_pylist(), or pyarrow.csv.write_csv.
+        """
+        validate_inputs(n, interval_seconds)
+        columns, reading_cols, _, _, flag_cols = self._params
+
+        if not start_time:
+            start_time = datetime.datetime.now()
+
+        readings, flags = self._draw(n)
+        arrays = dict(zip(reading_cols, readings.T))
+        arrays.update(zip(flag_cols, flags.T))
+        return pa.RecordBatch.from_arrays(
+            [pa.array(iso_timestamps(start_time, n, interval_seconds))] + [pa.array(arrays[col]) for col in columns],
+            names=["timestamp"] + columns,
+        )
+
+    def generate_records(self, n: int = 10, start_time: datetime.datetime = None, interval_seconds: int = 60):
+        """
+        Generate a batch as a list of dicts (one per record), for JSON-style consumers.
+        """
+        df = self.generate_batch(n, start_time, interval_seconds)
+        reading_cols = self._params[1]
+        # Widen before rounding so the dict values are the nearest 2-decimal doubles
+        df[reading_cols] = df[reading_cols].astype(np.float64).round(2)
+        return df.to_dict(orient="records")
 
 
 if __name__ == "__main__":
-    gen = Stage2GrindingPreheaterGenerator(seed=42)
+    parser = argparse.ArgumentParser(description="Stage 2 synthetic data generator")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for reproducible output")
+    parser.add_argument("--preview", action="store_true", help="Log the whole batch instead of only the first record")
+    args = parser.parse_args()
+
+    gen = Stage2GrindingPreheaterGenerator(seed=args.seed)
     try:
         data = gen.generate_batch(n=5)
-        logging.info(json.dumps(data, indent=2))
+        if args.preview:
+            logging.info(data.to_json(orient="records", double_precision=2, indent=2))
+        else:
+            logging.info("Generated %d records; first: %s", len(data),
+                         data.iloc[0].to_json(double_precision=2))
     except Exception as e:
         logging.error(f"Error generating Stage 2 data: {e}")
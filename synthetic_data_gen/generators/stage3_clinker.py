@@ -1,17 +1,114 @@
-import random
+import argparse
 import datetime
-import json
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+
+try:
+    from ._common import iso_timestamps, uniform_float32, validate_inputs
+except ImportError:  # run as a script from this directory
+    from _common import iso_timestamps, uniform_float32, validate_inputs
+
+
+SCENARIO_NAMES = ("normal", "critical_low", "critical_high")
+
+# categorical fields -> possible values, drawn uniformly
+CATEGORIES = {
+    "kiln_refractory_status": ["Good", "Worn", "Critical"],
+}
+
+# Fields in output order: (column, low, high) for uniform readings under the normal scenario,
+# a bare name for a 0/1 flag or, if listed in CATEGORIES, a draw from its choices
+FIELDS = [
+    # Kiln Operation
+    ("kiln_speed_rpm", 3.0, 4.5),
+    ("kiln_main_drive_power_kw", 450, 650),
+    ("kiln_inlet_temp_c", 950, 1050),
+    ("kiln_outlet_temp_c", 1350, 1450),
+    ("kiln_shell_temp_c", 250, 400),
+    ("kiln_coating_thickness_mm", 10, 30),
+    "kiln_refractory_status",
+
+    # Burner & Fuel
+    ("burner_flame_temp_c", 1500, 1600),
+    ("primary_air_flow_nm3_hr", 5000, 10000),
+    ("secondary_air_flow_nm3_hr", 10000, 20000),
+    ("coal_feed_rate_tph", 10, 20),
+    ("oil_injection_lph", 50, 100),
+
+    # Gas Composition
+    ("kiln_exit_o2_pct", 2, 5),
+    ("kiln_exit_co_ppm", 50, 100),
+    ("kiln_exit_no_x_ppm", 100, 200),
+    ("kiln_exit_so2_ppm", 10, 20),
+
+    # Clinker Cooler
+    ("cooler_inlet_temp_c", 300, 400),
+    ("cooler_outlet_temp_c", 100, 200),
+    ("cooler_air_flow_nm3_hr", 5000, 10000),
+    ("cooler_fan_power_kw", 50, 100),
+    ("clinker_discharge_rate_tph", 100, 200),
+    ("cooler_efficiency_pct", 85, 95),
+
+    # Energy & Efficiency
+    ("specific_heat_consumption_kcal_kg", 700, 800),
+    ("kiln_specific_power_kwht", 20, 30),
+
+    # Alarms / Flags
+    "high_co_alarm",
+    "flame_instability_alarm",
+    "kiln_vibration_alarm",
+    "cooler_fan_failure_alarm",
+
+    # Missing fields
+    ("kiln_feed_tph", 150, 200),
+    ("kiln_main_burner_fuel_kgph", 1000, 2000),
+    ("kiln_secondary_air_temp_c", 800, 900),
+    ("kiln_exit_gas_temp_c", 300, 400),
+    ("kiln_O2_pct", 2, 5),
+    ("clinker_quality_lsf", 90, 100),
+    ("clinker_quality_silica_modulus", 2, 3),
+    ("clinker_free_lime_pct", 1, 2),
+    ("cooler_pressure_drop_pa", 100, 200),
+    ("kiln_NOx_ppm", 100, 200),
+    ("kiln_CO_ppm", 50, 100),
+    ("cooler_exit_temp_c", 100, 200),
+]
+
+COLUMNS = [f[0] if isinstance(f, tuple) else f for f in FIELDS]
+READING_COLUMNS = [f[0] for f in FIELDS if isinstance(f, tuple)]
+FLAG_COLUMNS = [f for f in FIELDS if isinstance(f, str) and f not in CATEGORIES]
+CATEGORY_COLUMNS = [f for f in FIELDS if isinstance(f, str) and f in CATEGORIES]
+
+# Only the kiln operating point moves between scenarios; every other reading keeps its normal bounds
+SCENARIO_OVERRIDES = {
+    "critical_low": {
+        "kiln_speed_rpm": (2.0, 3.0),
+        "kiln_main_drive_power_kw": (300, 450),
+        "kiln_inlet_temp_c": (850, 950),
+        "kiln_outlet_temp_c": (1250, 1350),
+    },
+    "critical_high": {
+        "kiln_speed_rpm": (4.5, 6.0),
+        "kiln_main_drive_power_kw": (650, 800),
+        "kiln_inlet_temp_c": (1050, 1150),
+        "kiln_outlet_temp_c": (1450, 1550),
+    },
+}
+
+
+def _scenario_bounds(scenario):
+    """(low, high) per READING_COLUMNS for a scenario: the normal bounds with its overrides applied."""
+    overrides = SCENARIO_OVERRIDES.get(scenario, {})
+    return [overrides.get(f[0], f[1:]) for f in FIELDS if isinstance(f, tuple)]
+
+
+# (scenario, reading column, low/high) bounds, indexed by SCENARIO_NAMES and READING_COLUMNS
+PARAMS = np.array([_scenario_bounds(name) for name in SCENARIO_NAMES], dtype=np.float64)
 
-def validate_inputs(batch_size, interval_seconds):
-    if batch_size <= 0:
-        raise ValueError("Batch size must be a positive integer.")
-
-    if interval_seconds <= 0:
-        raise ValueError("Interval seconds must be a positive integer.")
 
 class Stage3ClinkerGenerator:
     """
@@ -26,9 +123,14 @@ class Stage3ClinkerGenerator:
     """
 
     def __init__(self, seed: int = None, scenario: str = "normal"):
-        if seed:
-            random.seed(seed)
+        # Own Generator instead of seeding the global random module
+        self.rng = np.random.default_rng(seed)
+        if scenario not in SCENARIO_NAMES:
+            raise ValueError("Invalid scenario. Choose from ['normal', 'critical_low', 'critical_high'].")
         self.scenario = scenario
+        # (lows, highs) resolved once here so the per-call paths never branch on the scenario name
+        params = PARAMS[SCENARIO_NAMES.index(scenario)]
+        self._params = (np.ascontiguousarray(params[:, 0]), np.ascontiguousarray(params[:, 1]))
 
     def generate_record(self, timestamp: datetime.datetime = None):
         """
@@ -37,205 +139,88 @@ class Stage3ClinkerGenerator:
         if not timestamp:
             timestamp = datetime.datetime.now()
 
-        if self.scenario == "normal":
-            record = {
-                "timestamp": timestamp.isoformat(),
-
-                # Kiln Operation
-                "kiln_speed_rpm": round(random.uniform(3.0, 4.5), 2),
-                "kiln_main_drive_power_kw": round(random.uniform(450, 650), 2),
-                "kiln_inlet_temp_c": round(random.uniform(950, 1050), 2),
-                "kiln_outlet_temp_c": round(random.uniform(1350, 1450), 2),
-                "kiln_shell_temp_c": round(random.uniform(250, 400), 2),
-                "kiln_coating_thickness_mm": round(random.uniform(10, 30), 2),
-                "kiln_refractory_status": random.choice(["Good", "Worn", "Critical"]),
-
-                # Burner & Fuel
-                "burner_flame_temp_c": round(random.uniform(1500, 1600), 2),
-                "primary_air_flow_nm3_hr": round(random.uniform(5000, 10000), 2),
-                "secondary_air_flow_nm3_hr": round(random.uniform(10000, 20000), 2),
-                "coal_feed_rate_tph": round(random.uniform(10, 20), 2),
-                "oil_injection_lph": round(random.uniform(50, 100), 2),
-
-                # Gas Composition
-                "kiln_exit_o2_pct": round(random.uniform(2, 5), 2),
-                "kiln_exit_co_ppm": round(random.uniform(50, 100), 2),
-                "kiln_exit_no_x_ppm": round(random.uniform(100, 200), 2),
-                "kiln_exit_so2_ppm": round(random.uniform(10, 20), 2),
-
-                # Clinker Cooler
-                "cooler_inlet_temp_c": round(random.uniform(300, 400), 2),
-                "cooler_outlet_temp_c": round(random.uniform(100, 200), 2),
-                "cooler_air_flow_nm3_hr": round(random.uniform(5000, 10000), 2),
-                "cooler_fan_power_kw": round(random.uniform(50, 100), 2),
-                "clinker_discharge_rate_tph": round(random.uniform(100, 200), 2),
-                "cooler_efficiency_pct": round(random.uniform(85, 95), 2),
-
-                # Energy & Efficiency
-                "specific_heat_consumption_kcal_kg": round(random.uniform(700, 800), 2),
-                "kiln_specific_power_kwht": round(random.uniform(20, 30), 2),
-
-                # Alarms / Flags
-                "high_co_alarm": random.choice([0, 1]),
-                "flame_instability_alarm": random.choice([0, 1]),
-                "kiln_vibration_alarm": random.choice([0, 1]),
-                "cooler_fan_failure_alarm": random.choice([0, 1]),
-
-                # Missing fields
-                "kiln_feed_tph": round(random.uniform(150, 200), 2),
-                "kiln_main_burner_fuel_kgph": round(random.uniform(1000, 2000), 2),
-                "kiln_secondary_air_temp_c": round(random.uniform(800, 900), 2),
-                "kiln_exit_gas_temp_c": round(random.uniform(300, 400), 2),
-                "kiln_O2_pct": round(random.uniform(2, 5), 2),
-                "clinker_quality_lsf": round(random.uniform(90, 100), 2),
-                "clinker_quality_silica_modulus": round(random.uniform(2, 3), 2),
-                "clinker_free_lime_pct": round(random.uniform(1, 2), 2),
-                "cooler_pressure_drop_pa": round(random.uniform(100, 200), 2),
-                "kiln_NOx_ppm": round(random.uniform(100, 200), 2),
-                "kiln_CO_ppm": round(random.uniform(50, 100), 2),
-                "cooler_exit_temp_c": round(random.uniform(100, 200), 2),
-            }
-        elif self.scenario == "critical_low":
-            record = {
-                "timestamp": timestamp.isoformat(),
-
-                # Kiln Operation
-                "kiln_speed_rpm": round(random.uniform(2.0, 3.0), 2),
-                "kiln_main_drive_power_kw": round(random.uniform(300, 450), 2),
-                "kiln_inlet_temp_c": round(random.uniform(850, 950), 2),
-                "kiln_outlet_temp_c": round(random.uniform(1250, 1350), 2),
-                "kiln_shell_temp_c": round(random.uniform(250, 400), 2),
-                "kiln_coating_thickness_mm": round(random.uniform(10, 30), 2),
-                "kiln_refractory_status": random.choice(["Good", "Worn", "Critical"]),
-
-                # Burner & Fuel
-                "burner_flame_temp_c": round(random.uniform(1500, 1600), 2),
-                "primary_air_flow_nm3_hr": round(random.uniform(5000, 10000), 2),
-                "secondary_air_flow_nm3_hr": round(random.uniform(10000, 20000), 2),
-                "coal_feed_rate_tph": round(random.uniform(10, 20), 2),
-                "oil_injection_lph": round(random.uniform(50, 100), 2),
-
-                # Gas Composition
-                "kiln_exit_o2_pct": round(random.uniform(2, 5), 2),
-                "kiln_exit_co_ppm": round(random.uniform(50, 100), 2),
-                "kiln_exit_no_x_ppm": round(random.uniform(100, 200), 2),
-                "kiln_exit_so2_ppm": round(random.uniform(10, 20), 2),
-
-                # Clinker Cooler
-                "cooler_inlet_temp_c": round(random.uniform(300, 400), 2),
-                "cooler_outlet_temp_c": round(random.uniform(100, 200), 2),
-                "cooler_air_flow_nm3_hr": round(random.uniform(5000, 10000), 2),
-                "cooler_fan_power_kw": round(random.uniform(50, 100), 2),
-                "clinker_discharge_rate_tph": round(random.uniform(100, 200), 2),
-                "cooler_efficiency_pct": round(random.uniform(85, 95), 2),
-
-                # Energy & Efficiency
-                "specific_heat_consumption_kcal_kg": round(random.uniform(700, 800), 2),
-                "kiln_specific_power_kwht": round(random.uniform(20, 30), 2),
-
-                # Alarms / Flags
-                "high_co_alarm": random.choice([0, 1]),
-                "flame_instability_alarm": random.choice([0, 1]),
-                "kiln_vibration_alarm": random.choice([0, 1]),
-                "cooler_fan_failure_alarm": random.choice([0, 1]),
-
-                # Missing fields
-                "kiln_feed_tph": round(random.uniform(150, 200), 2),
-                "kiln_main_burner_fuel_kgph": round(random.uniform(1000, 2000), 2),
-                "kiln_secondary_air_temp_c": round(random.uniform(800, 900), 2),
-                "kiln_exit_gas_temp_c": round(random.uniform(300, 400), 2),
-                "kiln_O2_pct": round(random.uniform(2, 5), 2),
-                "clinker_quality_lsf": round(random.uniform(90, 100), 2),
-                "clinker_quality_silica_modulus": round(random.uniform(2, 3), 2),
-                "clinker_free_lime_pct": round(random.uniform(1, 2), 2),
-                "cooler_pressure_drop_pa": round(random.uniform(100, 200), 2),
-                "kiln_NOx_ppm": round(random.uniform(100, 200), 2),
-                "kiln_CO_ppm": round(random.uniform(50, 100), 2),
-                "cooler_exit_temp_c": round(random.uniform(100, 200), 2),
-            }
-        elif self.scenario == "critical_high":
-            record = {
-                "timestamp": timestamp.isoformat(),
-
-                # Kiln Operation
-                "kiln_speed_rpm": round(random.uniform(4.5, 6.0), 2),
-                "kiln_main_drive_power_kw": round(random.uniform(650, 800), 2),
-                "kiln_inlet_temp_c": round(random.uniform(1050, 1150), 2),
-                "kiln_outlet_temp_c": round(random.uniform(1450, 1550), 2),
-                "kiln_shell_temp_c": round(random.uniform(250, 400), 2),
-                "kiln_coating_thickness_mm": round(random.uniform(10, 30), 2),
-                "kiln_refractory_status": random.choice(["Good", "Worn", "Critical"]),
-
-                # Burner & Fuel
-                "burner_flame_temp_c": round(random.uniform(1500, 1600), 2),
-                "primary_air_flow_nm3_hr": round(random.uniform(5000, 10000), 2),
-                "secondary_air_flow_nm3_hr": round(random.uniform(10000, 20000), 2),
-                "coal_feed_rate_tph": round(random.uniform(10, 20), 2),
-                "oil_injection_lph": round(random.uniform(50, 100), 2),
-
-                # Gas Composition
-                "kiln_exit_o2_pct": round(random.uniform(2, 5), 2),
-                "kiln_exit_co_ppm": round(random.uniform(50, 100), 2),
-                "kiln_exit_no_x_ppm": round(random.uniform(100, 200), 2),
-                "kiln_exit_so2_ppm": round(random.uniform(10, 20), 2),
-
-                # Clinker Cooler
-                "cooler_inlet_temp_c": round(random.uniform(300, 400), 2),
-                "cooler_outlet_temp_c": round(random.uniform(100, 200), 2),
-                "cooler_air_flow_nm3_hr": round(random.uniform(5000, 10000), 2),
-                "cooler_fan_power_kw": round(random.uniform(50, 100), 2),
-                "clinker_discharge_rate_tph": round(random.uniform(100, 200), 2),
-                "cooler_efficiency_pct": round(random.uniform(85, 95), 2),
-
-                # Energy & Efficiency
-                "specific_heat_consumption_kcal_kg": round(random.uniform(700, 800), 2),
-                "kiln_specific_power_kwht": round(random.uniform(20, 30), 2),
-
-                # Alarms / Flags
-                "high_co_alarm": random.choice([0, 1]),
-                "flame_instability_alarm": random.choice([0, 1]),
-                "kiln_vibration_alarm": random.choice([0, 1]),
-                "cooler_fan_failure_alarm": random.choice([0, 1]),
-
-                # Missing fields
-                "kiln_feed_tph": round(random.uniform(150, 200), 2),
-                "kiln_main_burner_fuel_kgph": round(random.uniform(1000, 2000), 2),
-                "kiln_secondary_air_temp_c": round(random.uniform(800, 900), 2),
-                "kiln_exit_gas_temp_c": round(random.uniform(300, 400), 2),
-                "kiln_O2_pct": round(random.uniform(2, 5), 2),
-                "clinker_quality_lsf": round(random.uniform(90, 100), 2),
-                "clinker_quality_silica_modulus": round(random.uniform(2, 3), 2),
-                "clinker_free_lime_pct": round(random.uniform(1, 2), 2),
-                "cooler_pressure_drop_pa": round(random.uniform(100, 200), 2),
-                "kiln_NOx_ppm": round(random.uniform(100, 200), 2),
-                "kiln_CO_ppm": round(random.uniform(50, 100), 2),
-                "cooler_exit_temp_c": round(random.uniform(100, 200), 2),
-            }
-        else:
-            raise ValueError("Invalid scenario. Choose from ['normal', 'critical_low', 'critical_high'].")
+        lows, highs = self._params
+        values = dict(zip(READING_COLUMNS, self.rng.uniform(lows, highs).round(2).tolist()))
+        values.update(zip(FLAG_COLUMNS, self.rng.integers(0, 2, size=len(FLAG_COLUMNS), dtype=np.int8).tolist()))
+        values.update((col, CATEGORIES[col][self.rng.integers(len(CATEGORIES[col]))]) for col in CATEGORY_COLUMNS)
 
+        record = {"timestamp": timestamp.isoformat()}
+        record.update((col, values[col]) for col in COLUMNS)
         return record
 
+    def _draw(self, n: int):
+        """(n, readings) float32 and (n, flags) int8 matrices, plus one object array per categorical column."""
+        lows, highs = self._params
+        readings = uniform_float32(self.rng, lows, highs, n)
+        flags = self.rng.integers(0, 2, size=(n, len(FLAG_COLUMNS)), dtype=np.int8)
+        categories = {}
+        for col in CATEGORY_COLUMNS:
+            choices = np.array(CATEGORIES[col], dtype=object)
+            categories[col] = choices[self.rng.integers(len(choices), size=n)]
+        return readings, flags, categories
+
     def generate_batch(self, n: int = 10, start_time: datetime.datetime = None, interval_seconds: int = 60):
         """
         Generate a batch of synthetic records over time.
+        All readings are drawn in one vectorized call; returns a DataFrame with one row per record.
+        Readings are unrounded float32; they are quantized to 2 decimals when serialized.
+        """
+        validate_inputs(n, interval_seconds)
+
+        if not start_time:
+            start_time = datetime.datetime.now()
+
+        readings, flags, categories = self._draw(n)
+        df = pd.DataFrame(readings, columns=READING_COLUMNS, copy=False)
+        df[FLAG_COLUMNS] = flags
+        for col, values in categories.items():
+            df[col] = values
+        df = df[COLUMNS]
+        df.insert(0, "timestamp", iso_timestamps(start_time, n, interval_seconds))
+        return df
+
+    def generate_batch_arrow(self, n: int = 10, start_time: datetime.datetime = None, interval_seconds: int = 60):
+        """
+        Generate the same batch as generate_batch as a pyarrow.RecordBatch, without going through pandas.
+        Callers pick the final form: to_pandas(), to_pylist(), or pyarrow.csv.write_csv.
         """
         validate_inputs(n, interval_seconds)
 
         if not start_time:
             start_time = datetime.datetime.now()
 
-        batch = []
-        for i in range(n):
-            ts = start_time + datetime.timedelta(seconds=i * interval_seconds)
-            batch.append(self.generate_record(timestamp=ts))
+        readings, flags, categories = self._draw(n)
+        arrays = dict(zip(READING_COLUMNS, readings.T))
+        arrays.update(zip(FLAG_COLUMNS, flags.T))
+        arrays.update(categories)
+        return pa.RecordBatch.from_arrays(
+            [pa.array(iso_timestamps(start_time, n, interval_seconds))] + [pa.array(arrays[col]) for col in COLUMNS],
+            names=["timestamp"] + COLUMNS,
+        )
+
+    def generate_records(self, n: int = 10, start_time: datetime.datetime = None, interval_seconds: int = 60):
+        """
+        Generate a batch as a list of dicts (one per record), for JSON-style consumers.
+        """
+        df = self.generate_batch(n, start_time, interval_seconds)
+        # Widen before rounding so the dict values are the nearest 2-decimal doubles
+        df[READING_COLUMNS] = df[READING_COLUMNS].astype(np.float64).round(2)
+        return df.to_dict(orient="records")
 
-        return batch
 
 if __name__ == "__main__":
-    gen = Stage3ClinkerGenerator(seed=42)
+    parser = argparse.ArgumentParser(description="Stage 3 synthetic data generator")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for reproducible output")
+    parser.add_argument("--preview", action="store_true", help="Log the whole batch instead of only the first record")
+    args = parser.parse_args()
+
+    gen = Stage3ClinkerGenerator(seed=args.seed)
     try:
         data = gen.generate_batch(n=5)
-        logging.info(json.dumps(data, indent=2))
+        if args.preview:
+            logging.info(data.to_json(orient="records", double_precision=2, indent=2))
+        else:
+            logging.info("Generated %d records; first: %s", len(data),
+                         data.iloc[0].to_json(double_precision=2))
     except Exception as e:
         logging.error(f"Error generating Stage 3 data: {e}")
@@ -3,15 +3,72 @@ import datetime
 import json
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+import numpy as np
+import pandas as pd
 
-def validate_inputs(batch_size, interval_seconds):
-    if batch_size <= 0:
-        raise ValueError("Batch size must be a positive integer.")
 
-    if interval_seconds <= 0:
-        raise ValueError("Interval seconds must be a positive integer.")
+try:
+    from ._common import FAST_BLOCK_ROWS, fast_uniform_kernel, iso_timestamps, record_specs, validate_inputs
+except ImportError:  # run as a script from this directory
+    from _common import FAST_BLOCK_ROWS, fast_uniform_kernel, iso_timestamps, record_specs, validate_inputs
+
+
+SCENARIO_NAMES = ("normal", "critical_low", "critical_high")
+
+# Fields in output order: (column, (low, high) per SCENARIO_NAMES) for uniform readings
+# or a bare name for a 0/1 flag
+FIELDS = [
+    # Mill Operation
+    ("mill_motor_power_kw", (2500, 4000), (2000, 2500), (4000, 5000)),
+    ("mill_outlet_temp_c", (95, 120), (80, 95), (120, 140)),
+    ("mill_feed_rate_tph", (120, 180), (100, 120), (180, 250)),
+    ("mill_vibration_mm_s", (1, 3), (1, 3), (3, 5)),
+
+    # Separator
+    ("separator_speed_rpm", (900, 1100), (700, 900), (1100, 1300)),
+    ("separator_efficiency_pct", (70, 90), (50, 70), (90, 95)),
+    "separator_motor_status",  # 0: Off, 1: On
+
+    # Additives
+    ("gypsum_feed_rate_tph", (5, 15), (3, 7), (10, 20)),
+    ("flyash_feed_rate_tph", (5, 15), (3, 7), (10, 20)),
+    ("slag_feed_rate_tph", (5, 15), (3, 7), (10, 20)),
+    ("additive_blending_ratio", (0.1, 0.5), (0.05, 0.1), (0.4, 0.6)),
+
+    # Cement Quality
+    ("fineness_blaine_cm2_g", (3000, 4000), (2500, 3000), (3500, 4500)),
+    ("residue_45_micron_pct", (5, 10), (10, 15), (0, 5)),
+    ("cement_temp_c", (80, 100), (70, 80), (90, 110)),
+
+    # Energy
+    ("specific_power_consumption_kwh_t", (20, 30), (15, 20), (25, 35)),
+
+    # Alarms
+    "mill_high_vibration_alarm",
+    "separator_blockage_alarm",
+    "mill_overload_alarm",
+    "separator_efficiency_drop_alarm",
+
+    # Additional Fields
+    ("clinker_feed_tph", (100, 150), (80, 100), (120, 150)),
+    ("additive_feed_tph", (10, 20), (5, 10), (15, 25)),
+    ("cement_mill_power_kw", (300, 500), (250, 350), (400, 600)),
+    ("cement_mill_outlet_temp_c", (90, 110), (85, 95), (95, 115)),
+    ("cement_strength_3d_mpa", (20, 30), (15, 20), (25, 35)),
+    ("cement_strength_28d_mpa", (40, 50), (35, 40), (45, 55)),
+    ("cement_mill_vibration_mm", (1, 3), (1, 3), (2, 4)),
+]
+
+READING_COLUMNS = [f[0] for f in FIELDS if isinstance(f, tuple)]
+FLAG_COLUMNS = [f for f in FIELDS if isinstance(f, str)]
+COLUMNS = [f[0] if isinstance(f, tuple) else f for f in FIELDS]
+
+# (scenario, reading column, low/high) bounds, indexed by SCENARIO_NAMES and READING_COLUMNS
+PARAMS = np.array([f[1:] for f in FIELDS if isinstance(f, tuple)], dtype=np.float64).transpose(1, 0, 2)
+
+# Per-scenario generate_record specs, see record_specs
+_SCENARIO_BOUNDS = record_specs(FIELDS, SCENARIO_NAMES)
+
 
 class Stage4CementGrindingGenerator:
     """
@@ -25,169 +82,71 @@ class Stage4CementGrindingGenerator:
     - Cement quality indicators
     """
 
-    def __init__(self, seed: int = None, scenario: str = "normal"):
-        if seed:
-            random.seed(seed)
+    def __init__(self, seed: int = None, scenario: str = "normal", fast: bool = False):
+        # Own random streams instead of seeding the global random module: batches are drawn
+        # with NumPy, single records with a random.Random
+        self.rng = np.random.default_rng(seed)
+        self._random = random.Random(seed)
+        if scenario not in _SCENARIO_BOUNDS:
+            raise ValueError("Invalid scenario. Choose from ['normal', 'critical_low', 'critical_high'].")
         self.scenario = scenario
+        # Bounds resolved once here so the per-call paths never branch on the scenario name
+        self._spec = _SCENARIO_BOUNDS[scenario]
+        params = PARAMS[SCENARIO_NAMES.index(scenario)]
+        self._params = (np.ascontiguousarray(params[:, 0]), np.ascontiguousarray(params[:, 1]))
+        # Fill batch readings with a parallel Numba kernel (requires numba); pays off on large batches
+        self.fast = fast
 
     def generate_record(self, timestamp: datetime.datetime = None):
         if not timestamp:
             timestamp = datetime.datetime.now()
 
-        if self.scenario == "normal":
-            record = {
-                "timestamp": timestamp.isoformat(),
-
-                # Mill Operation
-                "mill_motor_power_kw": round(random.uniform(2500, 4000), 2),
-                "mill_outlet_temp_c": round(random.uniform(95, 120), 2),
-                "mill_feed_rate_tph": round(random.uniform(120, 180), 2),
-                "mill_vibration_mm_s": round(random.uniform(1, 3), 2),
-
-                # Separator
-                "separator_speed_rpm": round(random.uniform(900, 1100), 2),
-                "separator_efficiency_pct": round(random.uniform(70, 90), 2),
-                "separator_motor_status": random.choice([0, 1]),  # 0: Off, 1: On
-
-                # Additives
-                "gypsum_feed_rate_tph": round(random.uniform(5, 15), 2),
-                "flyash_feed_rate_tph": round(random.uniform(5, 15), 2),
-                "slag_feed_rate_tph": round(random.uniform(5, 15), 2),
-                "additive_blending_ratio": round(random.uniform(0.1, 0.5), 2),
-
-                # Cement Quality
-                "fineness_blaine_cm2_g": round(random.uniform(3000, 4000), 2),
-                "residue_45_micron_pct": round(random.uniform(5, 10), 2),
-                "cement_temp_c": round(random.uniform(80, 100), 2),
-
-                # Energy
-                "specific_power_consumption_kwh_t": round(random.uniform(20, 30), 2),
-
-                # Alarms
-                "mill_high_vibration_alarm": random.choice([0, 1]),
-                "separator_blockage_alarm": random.choice([0, 1]),
-                "mill_overload_alarm": random.choice([0, 1]),
-                "separator_efficiency_drop_alarm": random.choice([0, 1]),
-
-                # Additional Fields
-                "clinker_feed_tph": round(random.uniform(100, 150), 2),
-                "additive_feed_tph": round(random.uniform(10, 20), 2),
-                "cement_mill_power_kw": round(random.uniform(300, 500), 2),
-                "cement_mill_outlet_temp_c": round(random.uniform(90, 110), 2),
-                "cement_strength_3d_mpa": round(random.uniform(20, 30), 2),
-                "cement_strength_28d_mpa": round(random.uniform(40, 50), 2),
-                "cement_mill_vibration_mm": round(random.uniform(1, 3), 2),
-            }
-        elif self.scenario == "critical_low":
-            record = {
-                "timestamp": timestamp.isoformat(),
-
-                # Mill Operation
-                "mill_motor_power_kw": round(random.uniform(2000, 2500), 2),
-                "mill_outlet_temp_c": round(random.uniform(80, 95), 2),
-                "mill_feed_rate_tph": round(random.uniform(100, 120), 2),
-                "mill_vibration_mm_s": round(random.uniform(1, 3), 2),
-
-                # Separator
-                "separator_speed_rpm": round(random.uniform(700, 900), 2),
-                "separator_efficiency_pct": round(random.uniform(50, 70), 2),
-                "separator_motor_status": random.choice([0, 1]),  # 0: Off, 1: On
-
-                # Additives
-                "gypsum_feed_rate_tph": round(random.uniform(3, 7), 2),
-                "flyash_feed_rate_tph": round(random.uniform(3, 7), 2),
-                "slag_feed_rate_tph": round(random.uniform(3, 7), 2),
-                "additive_blending_ratio": round(random.uniform(0.05, 0.1), 2),
-
-                # Cement Quality
-                "fineness_blaine_cm2_g": round(random.uniform(2500, 3000), 2),
-                "residue_45_micron_pct": round(random.uniform(10, 15), 2),
-                "cement_temp_c": round(random.uniform(70, 80), 2),
-
-                # Energy
-                "specific_power_consumption_kwh_t": round(random.uniform(15, 20), 2),
-
-                # Alarms
-                "mill_high_vibration_alarm": random.choice([0, 1]),
-                "separator_blockage_alarm": random.choice([0, 1]),
-                "mill_overload_alarm": random.choice([0, 1]),
-                "separator_efficiency_drop_alarm": random.choice([0, 1]),
-
-                # Additional Fields
-                "clinker_feed_tph": round(random.uniform(80, 100), 2),
-                "additive_feed_tph": round(random.uniform(5, 10), 2),
-                "cement_mill_power_kw": round(random.uniform(250, 350), 2),
-                "cement_mill_outlet_temp_c": round(random.uniform(85, 95), 2),
-                "cement_strength_3d_mpa": round(random.uniform(15, 20), 2),
-                "cement_strength_28d_mpa": round(random.uniform(35, 40), 2),
-                "cement_mill_vibration_mm": round(random.uniform(1, 3), 2),
-            }
-        elif self.scenario == "critical_high":
-            record = {
-                "timestamp": timestamp.isoformat(),
-
-                # Mill Operation
-                "mill_motor_power_kw": round(random.uniform(4000, 5000), 2),
-                "mill_outlet_temp_c": round(random.uniform(120, 140), 2),
-                "mill_feed_rate_tph": round(random.uniform(180, 250), 2),
-                "mill_vibration_mm_s": round(random.uniform(3, 5), 2),
-
-                # Separator
-                "separator_speed_rpm": round(random.uniform(1100, 1300), 2),
-                "separator_efficiency_pct": round(random.uniform(90, 95), 2),
-                "separator_motor_status": random.choice([0, 1]),  # 0: Off, 1: On
-
-                # Additives
-                "gypsum_feed_rate_tph": round(random.uniform(10, 20), 2),
-                "flyash_feed_rate_tph": round(random.uniform(10, 20), 2),
-                "slag_feed_rate_tph": round(random.uniform(10, 20), 2),
-                "additive_blending_ratio": round(random.uniform(0.4, 0.6), 2),
-
-                # Cement Quality
-                "fineness_blaine_cm2_g": round(random.uniform(3500, 4500), 2),
-                "residue_45_micron_pct": round(random.uniform(0, 5), 2),
-                "cement_temp_c": round(random.uniform(90, 110), 2),
-
-                # Energy
-                "specific_power_consumption_kwh_t": round(random.uniform(25, 35), 2),
-
-                # Alarms
-                "mill_high_vibration_alarm": random.choice([0, 1]),
-                "separator_blockage_alarm": random.choice([0, 1]),
-                "mill_overload_alarm": random.choice([0, 1]),
-                "separator_efficiency_drop_alarm": random.choice([0, 1]),
-
-                # Additional Fields
-                "clinker_feed_tph": round(random.uniform(120, 150), 2),
-                "additive_feed_tph": round(random.uniform(15, 25), 2),
-                "cement_mill_power_kw": round(random.uniform(400, 600), 2),
-                "cement_mill_outlet_temp_c": round(random.uniform(95, 115), 2),
-                "cement_strength_3d_mpa": round(random.uniform(25, 35), 2),
-                "cement_strength_28d_mpa": round(random.uniform(45, 55), 2),
-                "cement_mill_vibration_mm": round(random.uniform(2, 4), 2),
-            }
-        else:
-            raise ValueError("Invalid scenario. Choose from ['normal', 'critical_low', 'critical_high'].")
+        uniform, getrandbits = self._random.uniform, self._random.getrandbits
+        record = {"timestamp": timestamp.isoformat()}
+        # No count columns in this stage: every spec is a reading or a flag
+        for name, lo, hi, kind in self._spec:
+            if kind == "reading":
+                # Truncating a draw over [lo, hi + 1) hundredths gives an evenly spread 2-decimal value, without round()
+                record[name] = int(uniform(lo, hi)) / 100
+            else:
+                record[name] = getrandbits(1)
 
         return record
 
     def generate_batch(self, n: int = 10, start_time: datetime.datetime = None, interval_seconds: int = 60):
+        """
+        Generate a batch of synthetic records over time.
+        Each kind of field is drawn for all rows in one vectorized call; returns a DataFrame with one row per record.
+        """
         validate_inputs(n, interval_seconds)
+        lows, highs = self._params
 
         if not start_time:
             start_time = datetime.datetime.now()
 
-        batch = []
-        for i in range(n):
-            ts = start_time + datetime.timedelta(seconds=i * interval_seconds)
-            batch.append(self.generate_record(timestamp=ts))
+        if self.fast:
+            readings = np.empty((n, len(READING_COLUMNS)))
+            fast_uniform_kernel()(readings, lows, highs, int(self.rng.integers(2**31)), FAST_BLOCK_ROWS)
+        else:
+            readings = self.rng.uniform(lows, highs, size=(n, len(READING_COLUMNS)))
+            np.round(readings, 2, out=readings)
+        df = pd.DataFrame(readings, columns=READING_COLUMNS, copy=False)
+        df[FLAG_COLUMNS] = self.rng.integers(0, 2, size=(n, len(FLAG_COLUMNS)))
+        df = df[COLUMNS]
+        df.insert(0, "timestamp", iso_timestamps(start_time, n, interval_seconds))
+        return df
+
+    def generate_records(self, n: int = 10, start_time: datetime.datetime = None, interval_seconds: int = 60):
+        """
+        Generate a batch as a list of dicts (one per record), for JSON-style consumers.
+        """
+        return self.generate_batch(n, start_time, interval_seconds).to_dict(orient="records")
 
-        return batch
 
 if __name__ == "__main__":
     gen = Stage4CementGrindingGenerator(seed=42)
     try:
-        data = gen.generate_batch(n=5)
+        data = gen.generate_records(n=5)
         logging.info(json.dumps(data, indent=2))
     except Exception as e:
         logging.error(f"Error generating Stage 4 data: {e}")
@@ -3,17 +3,70 @@ import datetime
 import json
 import logging
 
+import numpy as np
+import pandas as pd
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+try:
+    from ._common import FAST_BLOCK_ROWS, fast_uniform_kernel, iso_timestamps, record_specs, validate_inputs
+except ImportError:  # run as a script from this directory
+    from _common import FAST_BLOCK_ROWS, fast_uniform_kernel, iso_timestamps, record_specs, validate_inputs
 
-def validate_inputs(batch_size, interval_seconds):
-    if batch_size <= 0:
-        raise ValueError("Batch size must be a positive integer.")
 
-    if interval_seconds <= 0:
-        raise ValueError("Interval seconds must be a positive integer.")
+SCENARIO_NAMES = ("normal", "critical_low", "critical_high")
+
+# integer-valued readings; their (low, high) bounds are inclusive
+COUNT_COLUMNS = ("rejected_bags_count", "customer_complaints_count")
+
+# Fields in output order: (column, (low, high) per SCENARIO_NAMES) for uniform readings,
+# a whole-number count with inclusive bounds if listed in COUNT_COLUMNS
+# or a bare name for a 0/1 flag
+FIELDS = [
+    # Storage Silos
+    ("silo_level_pct", (40, 95), (20, 40), (95, 100)),
+    ("silo_pressure_mbar", (50, 120), (30, 50), (120, 150)),
+    ("silo_temp_c", (40, 60), (30, 40), (60, 80)),
+    ("aeration_airflow_nm3_hr", (3000, 5000), (1000, 3000), (5000, 7000)),
+    ("silo_pressure_pa", (5000, 10000), (2000, 5000), (10000, 15000)),
+
+    # Packing Plant
+    ("packing_machine_speed_bags_min", (80, 120), (60, 80), (100, 140)),
+    ("packing_machine_efficiency_pct", (85, 95), (70, 85), (90, 98)),
+    ("packing_machine_power_kw", (50, 100), (30, 50), (70, 120)),
+    ("bag_weight_kg", (50, 55), (45, 50), (55, 60)),
+    ("bag_reject_rate_pct", (1, 5), (5, 10), (0, 2)),
+    ("rejected_bags_count", (0, 10), (5, 15), (0, 5)),
+    "packing_machine_status",  # 0: Off, 1: On
+
+    # Bulk Loading
+    ("bulk_loading_rate_tph", (100, 200), (50, 100), (150, 250)),
+    ("truck_loading_time_min", (10, 20), (20, 30), (5, 10)),
+    ("inventory_turnover_rate", (1, 5), (0.5, 2), (3, 7)),
+
+    # Dispatch & Inventory
+    ("daily_dispatch_tonnes", (1000, 2000), (500, 1000), (1500, 2500)),
+    ("dispatch_rate_tph", (100, 200), (50, 100), (150, 250)),
+    ("inventory_level_tonnes", (500, 1000), (100, 300), (800, 1200)),
+    ("customer_complaints_count", (0, 5), (1, 10), (0, 3)),
+
+    # Alarms
+    "silo_overpressure_alarm",
+    "packing_machine_jam_alarm",
+    "truck_delay_alarm",
+
+    # Emissions
+    ("dust_emission_mgNm3", (10, 50), (5, 15), (20, 60)),
+]
+
+READING_COLUMNS = [f[0] for f in FIELDS if isinstance(f, tuple)]
+FLAG_COLUMNS = [f for f in FIELDS if isinstance(f, str)]
+COLUMNS = [f[0] if isinstance(f, tuple) else f for f in FIELDS]
+
+# (scenario, reading column, low/high) bounds, indexed by SCENARIO_NAMES and READING_COLUMNS
+PARAMS = np.array([f[1:] for f in FIELDS if isinstance(f, tuple)], dtype=np.float64).transpose(1, 0, 2)
+
+# Per-scenario generate_record specs, see record_specs
+_SCENARIO_BOUNDS = record_specs(FIELDS, SCENARIO_NAMES, COUNT_COLUMNS)
 
 
 class Stage5StoragePackingGenerator:
@@ -28,155 +81,75 @@ class Stage5StoragePackingGenerator:
     - Alarms and anomalies
     """
 
-    def __init__(self, seed: int = None, scenario: str = "normal"):
-        if seed:
-            random.seed(seed)
+    def __init__(self, seed: int = None, scenario: str = "normal", fast: bool = False):
+        # Own random streams instead of seeding the global random module: batches are drawn
+        # with NumPy, single records with a random.Random
+        self.rng = np.random.default_rng(seed)
+        self._random = random.Random(seed)
+        if scenario not in _SCENARIO_BOUNDS:
+            raise ValueError("Invalid scenario. Choose from ['normal', 'critical_low', 'critical_high'].")
         self.scenario = scenario
+        # Bounds resolved once here so the per-call paths never branch on the scenario name
+        self._spec = _SCENARIO_BOUNDS[scenario]
+        params = PARAMS[SCENARIO_NAMES.index(scenario)]
+        self._params = (np.ascontiguousarray(params[:, 0]), np.ascontiguousarray(params[:, 1]))
+        # Fill batch readings with a parallel Numba kernel (requires numba); pays off on large batches
+        self.fast = fast
 
     def generate_record(self, timestamp: datetime.datetime = None):
         if not timestamp:
             timestamp = datetime.datetime.now()
 
-        if self.scenario == "normal":
-            record = {
-                "timestamp": timestamp.isoformat(),
-
-                # Storage Silos
-                "silo_level_pct": round(random.uniform(40, 95), 2),
-                "silo_pressure_mbar": round(random.uniform(50, 120), 2),
-                "silo_temp_c": round(random.uniform(40, 60), 2),
-                "aeration_airflow_nm3_hr": round(random.uniform(3000, 5000), 2),
-                "silo_pressure_pa": round(random.uniform(5000, 10000), 2),
-
-                # Packing Plant
-                "packing_machine_speed_bags_min": round(random.uniform(80, 120), 2),
-                "packing_machine_efficiency_pct": round(random.uniform(85, 95), 2),
-                "packing_machine_power_kw": round(random.uniform(50, 100), 2),
-                "bag_weight_kg": round(random.uniform(50, 55), 2),
-                "bag_reject_rate_pct": round(random.uniform(1, 5), 2),
-                "rejected_bags_count": random.randint(0, 10),
-                "packing_machine_status": random.choice([0, 1]),  # 0: Off, 1: On
-
-                # Bulk Loading
-                "bulk_loading_rate_tph": round(random.uniform(100, 200), 2),
-                "truck_loading_time_min": round(random.uniform(10, 20), 2),
-                "inventory_turnover_rate": round(random.uniform(1, 5), 2),
-
-                # Dispatch & Inventory
-                "daily_dispatch_tonnes": round(random.uniform(1000, 2000), 2),
-                "dispatch_rate_tph": round(random.uniform(100, 200), 2),
-                "inventory_level_tonnes": round(random.uniform(500, 1000), 2),
-                "customer_complaints_count": random.randint(0, 5),
-
-                # Alarms
-                "silo_overpressure_alarm": random.choice([0, 1]),
-                "packing_machine_jam_alarm": random.choice([0, 1]),
-                "truck_delay_alarm": random.choice([0, 1]),
-
-                # Emissions
-                "dust_emission_mgNm3": round(random.uniform(10, 50), 2),
-            }
-        elif self.scenario == "critical_low":
-            record = {
-                "timestamp": timestamp.isoformat(),
-
-                # Storage Silos
-                "silo_level_pct": round(random.uniform(20, 40), 2),
-                "silo_pressure_mbar": round(random.uniform(30, 50), 2),
-                "silo_temp_c": round(random.uniform(30, 40), 2),
-                "aeration_airflow_nm3_hr": round(random.uniform(1000, 3000), 2),
-                "silo_pressure_pa": round(random.uniform(2000, 5000), 2),
-
-                # Packing Plant
-                "packing_machine_speed_bags_min": round(random.uniform(60, 80), 2),
-                "packing_machine_efficiency_pct": round(random.uniform(70, 85), 2),
-                "packing_machine_power_kw": round(random.uniform(30, 50), 2),
-                "bag_weight_kg": round(random.uniform(45, 50), 2),
-                "bag_reject_rate_pct": round(random.uniform(5, 10), 2),
-                "rejected_bags_count": random.randint(5, 15),
-                "packing_machine_status": random.choice([0, 1]),  # 0: Off, 1: On
-
-                # Bulk Loading
-                "bulk_loading_rate_tph": round(random.uniform(50, 100), 2),
-                "truck_loading_time_min": round(random.uniform(20, 30), 2),
-                "inventory_turnover_rate": round(random.uniform(0.5, 2), 2),
-
-                # Dispatch & Inventory
-                "daily_dispatch_tonnes": round(random.uniform(500, 1000), 2),
-                "dispatch_rate_tph": round(random.uniform(50, 100), 2),
-                "inventory_level_tonnes": round(random.uniform(100, 300), 2),
-                "customer_complaints_count": random.randint(1, 10),
-
-                # Alarms
-                "silo_overpressure_alarm": random.choice([0, 1]),
-                "packing_machine_jam_alarm": random.choice([0, 1]),
-                "truck_delay_alarm": random.choice([0, 1]),
-
-                # Emissions
-                "dust_emission_mgNm3": round(random.uniform(5, 15), 2),
-            }
-        elif self.scenario == "critical_high":
-            record = {
-                "timestamp": timestamp.isoformat(),
-
-                # Storage Silos
-                "silo_level_pct": round(random.uniform(95, 100), 2),
-                "silo_pressure_mbar": round(random.uniform(120, 150), 2),
-                "silo_temp_c": round(random.uniform(60, 80), 2),
-                "aeration_airflow_nm3_hr": round(random.uniform(5000, 7000), 2),
-                "silo_pressure_pa": round(random.uniform(10000, 15000), 2),
-
-                # Packing Plant
-                "packing_machine_speed_bags_min": round(random.uniform(100, 140), 2),
-                "packing_machine_efficiency_pct": round(random.uniform(90, 98), 2),
-                "packing_machine_power_kw": round(random.uniform(70, 120), 2),
-                "bag_weight_kg": round(random.uniform(55, 60), 2),
-                "bag_reject_rate_pct": round(random.uniform(0, 2), 2),
-                "rejected_bags_count": random.randint(0, 5),
-                "packing_machine_status": random.choice([0, 1]),  # 0: Off, 1: On
-
-                # Bulk Loading
-                "bulk_loading_rate_tph": round(random.uniform(150, 250), 2),
-                "truck_loading_time_min": round(random.uniform(5, 10), 2),
-                "inventory_turnover_rate": round(random.uniform(3, 7), 2),
-
-                # Dispatch & Inventory
-                "daily_dispatch_tonnes": round(random.uniform(1500, 2500), 2),
-                "dispatch_rate_tph": round(random.uniform(150, 250), 2),
-                "inventory_level_tonnes": round(random.uniform(800, 1200), 2),
-                "customer_complaints_count": random.randint(0, 3),
-
-                # Alarms
-                "silo_overpressure_alarm": random.choice([0, 1]),
-                "packing_machine_jam_alarm": random.choice([0, 1]),
-                "truck_delay_alarm": random.choice([0, 1]),
-
-                # Emissions
-                "dust_emission_mgNm3": round(random.uniform(20, 60), 2),
-            }
-        else:
-            raise ValueError("Invalid scenario. Choose from ['normal', 'critical_low', 'critical_high'].")
+        uniform, randint, getrandbits = self._random.uniform, self._random.randint, self._random.getrandbits
+        record = {"timestamp": timestamp.isoformat()}
+        for name, lo, hi, kind in self._spec:
+            if kind == "reading":
+                # Truncating a draw over [lo, hi + 1) hundredths gives an evenly spread 2-decimal value, without round()
+                record[name] = int(uniform(lo, hi)) / 100
+            elif kind == "flag":
+                record[name] = getrandbits(1)
+            else:
+                record[name] = randint(lo, hi)
 
         return record
 
     def generate_batch(self, n: int = 10, start_time: datetime.datetime = None, interval_seconds: int = 60):
+        """
+        Generate a batch of synthetic records over time.
+        Each kind of field is drawn for all rows in one vectorized call; returns a DataFrame with one row per record.
+        """
         validate_inputs(n, interval_seconds)
+        lows, highs = self._params
 
         if not start_time:
             start_time = datetime.datetime.now()
 
-        batch = []
-        for i in range(n):
-            ts = start_time + datetime.timedelta(seconds=i * interval_seconds)
-            batch.append(self.generate_record(timestamp=ts))
-
-        return batch
+        if self.fast:
+            readings = np.empty((n, len(READING_COLUMNS)))
+            fast_uniform_kernel()(readings, lows, highs, int(self.rng.integers(2**31)), FAST_BLOCK_ROWS)
+        else:
+            readings = self.rng.uniform(lows, highs, size=(n, len(READING_COLUMNS)))
+            np.round(readings, 2, out=readings)
+        df = pd.DataFrame(readings, columns=READING_COLUMNS, copy=False)
+        for col in COUNT_COLUMNS:
+            j = READING_COLUMNS.index(col)
+            df[col] = self.rng.integers(int(lows[j]), int(highs[j]), size=n, endpoint=True)
+        df[FLAG_COLUMNS] = self.rng.integers(0, 2, size=(n, len(FLAG_COLUMNS)))
+        df = df[COLUMNS]
+        df.insert(0, "timestamp", iso_timestamps(start_time, n, interval_seconds))
+        return df
+
+    def generate_records(self, n: int = 10, start_time: datetime.datetime = None, interval_seconds: int = 60):
+        """
+        Generate a batch as a list of dicts (one per record), for JSON-style consumers.
+        """
+        return self.generate_batch(n, start_time, interval_seconds).to_dict(orient="records")
 
 
 if __name__ == "__main__":
     gen = Stage5StoragePackingGenerator(seed=42)
     try:
-        data = gen.generate_batch(n=5)
+        data = gen.generate_records(n=5)
         logging.info(json.dumps(data, indent=2))
     except Exception as e:
         logging.error(f"Error generating Stage 5 data: {e}")
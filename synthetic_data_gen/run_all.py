@@ -1,14 +1,14 @@
 import argparse
+import csv
 import os
 import datetime
-import pandas as pd
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 
-from generators.stage1_raw_materials import generate_stage1_raw_materials as Stage1RawMaterialsGenerator
-from generators.stage2_grinding_preheater import Stage2GrindingPreheaterGenerator
-from generators.stage3_clinker import Stage3ClinkerGenerator
-from generators.stage4_cement_grinding import Stage4CementGrindingGenerator
-from generators.stage5_packaging_dispatch import Stage5StoragePackingGenerator
+# pandas, pyarrow and the stage generators (which need NumPy/pandas) are imported on first use,
+# so --help and input validation errors return without paying for them
 
 BASE_OUTPUT_DIR = os.path.join("data", "synthetic", "raw")
 
@@ -17,14 +17,60 @@ BASE_OUTPUT_DIR = os.path.join("data", "synthetic", "raw")
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 
-def save_to_csv(data, filename, run_dir):
-    """Save list of dicts to CSV inside timestamped folder."""
-    df = pd.DataFrame(data)
-    os.makedirs(run_dir, exist_ok=True)
-    file_path = os.path.join(run_dir, filename)
-    os.makedirs(os.path.dirname(file_path), exist_ok=True)  # Ensure directory exists
-    df.to_csv(file_path, index=False)
-    print(f"✅ Saved {len(df)} rows -> {file_path}")
+def _stage_generators():
+    """Import the stage generators; returns {stage name: generator} in run order."""
+    from generators.stage1_raw_materials import generate_stage1_raw_materials as Stage1RawMaterialsGenerator
+    from generators.stage2_grinding_preheater import Stage2GrindingPreheaterGenerator
+    from generators.stage3_clinker import Stage3ClinkerGenerator
+    from generators.stage4_cement_grinding import Stage4CementGrindingGenerator
+    from generators.stage5_packaging_dispatch import Stage5StoragePackingGenerator
+
+    return {
+        "Stage1_Raw_Materials": Stage1RawMaterialsGenerator,
+        "Stage2_Grinding_Preheater": Stage2GrindingPreheaterGenerator,
+        "Stage3_Clinker": Stage3ClinkerGenerator,
+        "Stage4_Cement_Grinding": Stage4CementGrindingGenerator,
+        "Stage5_Storage_Packing": Stage5StoragePackingGenerator,
+    }
+
+
+def save_to_csv(data, file_path):
+    """
+    Save a DataFrame or list of dicts to CSV at file_path (its run folder must already exist).
+    DataFrame floats are written to 2 decimals; records (already rounded by generate_record)
+    are streamed as-is without building a DataFrame.
+    """
+    if isinstance(data, list):
+        with open(file_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=data[0].keys())
+            writer.writeheader()
+            writer.writerows(data)
+    else:
+        data.to_csv(file_path, index=False, float_format="%.2f")
+    print(f"✅ Saved {len(data)} rows -> {file_path}")
+
+
+def save_to_parquet(data, file_path):
+    """
+    Save a DataFrame or list of dicts to a zstd-compressed Parquet file at file_path (its run folder must already exist).
+    DataFrame floats are rounded to 2 decimals (as float64, like the CSV and record output);
+    records are already rounded by generate_record.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if isinstance(data, list):
+        table = pa.Table.from_pylist(data)
+    else:
+        float_cols = data.select_dtypes("floating").columns
+        data = data.astype(dict.fromkeys(float_cols, "float64")).round(dict.fromkeys(float_cols, 2))
+        table = pa.Table.from_pandas(data, preserve_index=False)
+    pq.write_table(table, file_path, compression="zstd", compression_level=3)
+    print(f"✅ Saved {table.num_rows} rows -> {file_path}")
+
+
+# Writer for each --format; Parquet keeps the columns typed and loads much faster than re-parsing CSV text
+SAVERS = {"csv": save_to_csv, "parquet": save_to_parquet}
 
 
 def validate_inputs(rows, interval, start_date):
@@ -34,14 +80,24 @@ def validate_inputs(rows, interval, start_date):
     if interval <= 0:
         raise ValueError("Interval must be a positive integer.")
 
+    if start_date is None:
+        return
+
     try:
         datetime.datetime.fromisoformat(start_date)
     except ValueError:
         raise ValueError("Invalid start_date format. Use ISO format (e.g., 2025-01-01T00:00:00).")
 
 
+def _stage_pool(n_stages):
+    """Process pool for running independent stages side by side, one core per stage at most."""
+    # spawn rather than fork: a forked worker can deadlock on thread pools (e.g. Numba's) started in the parent
+    return ProcessPoolExecutor(max_workers=min(n_stages, os.cpu_count() or 1),
+                               mp_context=multiprocessing.get_context("spawn"))
+
+
 def generate_stage_data(generator_class, stage_name, args, run_dir):
-    """Run one stage generator and save CSV."""
+    """Run one stage generator and save its output in args.format."""
     try:
         print(f"⚙️ Generating data for {stage_name}...")
 
@@ -52,7 +108,8 @@ def generate_stage_data(generator_class, stage_name, args, run_dir):
                 duration_days=args.rows // (24 * 60 // args.interval),
                 interval_minutes=args.interval,
                 scenario=args.scenario,
-                output_dir=run_dir
+                output_dir=run_dir,
+                output_format=args.format
             )
         else:
             gen = generator_class(seed=42)
@@ -62,48 +119,13 @@ def generate_stage_data(generator_class, stage_name, args, run_dir):
                 interval_seconds=args.interval
             )
 
-            # Ensure files are saved directly under data/synthetic/raw/<timestamp>/
-            output_file = os.path.join(run_dir, f"{stage_name.lower()}_data_{args.start_date.strftime('%Y-%m-%d_%H-%M-%S')}.csv")
-            save_to_csv(batch, os.path.basename(output_file), run_dir)
+            # Files are saved directly under data/synthetic/raw/<timestamp>/, which main has already created
+            output_file = os.path.join(run_dir, f"{stage_name.lower()}_data_{args.start_date.strftime('%Y-%m-%d_%H-%M-%S')}.{args.format}")
+            SAVERS[args.format](batch, output_file)
     except Exception as e:
         print(f"❌ Error generating data for {stage_name}: {e}")
 
 
-def run_all_stages(scenario="normal"):
-    """Run all stages with the given scenario."""
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    run_dir = os.path.join(BASE_OUTPUT_DIR, timestamp)
-
-    # Stage 1
-    Stage1RawMaterialsGenerator(
-        start_date="2025-01-01",
-        duration_days=7,
-        interval_minutes=10,
-        scenario=scenario,
-        output_dir=run_dir
-    )
-
-    # Stage 2
-    stage2_gen = Stage2GrindingPreheaterGenerator()
-    stage2_data = [stage2_gen.generate_record() for _ in range(100)]
-    save_to_csv(stage2_data, "stage2_grinding_preheater.csv", run_dir)
-
-    # Stage 3
-    stage3_gen = Stage3ClinkerGenerator()
-    stage3_data = [stage3_gen.generate_record() for _ in range(100)]
-    save_to_csv(stage3_data, "stage3_clinker.csv", run_dir)
-
-    # Stage 4
-    stage4_gen = Stage4CementGrindingGenerator()
-    stage4_data = [stage4_gen.generate_record() for _ in range(100)]
-    save_to_csv(stage4_data, "stage4_cement_grinding.csv", run_dir)
-
-    # Stage 5
-    stage5_gen = Stage5StoragePackingGenerator()
-    stage5_data = [stage5_gen.generate_record() for _ in range(100)]
-    save_to_csv(stage5_data, "stage5_packaging_dispatch.csv", run_dir)
-
-
 def main():
     parser = argparse.ArgumentParser(
         description="Run all synthetic data generators for cement manufacturing stages.",
@@ -119,38 +141,40 @@ def main():
         help="Interval in seconds between records."
     )
     parser.add_argument(
-        "-s", "--start-date", type=str, default=datetime.datetime.now().isoformat(),
-        help="Start date in ISO format (e.g., 2025-01-01T00:00:00)."
+        "-s", "--start-date", type=str, default=None,
+        help="Start date in ISO format (e.g., 2025-01-01T00:00:00); the current time if omitted."
     )
     parser.add_argument(
-        "--scenario", type=str, default="normal",
-        help="Scenario name for the data generation (e.g., 'normal', 'stress_test')."
+        "--scenario", type=str, default="normal", choices=["normal", "critical_low", "critical_high"],
+        help="Scenario type for the Stage 1 data."
+    )
+    parser.add_argument(
+        "--format", choices=sorted(SAVERS), default="parquet",
+        help="Output file format; the data pipeline loaders read both."
     )
 
     args = parser.parse_args()
 
     try:
         validate_inputs(args.rows, args.interval, args.start_date)
-        args.start_date = datetime.datetime.fromisoformat(args.start_date)
+        now = datetime.datetime.now()
+        args.start_date = now if args.start_date is None else datetime.datetime.fromisoformat(args.start_date)
 
-        # Create a timestamped output directory inside data/synthetic
-        run_id = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        run_dir = os.path.join("data/synthetic", run_id)
+        # Create a timestamped output directory inside data/synthetic/raw, where the data pipeline looks
+        run_id = now.strftime("%Y-%m-%d_%H-%M-%S")
+        run_dir = os.path.join(BASE_OUTPUT_DIR, run_id)
+        os.makedirs(run_dir, exist_ok=True)
 
         print(f"\n🚀 Starting synthetic data generation")
         print(f"📂 Output directory: {run_dir}")
         print(f"📊 Rows: {args.rows}, Interval: {args.interval}s, Start Date: {args.start_date}, Scenario: {args.scenario}\n")
 
-        stages = [
-            ("Stage1_Raw_Materials", Stage1RawMaterialsGenerator),
-            ("Stage2_Grinding_Preheater", Stage2GrindingPreheaterGenerator),
-            ("Stage3_Clinker", Stage3ClinkerGenerator),
-            ("Stage4_Cement_Grinding", Stage4CementGrindingGenerator),
-            ("Stage5_Storage_Packing", Stage5StoragePackingGenerator),
-        ]
+        stages = list(_stage_generators().items())
 
-        for stage_name, generator_class in stages:
-            generate_stage_data(generator_class, stage_name, args, run_dir)
+        # Stages are independent (own generator, own output file), so each runs in its own worker process
+        with _stage_pool(len(stages)) as pool:
+            names, classes = zip(*stages)
+            list(pool.map(generate_stage_data, classes, names, repeat(args), repeat(run_dir)))
 
         print("\n✅ Synthetic dataset generation completed for all stages!")
     except Exception as e:
@@ -158,9 +182,4 @@ def main():
 
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Run all synthetic data generators.")
-    parser.add_argument("--scenario", type=str, default="normal", choices=["normal", "critical_low", "critical_high"],
-                        help="Scenario type: normal, critical_low, critical_high")
-    args = parser.parse_args()
-
-    run_all_stages(scenario=args.scenario)
+    main()
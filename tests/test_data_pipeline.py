@@ -1,119 +1,204 @@
+import glob
 import os
+from functools import cache
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 import pytest
-from src.data_pipeline.loaders import load_stage_data as load_stage_files, validate
-from src.data_pipeline.pipelines import get_preprocessed_data
+from src.data_pipeline import loaders
+from src.data_pipeline.loaders import _arrow_column_types, load_all_stages, load_csv, load_stage_data as load_stage_files, validate
+from src.data_pipeline.pipelines import _apply_all, get_preprocessed_data
+from src.data_pipeline.transformers import (
+    add_time_features,
+    clip_outliers,
+    create_kpis,
+    fill_missing_values,
+    normalize_features,
+)
 
-def test_load_stage_files_exists():
-    base_dir = "data/synthetic/raw"
-    timestamp_dirs = [d for d in os.listdir(base_dir) if os.path.isdir(os.path.join(base_dir, d))]
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson is optional
+    from json import loads as json_loads
 
-    for timestamp_dir in timestamp_dirs:
-        stage_dir = os.path.join(base_dir, timestamp_dir)
-        datasets = load_stage_files(stage_dir)
-        assert len(datasets) > 0, f"No datasets loaded from stage directory: {stage_dir}"
+BASE_DIR = "data/synthetic/raw"
 
-def test_validate_schema_stage1():
-    import json
-    import pandas as pd
-    base_dir = "data/synthetic/raw"
-    schema_path = "data/synthetic/schema/stage1_raw_materials_schema.json"
 
-    timestamp_dirs = [d for d in os.listdir(base_dir) if os.path.isdir(os.path.join(base_dir, d))]
+@cache
+def _timestamp_dirs(base_dir=BASE_DIR):
+    """Paths of the timestamped run folders; scanned once per session since tests don't add runs."""
+    with os.scandir(base_dir) as it:
+        return tuple(e.path for e in it if e.is_dir())
 
-    for timestamp_dir in timestamp_dirs:
-        csv_path = os.path.join(base_dir, timestamp_dir, "stage1_raw_materials.csv")
-        if not os.path.exists(csv_path):
-            continue
 
-        schema = json.load(open(schema_path))
-        df = pd.read_csv(csv_path)
+def _read_csv_fast(path):
+    """Parse a CSV with Arrow's multithreaded reader, typing timestamp up front (Stage 1 writes whole seconds)."""
+    convert_options = pacsv.ConvertOptions(column_types={"timestamp": pa.timestamp("s")})
+    table = pacsv.read_csv(path, convert_options=convert_options)
+    return table.to_pandas(split_blocks=True, self_destruct=True)
 
-        is_valid, message = validate(df, schema)
-        assert is_valid, f"Validation failed for {csv_path}: {message}"
 
-def test_transform_pipeline_outputs_columns():
-    base_dir = "data/synthetic/raw"
-    timestamp_dirs = [d for d in os.listdir(base_dir) if os.path.isdir(os.path.join(base_dir, d))]
+def test_load_stage_files_exists():
+    for stage_dir in _timestamp_dirs():
+        datasets = load_stage_files(stage_dir)
+        assert len(datasets) > 0, f"No datasets loaded from stage directory: {stage_dir}"
 
-    for timestamp_dir in timestamp_dirs:
-        data_dir = os.path.join(base_dir, timestamp_dir)
-        preprocessed_data = get_preprocessed_data(data_dir)
+def test_load_all_stages_reads_parquet_run(tmp_path):
+    # run_all's default layout: one Parquet file per stage directly in the run folder
+    source = sorted(glob.glob(os.path.join(BASE_DIR, "*", "stage2_grinding_preheater_*.csv")))[0]
+    run_dir = tmp_path / "2025-01-01_00-00-00"
+    run_dir.mkdir()
+    pacsv.read_csv(source).to_pandas().to_parquet(run_dir / "stage2_grinding_preheater.parquet")
+
+    datasets = load_all_stages(str(tmp_path))
+    assert list(datasets) == ["stage2_grinding_preheater"]
+    assert len(datasets["stage2_grinding_preheater"]) > 0
+
+def test_arrow_column_types_accepts_list_fields():
+    dict_schema = {"fields": {"timestamp": "ISO 8601 datetime", "feed_tph": "float, tonnes per hour",
+                              "status": "integer, 0/1"}}
+    list_schema = {"fields": [{"name": "timestamp", "type": "datetime"},
+                              {"name": "feed_tph", "type": "float"},
+                              {"name": "status", "description": "integer, 0/1"}]}
+    expected = {"timestamp": pa.timestamp("us"), "feed_tph": pa.float64(), "status": pa.int64()}
+    assert _arrow_column_types(dict_schema) == expected
+    assert _arrow_column_types(list_schema) == expected
+
+@pytest.mark.parametrize("large", [False, True])
+def test_parquet_cache_tracks_schema(tmp_path, monkeypatch, large):
+    if large:
+        # Take the batch-by-batch writer path
+        monkeypatch.setattr(loaders, "LARGE_CSV_BYTES", 0)
+    csv_path = tmp_path / "stage.csv"
+    csv_path.write_text("timestamp,status\n2025-01-01T00:00:00,1\n2025-01-01T00:01:00,0\n")
+    schema = {"fields": {"timestamp": "ISO 8601 datetime", "status": "float, 0/1"}}
+
+    assert load_csv(str(csv_path))["status"].dtype == np.int64
+    # Same mtime, different schema: the cache must be rebuilt with the schema's types
+    assert load_csv(str(csv_path), schema)["status"].dtype == np.float64
+    assert pq.read_schema(tmp_path / "stage.parquet").metadata[loaders.CACHE_TYPES_KEY] == \
+        loaders._column_types_key(schema)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["stage.csv", "stage.parquet"]
 
-        for stage, df in preprocessed_data.items():
-            assert "timestamp" in df.columns, f"Timestamp column missing in {stage}"
-            assert "specific_power_consumption" in df.columns, f"KPI column missing in {stage}"
+def test_validate_schema_stage1():
+    schema_path = "data/synthetic/schema/stage1_raw_materials_schema.json"
+    schema = json_loads(Path(schema_path).read_bytes())
 
-def test_verify_all_stages():
-    base_dir = "data/synthetic/raw"
-    if not os.path.exists(base_dir):
-        pytest.fail(f"Base directory does not exist: {base_dir}")
+    # Generated CSVs plus Parquet written directly (the default since run_all switched to Parquet);
+    # a .parquet next to a CSV is the loader's cache, not the file under test, and is skipped
+    data_paths = sorted(path for run_dir in _timestamp_dirs()
+                        for path in loaders._list_data_files(run_dir, prefix="stage1_raw_materials"))
+    assert data_paths, f"No Stage 1 files found in {BASE_DIR}"
 
-    timestamp_dirs = [os.path.join(base_dir, d) for d in os.listdir(base_dir) if os.path.isdir(os.path.join(base_dir, d))]
-    if not timestamp_dirs:
-        pytest.fail(f"No timestamped directories found in {base_dir}")
+    for data_path in data_paths:
+        if data_path.endswith(".parquet"):
+            df = pq.read_table(data_path).to_pandas()
+        else:
+            df = _read_csv_fast(data_path)
 
-    for data_dir in timestamp_dirs:
-        try:
-            preprocessed_data = get_preprocessed_data(data_dir)
-        except Exception as e:
-            pytest.fail(f"Error processing data in {data_dir}: {e}")
+        is_valid, message = validate(df, schema)
+        assert is_valid, f"Validation failed for {data_path}: {message}"
 
-        for stage, df in preprocessed_data.items():
-            # Verify that the DataFrame is not empty
-            assert not df.empty, f"DataFrame for {stage} in {data_dir} is empty."
+def test_apply_all_matches_unfused_chain():
+    data_path = sorted(glob.glob(os.path.join(BASE_DIR, "*", "stage2_grinding_preheater_*.csv")))[0]
+    df = load_csv(data_path).copy()
+    # Blank out some readings so the mean fill is exercised too
+    df.iloc[::7, 1:4] = np.nan
 
-            # Verify that all expected columns are present
-            expected_columns = {"timestamp", "hour", "day", "weekday", "month", "specific_power_consumption"}
-            missing_columns = expected_columns - set(df.columns)
-            assert not missing_columns, f"Missing columns {missing_columns} in {stage} for {data_dir}."
+    fused, scaler = _apply_all(df)
+
+    expected = add_time_features(df)
+    expected, expected_scaler = normalize_features(expected, method="minmax")
+    expected = fill_missing_values(expected, method="mean")
+    expected = clip_outliers(expected, columns=expected.select_dtypes(include=["number"]).columns)
+    expected = create_kpis(expected)
+
+    assert list(fused.columns) == list(expected.columns)
+    np.testing.assert_allclose(scaler.offset, expected_scaler.offset)
+    np.testing.assert_allclose(scaler.scale, expected_scaler.scale)
+    numeric_cols = expected.select_dtypes(include=["number"]).columns
+    np.testing.assert_allclose(fused[numeric_cols].to_numpy(dtype=np.float64),
+                               expected[numeric_cols].to_numpy(dtype=np.float64), rtol=0, atol=1e-12)
+    assert fused["timestamp"].equals(expected["timestamp"])
 
-            # Verify that there are no missing values in critical columns
-            critical_columns = {"timestamp", "specific_power_consumption"} & set(df.columns)
-            for col in critical_columns:
-                assert df[col].notnull().all(), f"Missing values found in column {col} for {stage} in {data_dir}."
 
-            # Verify that timestamps are monotonic
-            if "timestamp" in df.columns:
-                assert df["timestamp"].is_monotonic_increasing, f"Timestamps are not monotonic in {stage} for {data_dir}."
+EXPECTED_COLUMNS = {"timestamp", "hour", "day", "weekday", "month", "specific_power_consumption"}
 
-            # Verify that numeric columns are within expected ranges (if applicable)
-            numeric_columns = df.select_dtypes(include=["number"]).columns
-            for col in numeric_columns:
-                assert (df[col] >= 0).all(), f"Negative values found in column {col} for {stage} in {data_dir}."
 
-def test_verify_transformers_and_scripts():
-    base_dir = "data/synthetic/raw"
-    if not os.path.exists(base_dir):
-        pytest.fail(f"Base directory does not exist: {base_dir}")
+@pytest.fixture(scope="module")
+def preprocessed_by_dir(tmp_path_factory):
+    """
+    Preprocess every timestamped run directory once; shared by the pipeline tests below.
+    Runs from a temporary working directory, where the processed output and scalers are written.
+    """
+    if not os.path.exists(BASE_DIR):
+        pytest.fail(f"Base directory does not exist: {BASE_DIR}")
 
-    timestamp_dirs = [os.path.join(base_dir, d) for d in os.listdir(base_dir) if os.path.isdir(os.path.join(base_dir, d))]
+    timestamp_dirs = _timestamp_dirs()
     if not timestamp_dirs:
-        pytest.fail(f"No timestamped directories found in {base_dir}")
+        pytest.fail(f"No timestamped directories found in {BASE_DIR}")
 
+    work_dir = tmp_path_factory.mktemp("pipeline")
+    preprocessed = {}
     for data_dir in timestamp_dirs:
-        try:
-            preprocessed_data = get_preprocessed_data(data_dir)
-        except Exception as e:
-            pytest.fail(f"Error processing data in {data_dir}: {e}")
+        run_dir = os.path.abspath(data_dir)
+        with pytest.MonkeyPatch.context() as mp:
+            mp.chdir(work_dir)
+            try:
+                preprocessed[data_dir] = get_preprocessed_data(run_dir)
+            except Exception as e:
+                pytest.fail(f"Error processing data in {data_dir}: {e}")
+        assert len(preprocessed[data_dir]) == 5, f"Expected all 5 stages for {data_dir}: {list(preprocessed[data_dir])}"
+    return preprocessed
+
+
+def _check_preprocessed_frame(df, stage, data_dir):
+    """Assertions shared by every preprocessed stage frame."""
+    # Verify that the DataFrame is not empty
+    assert not df.empty, f"DataFrame for {stage} in {data_dir} is empty."
+
+    # Verify that all expected columns are present
+    missing_columns = EXPECTED_COLUMNS - set(df.columns)
+    assert not missing_columns, f"Missing columns {missing_columns} in {stage} for {data_dir}."
+
+    # Verify that timestamps are monotonic
+    assert df["timestamp"].is_monotonic_increasing, f"Timestamps are not monotonic in {stage} for {data_dir}."
+
+    # Verify that numeric columns are within expected ranges, checking the whole frame at once
+    # (one comparison and reduction over the numeric block; NaN counts as out of range)
+    numeric = df.select_dtypes(include=["number"])
+    in_range = numeric.to_numpy() >= 0
+    if not in_range.all():
+        negative_columns = numeric.columns[~in_range.all(axis=0)].tolist()
+        pytest.fail(f"Negative values found in columns {negative_columns} for {stage} in {data_dir}.")
+
+
+def test_transform_pipeline_outputs_columns(preprocessed_by_dir):
+    for preprocessed_data in preprocessed_by_dir.values():
+        for stage, df in preprocessed_data.items():
+            assert "timestamp" in df.columns, f"Timestamp column missing in {stage}"
+            assert "specific_power_consumption" in df.columns, f"KPI column missing in {stage}"
 
+def test_verify_all_stages(preprocessed_by_dir):
+    for data_dir, preprocessed_data in preprocessed_by_dir.items():
         for stage, df in preprocessed_data.items():
-            # Verify that the DataFrame is not empty
-            assert not df.empty, f"DataFrame for {stage} in {data_dir} is empty."
+            _check_preprocessed_frame(df, stage, data_dir)
 
-            # Verify that all expected columns are present
-            expected_columns = {"timestamp", "hour", "day", "weekday", "month", "specific_power_consumption"}
-            missing_columns = expected_columns - set(df.columns)
-            assert not missing_columns, f"Missing columns {missing_columns} in {stage} for {data_dir}."
+            # Verify that there are no missing values in critical columns
+            critical_columns = list({"timestamp", "specific_power_consumption"} & set(df.columns))
+            missing = df[critical_columns].isna().to_numpy()
+            if missing.any():
+                null_columns = [c for c, bad in zip(critical_columns, missing.any(axis=0)) if bad]
+                pytest.fail(f"Missing values found in columns {null_columns} for {stage} in {data_dir}.")
+
+def test_verify_transformers_and_scripts(preprocessed_by_dir):
+    for data_dir, preprocessed_data in preprocessed_by_dir.items():
+        for stage, df in preprocessed_data.items():
+            _check_preprocessed_frame(df, stage, data_dir)
 
             # Verify that transformers are applied correctly
-            assert "hour" in df.columns and df["hour"].between(0, 23).all(), f"Invalid hour values in {stage} for {data_dir}."
-            assert "specific_power_consumption" in df.columns and (df["specific_power_consumption"] >= 0).all(), f"Invalid KPI values in {stage} for {data_dir}."
-
-            # Verify that numeric columns are scaled (if applicable)
-            numeric_columns = df.select_dtypes(include=["number"]).columns
-            for col in numeric_columns:
-                assert (df[col] >= 0).all(), f"Negative values found in column {col} for {stage} in {data_dir}."
-
-            # Verify that timestamps are monotonic
-            if "timestamp" in df.columns:
-                assert df["timestamp"].is_monotonic_increasing, f"Timestamps are not monotonic in {stage} for {data_dir}."
\ No newline at end of file
+            assert df["hour"].between(0, 23).all(), f"Invalid hour values in {stage} for {data_dir}."
+            assert (df["specific_power_consumption"] >= 0).all(), f"Invalid KPI values in {stage} for {data_dir}."
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from src.models import registry
+
+
+@pytest.fixture
+def model_dir(tmp_path, monkeypatch):
+    """Point the registry at an empty temporary model directory."""
+    monkeypatch.setattr(registry, "MODEL_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def training_data():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(200, 5)), columns=[f"x{i}" for i in range(5)])
+    return X, rng
+
+
+def test_forest_regressor_round_trip(model_dir, training_data):
+    X, rng = training_data
+    y = X["x0"] * 3 - X["x2"] + rng.normal(scale=0.1, size=len(X))
+    model = RandomForestRegressor(n_estimators=7, max_depth=6, random_state=0).fit(X, y)
+
+    registry.save_model(model, "rf_reg")
+    forest = registry.load_forest("rf_reg")
+
+    X_test = pd.DataFrame(rng.normal(size=(50, 5)), columns=X.columns)
+    np.testing.assert_allclose(forest.predict(X_test), model.predict(X_test), rtol=1e-12)
+    # Columns are reordered by name before walking the trees
+    np.testing.assert_allclose(forest.predict(X_test[X.columns[::-1]]), model.predict(X_test), rtol=1e-12)
+
+
+def test_forest_classifier_round_trip(model_dir, training_data):
+    X, rng = training_data
+    y = np.where(X["x1"] + X["x3"] > 0.5, "high", np.where(X["x1"] < -0.5, "low", "normal"))
+    model = RandomForestClassifier(n_estimators=7, max_depth=5, random_state=0).fit(X, y)
+
+    registry.save_model(model, "rf_clf")
+    forest = registry.load_forest("rf_clf")
+
+    X_test = pd.DataFrame(rng.normal(size=(50, 5)), columns=X.columns)
+    np.testing.assert_allclose(forest.predict_proba(X_test), model.predict_proba(X_test), rtol=1e-12)
+    np.testing.assert_array_equal(forest.predict(X_test), model.predict(X_test))
+    assert forest.feature.dtype == np.int16
+
+
+def test_serving_model_uses_forest_arrays(model_dir, training_data):
+    from sklearn.linear_model import LinearRegression
+    from src.models.forest import ArrowForest
+
+    X, rng = training_data
+    y = X["x0"] - X["x4"]
+    forest = RandomForestRegressor(n_estimators=3, max_depth=4, random_state=0).fit(X, y)
+    registry.save_model(forest, "rf_serve")
+    registry.save_model(LinearRegression().fit(X, y), "lin_serve")
+
+    served = registry.load_serving_model("rf_serve")
+    assert isinstance(served, ArrowForest)
+    np.testing.assert_allclose(served.predict(X), forest.predict(X), rtol=1e-12)
+    assert isinstance(registry.load_serving_model("lin_serve"), LinearRegression)
+
+
+def test_preload_skips_unreadable_model(model_dir, training_data, caplog):
+    from sklearn.linear_model import LinearRegression
+
+    X, _ = training_data
+    registry.save_model(LinearRegression().fit(X, X["x0"]), "good")
+    (model_dir / "broken_20250101_000000.joblib").write_bytes(b"not a pickle")
+
+    registry.preload_models()
+    assert "Could not preload model broken" in caplog.text
@@ -0,0 +1,106 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression
+from src.services import controllers
+
+
+@pytest.fixture
+def linear_model(monkeypatch):
+    """A fitted y = 2a + 3b model served under the name "lin"."""
+    X = np.array([[0.0, 1.0], [1.0, 0.0], [2.0, 3.0], [4.0, 1.0]])
+    model = LinearRegression().fit(X, 2 * X[:, 0] + 3 * X[:, 1])
+    model.feature_names_in_ = np.array(["a", "b"], dtype=object)
+    monkeypatch.setattr(controllers, "load_serving_model", lambda name: model)
+    return model
+
+
+@pytest.mark.parametrize("pooled", [False, True])
+def test_batcher_isolates_malformed_row(linear_model, monkeypatch, pooled):
+    batch_sizes = []
+    to_matrix = controllers._to_matrix
+    monkeypatch.setattr(controllers, "_to_matrix",
+                        lambda model, rows: batch_sizes.append(len(rows)) or to_matrix(model, rows))
+    rows = [{"a": float(i), "b": 1.0} for i in range(8)]
+    rows.insert(3, {"a": "not a number", "b": 1.0})
+
+    with ThreadPoolExecutor(max_workers=len(rows)) as ex:
+        # Batches predicted inline, or handed to an executor as the API does with its process pool
+        dispatch = (lambda model_name, batch: ex.submit(controllers.get_model_predictions, model_name, batch)) \
+            if pooled else None
+        # Long enough wait that the rows submitted below are coalesced
+        batcher = controllers._PredictionBatcher(dispatch=dispatch, max_wait=0.2)
+        futures = list(ex.map(lambda row: batcher.submit("lin", row), rows))
+        results = [future.result(timeout=5) for future in futures]
+
+    bad = results.pop(3)
+    assert "error" in bad
+    for i, result in enumerate(results):
+        assert result["prediction"][0] == pytest.approx(2 * i + 3)
+    assert max(batch_sizes) > 1
+
+def test_prediction_with_string_labels_serializes(monkeypatch):
+    orjson = pytest.importorskip("orjson")
+    from sklearn.tree import DecisionTreeClassifier
+
+    X = np.array([[0.0, 0.0], [1.0, 1.0]])
+    model = DecisionTreeClassifier().fit(X, np.array(["normal", "critical"]))
+    monkeypatch.setattr(controllers, "load_serving_model", lambda name: model)
+
+    result = controllers.get_model_prediction("clf", {"x0": 1.0, "x1": 1.0})
+    assert orjson.loads(orjson.dumps(result, option=orjson.OPT_SERIALIZE_NUMPY)) == {
+        "model": "clf", "prediction": ["critical"]}
+
+
+def test_prediction_follows_retrained_feature_order(monkeypatch):
+    X = np.array([[0.0, 1.0], [1.0, 0.0], [2.0, 3.0], [4.0, 1.0]])
+    models = {}
+    monkeypatch.setattr(controllers, "load_serving_model", lambda name: models[name])
+
+    models["lin"] = LinearRegression().fit(X, 2 * X[:, 0] + 3 * X[:, 1])
+    models["lin"].feature_names_in_ = np.array(["a", "b"], dtype=object)
+    assert controllers.get_model_prediction("lin", {"a": 2.0, "b": 2.0})["prediction"][0] == pytest.approx(10)
+
+    # Retrained with the columns swapped: the request must be reordered to match
+    models["lin"] = LinearRegression().fit(X, 2 * X[:, 0] + 3 * X[:, 1])
+    models["lin"].feature_names_in_ = np.array(["b", "a"], dtype=object)
+    assert controllers.get_model_prediction("lin", {"a": 3.0, "b": 1.0})["prediction"][0] == pytest.approx(11)
+
+
+
+@pytest.mark.parametrize("features", [{"a": 3.0}, {"a": 3.0, "bb": 1.0}, {"a": 3.0, "b": 1.0, "c": 0.0}])
+def test_prediction_rejects_missing_or_unknown_features(linear_model, features):
+    result = controllers.get_model_prediction("lin", features)
+    assert "prediction" not in result
+    assert "feature names should match" in result["error"]
+
+
+def _fail_initializer():
+    raise RuntimeError("worker failed to start")
+
+
+def test_api_replaces_broken_pool(tmp_path, monkeypatch):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    from concurrent.futures import ProcessPoolExecutor
+    from fastapi.testclient import TestClient
+    from src.models import registry
+    from src.services import api
+
+    monkeypatch.setattr(registry, "MODEL_DIR", str(tmp_path))
+    monkeypatch.setattr(api, "PREDICT_WORKERS", 1)
+    X = np.array([[0.0, 1.0], [1.0, 0.0], [2.0, 3.0]])
+    registry.save_model(LinearRegression().fit(X, X[:, 0] + X[:, 1]), "lin")
+    request = {"model_name": "lin", "features": {"x0": 1.0, "x1": 2.0}}
+
+    with TestClient(api.app) as client:
+        api._predict_pool.shutdown()
+        api._predict_pool = ProcessPoolExecutor(max_workers=1, initializer=_fail_initializer)
+
+        response = client.post("/predict", json=request)
+        assert response.status_code == 503
+        # The broken pool was replaced, so the next request is served
+        response = client.post("/predict", json=request)
+        assert response.status_code == 200
+        assert response.json()["prediction"] == pytest.approx([3.0])